@@ -0,0 +1,63 @@
+"""
+Per-call overhead of opening a fresh connection (the old get_connection
+pattern) versus borrowing a connection from the pool.
+
+Run from the project root:  python benchmarks/bench_connection_pool.py
+"""
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from src.database import schema
+
+CALLS = 2000
+QUERY = "SELECT * FROM categories WHERE user_id = ?"
+
+
+def connect_per_call():
+    conn = sqlite3.connect(schema.DB_PATH, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    rows = conn.execute(QUERY, (1,)).fetchall()
+    conn.close()
+    return rows
+
+
+def pooled():
+    with schema.borrow_connection() as conn:
+        return conn.execute(QUERY, (1,)).fetchall()
+
+
+def measure(fn):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        fn()
+    return (time.perf_counter() - start) / CALLS * 1e6
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        schema.DB_PATH = os.path.join(tmp, "bench.db")
+        schema.init_db()
+        from src.database.crud import create_user
+        create_user("bench_user", "hash")
+
+        before = measure(connect_per_call)
+        after = measure(pooled)
+        schema.close_connections()
+
+    print(f"connect-per-call : {before:8.1f} us/call")
+    print(f"pooled           : {after:8.1f} us/call")
+    print(f"speedup          : {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Export memory beyond the encoded file should not grow with history size:
+peak RSS while exporting 1k versus 1M transactions, each measured in a
+fresh child process, next to the size of the file itself.
+
+Run from the project root:  python benchmarks/bench_export.py
+"""
+import sys
+import os
+import multiprocessing
+import resource
+import tempfile
+import time
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+SIZES = (1_000, 1_000_000)
+BATCH = 50_000
+
+
+def seed(db_path):
+    import pandas as pd
+    from src.database import schema
+    from src.database.crud import add_transactions_bulk, create_user
+    schema.DB_PATH = db_path
+    schema.init_db()
+    for n in SIZES:
+        user_id = create_user(f"user_{n}", "hash")
+        for start in range(0, n, BATCH):
+            k = min(BATCH, n - start)
+            add_transactions_bulk(user_id, pd.DataFrame({
+                'date': [f"2025-03-{i % 28 + 1:02d}" for i in range(k)],
+                'amount_paise': [10_000 + i for i in range(k)],
+                'category': ["Food & Dining"] * k,
+                'payment_method': ["UPI"] * k,
+                'notes': [f"note {i}" for i in range(k)],
+            }))
+    schema.close_connections()
+
+
+def run_export(db_path, user_id, fmt, results):
+    from src.database import schema
+    from src.utils.exporter import export_transactions
+    schema.DB_PATH = db_path
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    out = export_transactions(user_id, fmt=fmt)
+    elapsed = time.perf_counter() - start
+    size = out.seek(0, 2)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((elapsed, size, (peak - baseline) / 1024))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        seed(db_path)
+        ctx = multiprocessing.get_context("spawn")
+        for user_id, n in enumerate(SIZES, start=1):
+            for fmt in ("csv", "xlsx"):
+                results = ctx.Queue()
+                proc = ctx.Process(target=run_export, args=(db_path, user_id, fmt, results))
+                proc.start()
+                elapsed, size, grown = results.get()
+                proc.join()
+                print(f"{n:>9,} rows {fmt:4} : {elapsed:6.2f} s  {size / 1e6:7.1f} MB file  +{grown:6.1f} MB peak RSS")
+
+
+if __name__ == "__main__":
+    main()
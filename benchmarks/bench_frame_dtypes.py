@@ -0,0 +1,83 @@
+"""
+Memory and filter cost of the transactions frame on a 1M-row fixture:
+the old object-dtype shape (SELECT *, dates as Python date objects)
+versus the compact typed schema from crud._typed_transactions.
+
+Run from the project root:  python benchmarks/bench_frame_dtypes.py
+"""
+import sys
+import os
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from src.database.crud import _typed_transactions
+
+ROWS = 1_000_000
+REPEATS = 5
+CATEGORIES = ["Food & Dining", "Transportation", "Online Shopping", "Shopping", "Utilities",
+              "Entertainment", "Health", "Education", "Others"]
+MODES = ["Cash", "UPI", "Card", "Bank Transfer"]
+
+
+def raw_frame():
+    """What pd.read_sql hands back: strings and int64 everywhere."""
+    rng = np.random.default_rng(7)
+    days = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 5 * 365, ROWS), unit="D")
+    return pd.DataFrame({
+        'id': np.arange(1, ROWS + 1),
+        'user_id': 1,
+        'amount_paise': rng.integers(100, 500_000, ROWS),
+        'category_id': rng.integers(1, len(CATEGORIES) + 1, ROWS),
+        'category': np.array(CATEGORIES, dtype=object)[rng.integers(0, len(CATEGORIES), ROWS)],
+        'payment_method': np.array(MODES, dtype=object)[rng.integers(0, len(MODES), ROWS)],
+        'date': days.strftime("%Y-%m-%d"),
+        'notes': [f"note {i % 5000}" for i in range(ROWS)],
+        'created_at': "2025-01-01 10:00:00",
+    })
+
+
+def old_shape(raw):
+    df = raw.copy()
+    df['date'] = pd.to_datetime(df['date']).dt.date  # what the pages used to do
+    df['amount'] = df['amount_paise'] / 100
+    return df
+
+
+def new_shape(raw):
+    return _typed_transactions(raw.drop(columns=['user_id', 'created_at']))
+
+
+def timed(fn):
+    fn()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+
+def main():
+    raw = raw_frame()
+    old, new = old_shape(raw), new_shape(raw)
+    start, end = date(2023, 1, 1), date(2023, 12, 31)
+    ts_start, ts_end = pd.Timestamp(start), pd.Timestamp(end)
+
+    old_mb = old.memory_usage(deep=True).sum() / 1e6
+    new_mb = new.memory_usage(deep=True).sum() / 1e6
+    old_ms = timed(lambda: old[(old['date'] >= start) & (old['date'] <= end)
+                               & (old['category'] == "Health") & (old['payment_method'] == "UPI")])
+    new_ms = timed(lambda: new[(new['date'] >= ts_start) & (new['date'] <= ts_end)
+                               & (new['category'] == "Health") & (new['payment_method'] == "UPI")])
+
+    print(f"rows             : {ROWS:>10,}")
+    print(f"memory  old/new  : {old_mb:8.1f} MB / {new_mb:6.1f} MB  ({old_mb / new_mb:.1f}x smaller)")
+    print(f"filter  old/new  : {old_ms:8.1f} ms / {new_ms:6.1f} ms  ({old_ms / new_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Bulk statement import: 100k CSV rows through importer.import_statement,
+chunked parsing plus one executemany transaction per chunk.
+
+Run from the project root:  python benchmarks/bench_import.py
+"""
+import sys
+import os
+import io
+import tempfile
+import time
+import tracemalloc
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from src.database import schema
+
+ROWS = 100_000
+
+
+def statement():
+    lines = ["Txn Date,Narration,Withdrawal Amt,Mode"]
+    lines += [f'{i % 28 + 1:02d}/03/2025,"UPI, shop {i}","1,{i % 1000}.50",UPI' for i in range(ROWS)]
+    return io.BytesIO("\n".join(lines).encode())
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        schema.DB_PATH = os.path.join(tmp, "bench.db")
+        schema.init_db()
+        from src.database.crud import create_user
+        from src.utils.importer import guess_mapping, import_statement, read_headers
+        user_id = create_user("bench_user", "hash")
+
+        file = statement()
+        mapping = guess_mapping(read_headers(file, "bench.csv"))
+        start = time.perf_counter()
+        result = import_statement(user_id, file, "bench.csv", mapping)
+        elapsed = time.perf_counter() - start
+
+        # Second run under tracemalloc (slower) just to report peak memory
+        tracemalloc.start()
+        import_statement(user_id, file, "bench.csv", mapping)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        schema.close_connections()
+
+    print(f"rows imported    : {result.imported:8d}")
+    print(f"elapsed          : {elapsed:8.2f} s")
+    print(f"throughput       : {result.imported / elapsed:8.0f} rows/s")
+    print(f"peak python heap : {peak / 1e6:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
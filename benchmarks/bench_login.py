@@ -0,0 +1,92 @@
+"""
+A burst of 50 concurrent logins: bcrypt in each caller's thread (as the
+login form used to run it) versus security.authenticate on the bounded
+hashing pool. Reports p50/p99 login latency, and the p99 of a 5 ms
+render-like Python loop run every 50 ms alongside, at FINANCE_BCRYPT_ROUNDS.
+The pool does not make a login faster: it lowers render latency and
+makes the slowest logins wait longer.
+
+Run from the project root:  python benchmarks/bench_login.py
+"""
+import sys
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+import bcrypt
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from src.database import schema
+from src.database.crud import create_user, get_user_by_username
+from src.auth import security
+
+LOGINS = 50
+PASSWORD = "correct horse battery"
+
+
+def inline_login(username):
+    user = get_user_by_username(username)
+    return bcrypt.checkpw(PASSWORD.encode(), user['password_hash'].encode())
+
+
+def pooled_login(username):
+    return security.authenticate(username, PASSWORD) is not None
+
+
+def render_loop(stop, samples):
+    while not stop.is_set():
+        start = time.perf_counter()
+        total = 0
+        while time.perf_counter() - start < 0.005:
+            total += 1
+        samples.append(time.perf_counter() - start)
+        time.sleep(0.045)
+
+
+def burst(login):
+    latencies, renders = [], []
+    stop = threading.Event()
+    renderer = threading.Thread(target=render_loop, args=(stop, renders))
+    renderer.start()
+
+    def one(i):
+        start = time.perf_counter()
+        assert login(f"user_{i}")
+        latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=one, args=(i,)) for i in range(LOGINS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stop.set()
+    renderer.join()
+    return latencies, renders
+
+
+def p(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        schema.DB_PATH = os.path.join(tmp, "bench.db")
+        schema.init_db()
+        hashed = security.hash_password(PASSWORD)
+        for i in range(LOGINS):
+            create_user(f"user_{i}", hashed)
+
+        print(f"bcrypt cost {security.BCRYPT_ROUNDS}, {security.HASH_WORKERS} hashing workers, {os.cpu_count()} CPUs")
+        for name, login in (("inline", inline_login), ("pooled", pooled_login)):
+            latencies, renders = burst(login)
+            print(f"{name}: login p50 {p(latencies, 50):7.0f} ms  p99 {p(latencies, 99):7.0f} ms   "
+                  f"render p99 {p(renders, 99):6.1f} ms")
+        schema.close_connections()
+
+
+if __name__ == "__main__":
+    main()
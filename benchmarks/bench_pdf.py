@@ -0,0 +1,50 @@
+"""
+PDF report rendering for a 50k-row ledger (the REPORT_MAX_ROWS cap):
+wall time per stage and peak RSS growth.
+
+Run from the project root:  python benchmarks/bench_pdf.py
+"""
+import sys
+import os
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from src.utils import pdf_gen
+
+ROWS = pdf_gen.REPORT_MAX_ROWS
+
+
+def ledger(n):
+    return pd.DataFrame({
+        'date': pd.Timestamp("2025-01-01") + pd.to_timedelta(np.arange(n) % 365, unit="D"),
+        'category': pd.Categorical(["🍽️ Food & Dining", "Health", "Transportation"] * (n // 3 + 1))[:n],
+        'payment_method': "UPI",
+        'amount': np.arange(n) * 1.25,
+        'notes': [f"note ☕ {i}" for i in range(n)],
+    })
+
+
+def main():
+    df = ledger(ROWS)
+    pdf_gen.resolve_fonts()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    report = pdf_gen.generate_expense_pdf(df, df['amount'].sum())
+    elapsed = time.perf_counter() - start
+    grown = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024
+
+    print(f"rows             : {ROWS:8d}")
+    print(f"render           : {elapsed:8.2f} s")
+    print(f"report size      : {len(report) / 1e6:8.1f} MB")
+    print(f"peak RSS growth  : {grown:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Searching transaction notes: the trigram FTS5 index versus a substring
+scan of the same user's notes, at 10k and 1M rows.
+
+Run from the project root:  python benchmarks/bench_search.py
+"""
+import sys
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from src.database import schema
+from src.database.crud import add_transactions_bulk, create_user, search_transactions
+
+SIZES = (10_000, 1_000_000)
+BATCH = 50_000
+MERCHANTS = ["Swiggy order", "Uber ride", "Amazon purchase", "Electricity bill", "Pharmacy", "Zomato dinner"]
+QUERIES = ("swiggy", "bill", "ride 4242")
+REPEAT = 20
+
+
+def seed(user_id, n):
+    for start in range(0, n, BATCH):
+        k = min(BATCH, n - start)
+        add_transactions_bulk(user_id, pd.DataFrame({
+            'date': [f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}" for i in range(k)],
+            'amount_paise': [10_000 + i for i in range(k)],
+            'category': ["Food & Dining"] * k,
+            'payment_method': ["UPI"] * k,
+            'notes': [f"{MERCHANTS[(start + i) % len(MERCHANTS)]} {start + i}" for i in range(k)],
+        }))
+
+
+def scan(user_id, text):
+    with schema.borrow_connection() as conn:
+        return conn.execute("""
+            SELECT id FROM transactions WHERE user_id = ? AND instr(lower(notes), lower(?)) > 0
+            ORDER BY date DESC, id DESC LIMIT 50
+        """, (user_id, text)).fetchall()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        schema.DB_PATH = os.path.join(tmp, "bench.db")
+        schema.init_db()
+        for n in SIZES:
+            user_id = create_user(f"user_{n}", "hash")
+            seed(user_id, n)
+            for text in QUERIES:
+                indexed = timed(lambda: search_transactions(user_id, text))
+                scanned = timed(lambda: scan(user_id, text))
+                print(f"{n:>9,} rows  '{text}': index {indexed:7.1f} ms   scan {scanned:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Trend aggregation on a 1M-row frame: the pages' original pandas code
+(groupby on Python date objects, per-row/per-bucket strftime) versus what
+spending_trend does now (SpendRangeIndex.trend plus per-bucket labels),
+at daily and monthly granularity.
+
+Run from the project root:  python benchmarks/bench_trends.py
+"""
+import sys
+import os
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from src.analytics.range_index import SpendRangeIndex
+from src.analytics.trends import bucket_labels
+
+ROWS = 1_000_000
+REPEATS = 3
+RANGES = {'day': (date(2024, 5, 1), date(2024, 6, 29)), 'month': (date(2020, 1, 1), date(2024, 12, 31))}
+
+
+def frame():
+    rng = np.random.default_rng(11)
+    days = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 5 * 365, ROWS), unit="D")
+    df = pd.DataFrame({
+        'date': days,
+        'amount_paise': rng.integers(100, 500_000, ROWS),
+        'category': rng.choice(["Food & Dining", "Health", "Utilities", "Shopping"], ROWS),
+        'payment_method': rng.choice(["Cash", "UPI", "Card"], ROWS),
+    })
+    df['amount'] = df['amount_paise'] / 100
+    return df
+
+
+def original(df, start, end):
+    # As render_dashboard did it: date objects, filter, groupby, strftime
+    df = df.copy()
+    df['date'] = df['date'].dt.date
+    plot_df = df[(df['date'] >= start) & (df['date'] <= end)].copy()
+    if (end - start).days <= 60:
+        daily = plot_df.groupby('date', as_index=False)['amount'].sum()
+        daily['date_str'] = daily['date'].apply(lambda d: d.strftime('%d %b'))
+        return daily
+    plot_df['month_year'] = pd.to_datetime(plot_df['date']).dt.strftime('%b %Y')
+    monthly = plot_df.groupby('month_year', as_index=False)['amount'].sum()
+    monthly['sort_key'] = pd.to_datetime(monthly['month_year'], format='%b %Y')
+    return monthly.sort_values('sort_key')
+
+
+def engine(index, start, end, granularity):
+    trend = index.trend(start, end, granularity)
+    trend['label'] = bucket_labels(trend['bucket'], granularity).to_numpy()
+    return trend
+
+
+def timed(fn):
+    fn()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn()
+    return (time.perf_counter() - start) / REPEATS * 1000, result
+
+
+def main():
+    df = frame()
+    rollup = (df.assign(day=df['date']).groupby(['day', 'category', 'payment_method'], as_index=False)
+                .agg(total_paise=('amount_paise', 'sum'), count=('amount_paise', 'size')))
+    index = SpendRangeIndex(rollup)
+
+    print(f"rows: {ROWS:,}")
+    for granularity, (start, end) in RANGES.items():
+        old_ms, old = timed(lambda: original(df, start, end))
+        new_ms, new = timed(lambda: engine(index, start, end, granularity))
+        assert np.allclose(old['amount'].to_numpy(), new['amount'].to_numpy())
+        print(f"{granularity:5} ({len(new):3} bars) : original {old_ms:8.1f} ms   prefix index {new_ms:5.2f} ms"
+              f" ({old_ms / new_ms:6.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
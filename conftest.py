@@ -0,0 +1,10 @@
+import pytest
+from src.database.cache import data_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_data_cache():
+    # Every test starts a new database whose user ids and generations
+    # restart at 1, so entries cached by an earlier test would match.
+    data_cache.clear()
+    yield
@@ -0,0 +1,139 @@
+"""
+Prefix sums over day ordinals for instant date-range totals.
+
+Built once per user data generation from the daily_spend rollup (one row
+per day/category/mode, however many transactions that is), then every
+[start, end] question is answered from cumulative arrays:
+total and count in O(1), a per-category or per-mode breakdown in
+O(categories), and a day/week/month/year trend in O(buckets).
+Moving a date picker costs nothing that grows with the transaction count.
+"""
+import numpy as np
+import pandas as pd
+from src.database.cache import data_cache
+from src.database.crud import get_generation
+from src.database.schema import borrow_connection
+
+BREAKDOWN_DIMENSIONS = ('category', 'payment_method')
+
+# pandas period of each trend bucket; buckets are labelled by their first
+# day (Monday for weeks), like crud.sum_by
+BUCKET_PERIODS = {'day': 'D', 'week': 'W-SUN', 'month': 'M', 'year': 'Y'}
+
+def _day_number(value):
+    """Days since 1970-01-01 for a date, datetime or Timestamp."""
+    return int(np.datetime64(pd.Timestamp(value).date(), 'D').astype('int64'))
+
+class SpendRangeIndex:
+    """
+    Cumulative spend per day since the user's first spending day.
+    cum[k] holds the total over days [first, first + k), so the total for
+    days i..j (offsets, inclusive) is cum[j + 1] - cum[i]. Breakdowns keep
+    one such row per label. Immutable once built, so the cache can share it.
+    """
+    def __init__(self, rollup):
+        """`rollup` is a frame of day (datetime64), category, payment_method, total_paise, count."""
+        self.empty = rollup.empty
+        days = rollup['day'].to_numpy(dtype='datetime64[D]').astype('int64')
+        self.first = int(days.min()) if not self.empty else 0
+        self.span = int(days.max()) - self.first + 1 if not self.empty else 0
+        offsets = days - self.first
+        totals = rollup['total_paise'].to_numpy(dtype='int64')
+        counts = rollup['count'].to_numpy(dtype='int64')
+
+        self.cum_total = self._cumulate(offsets, totals)
+        self.cum_count = self._cumulate(offsets, counts)
+        self.labels, self.cum_total_by, self.cum_count_by = {}, {}, {}
+        for dim in BREAKDOWN_DIMENSIONS:
+            codes, labels = pd.factorize(rollup[dim], sort=True)
+            self.labels[dim] = labels
+            self.cum_total_by[dim] = self._cumulate(offsets, totals, codes, len(labels))
+            self.cum_count_by[dim] = self._cumulate(offsets, counts, codes, len(labels))
+
+    def _cumulate(self, offsets, values, codes=None, rows=None):
+        # Exact int64 sums; np.add.at rather than bincount, whose weights are float64
+        if codes is None:
+            per_day = np.zeros(self.span, dtype='int64')
+            np.add.at(per_day, offsets, values)
+            return np.concatenate(([0], np.cumsum(per_day)))
+        per_day = np.zeros((rows, self.span), dtype='int64')
+        np.add.at(per_day, (codes, offsets), values)
+        return np.concatenate((np.zeros((rows, 1), dtype='int64'), np.cumsum(per_day, axis=1)), axis=1)
+
+    def _bounds(self, start=None, end=None):
+        """Clamps an inclusive date range to cum positions (lo, hi); lo == hi when empty."""
+        lo = 0 if start is None else min(max(_day_number(start) - self.first, 0), self.span)
+        hi = self.span if end is None else min(max(_day_number(end) - self.first + 1, 0), self.span)
+        return lo, max(lo, hi)
+
+    def total(self, start=None, end=None):
+        """Spend in paise over [start, end] (either may be None for open)."""
+        lo, hi = self._bounds(start, end)
+        return int(self.cum_total[hi] - self.cum_total[lo])
+
+    def count(self, start=None, end=None):
+        lo, hi = self._bounds(start, end)
+        return int(self.cum_count[hi] - self.cum_count[lo])
+
+    def breakdown(self, start=None, end=None, dim='category'):
+        """
+        Spend per `dim` over [start, end], shaped like crud.sum_by(user_id, [dim]):
+        dim, amount_paise, amount, count; labels with nothing in range are left out.
+        """
+        if dim not in BREAKDOWN_DIMENSIONS:
+            raise ValueError(f"Cannot break down by '{dim}'")
+        lo, hi = self._bounds(start, end)
+        counts = self.cum_count_by[dim][:, hi] - self.cum_count_by[dim][:, lo]
+        df = pd.DataFrame({
+            dim: self.labels[dim],
+            'amount_paise': self.cum_total_by[dim][:, hi] - self.cum_total_by[dim][:, lo],
+            'count': counts,
+        })
+        df = df[counts > 0].reset_index(drop=True)
+        df['amount'] = df['amount_paise'] / 100
+        return df
+
+    def trend(self, start, end, granularity='day'):
+        """
+        Spend per day/week/month/year bucket over [start, end], shaped like
+        crud.sum_by(..., granularity=...): bucket, amount_paise, amount, count.
+        Edge buckets only count the days inside the range; empty buckets are left out.
+        """
+        if granularity not in BUCKET_PERIODS:
+            raise ValueError(f"Unknown granularity '{granularity}'")
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        labels = pd.period_range(start, max(start, end), freq=BUCKET_PERIODS[granularity]).start_time
+
+        # Cum positions of each bucket's first day in range, plus the day after `end`
+        edges = np.maximum(labels.to_numpy(dtype='datetime64[D]'), start.to_datetime64().astype('datetime64[D]'))
+        edges = np.append(edges, (end + pd.Timedelta(days=1)).to_datetime64().astype('datetime64[D]'))
+        # An end before start leaves an empty range, never a negative one
+        positions = np.maximum.accumulate(np.clip(edges.astype('int64') - self.first, 0, self.span))
+        amount_paise = np.diff(self.cum_total[positions])
+        counts = np.diff(self.cum_count[positions])
+        df = pd.DataFrame({'bucket': labels, 'amount_paise': amount_paise, 'count': counts})
+        df = df[df['count'] > 0].reset_index(drop=True)
+        df['amount'] = df['amount_paise'] / 100
+        return df
+
+    def __sizeof__(self):
+        arrays = [self.cum_total, self.cum_count, *self.cum_total_by.values(), *self.cum_count_by.values()]
+        return object.__sizeof__(self) + sum(a.nbytes for a in arrays)
+
+def _read_rollup(user_id):
+    with borrow_connection() as conn:
+        df = pd.read_sql("""
+            SELECT d.day, c.name AS category, d.payment_method, d.total_paise, d.count
+            FROM daily_spend d JOIN categories c ON c.id = d.category_id
+            WHERE d.user_id = ?
+        """, conn, params=[user_id])
+    df['day'] = pd.to_datetime(df['day'], format='%Y-%m-%d')
+    return df
+
+def range_index(user_id):
+    """
+    The user's SpendRangeIndex, from the process-wide data_cache under
+    their current data generation, so any write rebuilds it on next use.
+    """
+    key = ('range_index', user_id, get_generation(user_id))
+    return data_cache.get_or_load(key, lambda: SpendRangeIndex(_read_rollup(user_id)))
@@ -0,0 +1,43 @@
+"""
+Spending trends bucketed by day, week, month or year.
+
+Sums come from the user's SpendRangeIndex; this module picks the bucket
+size for a range and formats labels per bucket, never per row. Buckets
+are labelled by their first day (Monday for weeks), matching crud.sum_by.
+"""
+import numpy as np
+import pandas as pd
+from src.analytics.range_index import range_index
+
+GRANULARITIES = ('day', 'week', 'month', 'year')
+# Ranges up to this many days chart one bar per day, longer ones per month
+DAILY_TREND_MAX_DAYS = 60
+LABEL_FORMATS = {'day': "%d %b", 'week': "%d %b", 'month': "%b %Y", 'year': "%Y"}
+_MONTH_NAMES = np.array(["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], dtype=object)
+
+def trend_granularity(start, end):
+    """The bucket size the trend charts use for [start, end]."""
+    return 'day' if (end - start).days <= DAILY_TREND_MAX_DAYS else 'month'
+
+def bucket_labels(buckets, granularity):
+    """Axis labels for bucket Timestamps in LABEL_FORMATS style, built column-wise."""
+    buckets = pd.Series(pd.to_datetime(buckets)).reset_index(drop=True)
+    month = pd.Series(_MONTH_NAMES[buckets.dt.month.to_numpy() - 1])
+    year = buckets.dt.year.astype(str)
+    if granularity in ('day', 'week'):
+        return buckets.dt.day.astype(str).str.zfill(2) + " " + month
+    if granularity == 'month':
+        return month + " " + year
+    return year
+
+def spending_trend(user_id, start, end, granularity=None):
+    """
+    The dashboard and analytics trend chart data for [start, end].
+    Returns (frame, granularity): the frame has bucket, amount_paise,
+    amount, count and a display 'label'. Served from the user's
+    SpendRangeIndex, so it costs O(buckets) per call.
+    """
+    granularity = granularity or trend_granularity(start, end)
+    trend = range_index(user_id).trend(start, end, granularity)
+    trend['label'] = bucket_labels(trend['bucket'], granularity).to_numpy()
+    return trend, granularity
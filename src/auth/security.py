@@ -1,21 +1,95 @@
+"""
+Password hashing on a small, bounded pool of worker threads.
+
+The caller still blocks on .result() until its hash is done; the pool
+only caps how many hashes run at once (HASH_WORKERS). bcrypt releases
+the GIL, so during a burst of logins the capped hashing leaves cores
+free and other sessions' page reruns stay fast, while the extra logins
+queue and wait longer. It trades worse tail latency for logins for
+lower render latency.
+
+The cost factor for new hashes is BCRYPT_ROUNDS, from
+FINANCE_BCRYPT_ROUNDS. The default of 12 is bcrypt's own and is not
+calibrated for this host. To measure the highest cost that still
+hashes within HASH_TARGET_MS here, run:
+    python -m src.auth.security
+and set FINANCE_BCRYPT_ROUNDS to the result. Stored hashes made at
+another cost are rehashed the next time their user signs in.
+
+Remember-me sessions skip bcrypt altogether: a token is a random selector
+and verifier, the sessions table keeps the selector and a SHA-256 digest
+of the verifier, and restoring one is a primary-key lookup plus a digest
+compare.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
 from src.database.crud import get_user_by_username as db_get_user_username, update_password
+from src.database.crud import add_session, get_session, extend_session, delete_session, delete_user_sessions
 
-def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+BCRYPT_ROUNDS = int(os.environ.get("FINANCE_BCRYPT_ROUNDS", "12"))  # bcrypt's default, not calibrated
+HASH_WORKERS = int(os.environ.get("FINANCE_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_TARGET_MS = 250
 
-def verify_password(password: str, hashed: str) -> bool:
-    if not password or not hashed:
-        return False
+SESSION_TTL_SECONDS = int(os.environ.get("FINANCE_SESSION_DAYS", "30")) * 24 * 3600
+# Sliding expiry: a restore pushes expiry back out to the full TTL, at
+# most once per this many seconds so reruns do not each write
+SESSION_RENEW_SECONDS = 24 * 3600
+
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _check(password, hashed):
     try:
         return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
     except (ValueError, AttributeError):
         return False
 
+def hash_password(password: str, rounds: int = None) -> str:
+    return _hash_pool.submit(_hash, password, rounds or BCRYPT_ROUNDS).result()
+
+def verify_password(password: str, hashed: str) -> bool:
+    if not password or not hashed:
+        return False
+    return _hash_pool.submit(_check, password, hashed).result()
+
+def hash_rounds(hashed: str):
+    """The cost factor of a bcrypt hash ('$2b$12$...' -> 12), or None if it is not one."""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+def needs_rehash(hashed: str) -> bool:
+    return hash_rounds(hashed) != BCRYPT_ROUNDS
+
 def get_user_by_username(username: str):
     return db_get_user_username(username)
 
+def authenticate(username: str, password: str):
+    """
+    Returns the user as a dict when `password` is theirs, else None.
+    A stored hash made at another cost than BCRYPT_ROUNDS is replaced
+    with a fresh one while the plain password is at hand.
+    """
+    user = db_get_user_username(username)
+    if not user:
+        return None
+    user = dict(user)
+    if not verify_password(password, user['password_hash']):
+        return None
+    if needs_rehash(user['password_hash']):
+        user['password_hash'] = hash_password(password)
+        update_password(user['id'], user['password_hash'])
+    return user
+
 def change_password(username: str, current_pass: str, new_pass: str) -> bool:
     """
     Verifies current password and updates to new password.
@@ -24,13 +98,75 @@ def change_password(username: str, current_pass: str, new_pass: str) -> bool:
     user = db_get_user_username(username)
     if not user:
         return False
-    
+
     # User schema: (id, username, email, password_hash, ...)
     stored_hash = user['password_hash'] if isinstance(user, dict) else user[3]
-    
+
     if verify_password(current_pass, stored_hash):
         new_hash = hash_password(new_pass)
         user_id = user['id'] if isinstance(user, dict) else user[0]
-        return update_password(user_id, new_hash)
-        
+        if update_password(user_id, new_hash):
+            # Signed-in devices must log in again with the new password
+            delete_user_sessions(user_id)
+            return True
+
     return False
+
+def _digest(verifier):
+    return hashlib.sha256(verifier.encode('utf-8')).digest()
+
+def issue_session(user_id: int, now: float = None) -> str:
+    """Starts a remember-me session and returns its token ('selector.verifier') for the cookie."""
+    now = int(now if now is not None else time.time())
+    selector, verifier = secrets.token_urlsafe(12), secrets.token_urlsafe(32)
+    add_session(user_id, selector, _digest(verifier), now, now + SESSION_TTL_SECONDS)
+    return f"{selector}.{verifier}"
+
+def restore_session(token: str, now: float = None):
+    """
+    The user ({'id', 'username'}) a live session token belongs to, else None.
+    Renews the expiry when the session is over SESSION_RENEW_SECONDS into its window.
+    """
+    selector, _, verifier = (token or "").partition(".")
+    if not selector or not verifier:
+        return None
+    now = int(now if now is not None else time.time())
+    session = get_session(selector)
+    if session is None or session['expires_at'] <= now:
+        return None
+    if not hmac.compare_digest(session['verifier_hash'], _digest(verifier)):
+        return None
+    if session['expires_at'] - now < SESSION_TTL_SECONDS - SESSION_RENEW_SECONDS:
+        extend_session(selector, now + SESSION_TTL_SECONDS)
+    return {'id': session['user_id'], 'username': session['username']}
+
+def revoke_session(token: str):
+    delete_session((token or "").partition(".")[0])
+
+def revoke_user_sessions(user_id: int):
+    delete_user_sessions(user_id)
+
+def calibrate_rounds(target_ms=HASH_TARGET_MS, rounds=range(10, 16)):
+    """
+    Times one hash per cost factor on this host. Returns (timings, choice):
+    milliseconds per cost, and the highest cost within `target_ms`
+    (the lowest cost tried if none is).
+    """
+    timings = {}
+    for cost in rounds:
+        start = time.perf_counter()
+        _hash("calibration", cost)
+        timings[cost] = (time.perf_counter() - start) * 1000
+        if timings[cost] > target_ms:
+            break  # Each step doubles the work
+    within = [cost for cost, ms in timings.items() if ms <= target_ms]
+    return timings, max(within) if within else min(timings)
+
+if __name__ == "__main__":
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else HASH_TARGET_MS
+    timings, choice = calibrate_rounds(target)
+    for cost, ms in timings.items():
+        print(f"cost {cost:2d}: {ms:7.1f} ms")
+    current = "set by FINANCE_BCRYPT_ROUNDS" if "FINANCE_BCRYPT_ROUNDS" in os.environ else "the uncalibrated default"
+    print(f"FINANCE_BCRYPT_ROUNDS={choice}  (highest cost within {target:.0f} ms; "
+          f"currently {BCRYPT_ROUNDS}, {current})")
@@ -1,4 +1,9 @@
 import streamlit as st
+from src.auth.security import SESSION_TTL_SECONDS, issue_session, restore_session, revoke_session
+
+# Holds the remember-me token. Written from the page, so it cannot be
+# HttpOnly; the server only ever stores a digest of it.
+SESSION_COOKIE = "finance_session"
 
 def init_session_state():
     if "authenticated" not in st.session_state:
@@ -26,13 +31,63 @@ def init_session_state():
     if "otp_verified" not in st.session_state:
         st.session_state.otp_verified = False
 
-def login_user(user_id, username):
+    # A reload or reconnect starts a new session; sign it back in from the cookie
+    if not st.session_state.authenticated and "session_checked" not in st.session_state:
+        st.session_state.session_checked = True
+        _restore_login()
+    _write_session_cookie()
+
+def _restore_login():
+    token = st.context.cookies.get(SESSION_COOKIE)
+    if not token:
+        return
+    user = restore_session(token)
+    if user:
+        st.session_state.authenticated = True
+        st.session_state.user_id = user['id']
+        st.session_state.username = user['username']
+        st.session_state.session_token = token
+        # Slide the browser's expiry along with the server's
+        st.session_state.pending_cookie = (token, SESSION_TTL_SECONDS)
+    else:
+        st.session_state.pending_cookie = ("", 0)  # Expired or revoked
+
+def _write_session_cookie():
+    """Sets or clears the queued cookie (usually from a login/logout on the run before)."""
+    pending = st.session_state.pop('pending_cookie', None)
+    if pending is None:
+        return
+    token, max_age = pending
+    st.html(f"""<script>
+        document.cookie = "{SESSION_COOKIE}={token}; Path=/; Max-Age={max_age}; SameSite=Strict"
+            + (location.protocol === "https:" ? "; Secure" : "");
+    </script>""", unsafe_allow_javascript=True)
+
+def remember_login(user_id, write_now=False):
+    """
+    Issues a remember-me token for this browser. The cookie is written on
+    the next run, or in this one with write_now (for callers that do not
+    rerun, e.g. after change_password revoked the old token).
+    """
+    token = issue_session(user_id)
+    st.session_state.session_token = token
+    st.session_state.pending_cookie = (token, SESSION_TTL_SECONDS)
+    if write_now:
+        _write_session_cookie()
+
+def login_user(user_id, username, remember=False):
     st.session_state.authenticated = True
     st.session_state.user_id = user_id
     st.session_state.username = username
+    if remember:
+        remember_login(user_id)
     st.rerun()
 
 def logout_user():
+    token = st.session_state.pop('session_token', None)
+    if token:
+        revoke_session(token)
+        st.session_state.pending_cookie = ("", 0)
     st.session_state.authenticated = False
     st.session_state.user_id = None
     st.session_state.username = None
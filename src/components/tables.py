@@ -0,0 +1,66 @@
+import streamlit as st
+from functools import partial
+from src.database.crud import count_transactions, page_transactions, HISTORY_PAGE_SIZE
+from src.utils.exporter import EXPORT_FORMATS, MIME_TYPES, export_filename, export_transactions
+
+def render_transaction_pages(user_id, query, key, column_config, page_size=HISTORY_PAGE_SIZE):
+    """
+    Renders the transactions matching `query` one page at a time with
+    Newer/Older buttons. The page cursor lives in session_state under `key`
+    and goes back to the first page whenever the filters change.
+    The total above the table comes from an indexed COUNT, not the page.
+    """
+    state_key = f"{key}_page"
+    state = st.session_state.get(state_key)
+    if state is None or state['query'] != query:
+        state = {'query': query, 'after': None, 'before': None, 'page_no': 1}
+        st.session_state[state_key] = state
+
+    total = count_transactions(user_id, query)
+    page = page_transactions(user_id, query, page_size, after=state['after'], before=state['before'])
+    rows = page['rows']
+    if rows.empty and state['page_no'] > 1:
+        # The page emptied under us (e.g. its rows were deleted); start over
+        del st.session_state[state_key]
+        st.rerun()
+
+    if rows.empty:
+        st.info("No records found.")
+        return
+
+    st.markdown(f"**Found {total} records**")
+    st.dataframe(
+        rows[list(column_config.keys())],
+        column_config=column_config,
+        use_container_width=True,
+        hide_index=True
+    )
+
+    page_count = max(1, -(-total // page_size))
+    c_prev, c_info, c_next = st.columns([1, 2, 1])
+    if c_prev.button("← Newer", key=f"{key}_newer", disabled=page['prev_cursor'] is None, use_container_width=True):
+        state.update(after=None, before=page['prev_cursor'], page_no=state['page_no'] - 1)
+        st.rerun()
+    c_info.markdown(
+        f"<p style='text-align: center; color: #8b949e;'>Page {state['page_no']} of {page_count}</p>",
+        unsafe_allow_html=True
+    )
+    if c_next.button("Older →", key=f"{key}_older", disabled=page['next_cursor'] is None, use_container_width=True):
+        state.update(after=page['next_cursor'], before=None, page_no=state['page_no'] + 1)
+        st.rerun()
+
+def render_export_buttons(user_id, query, key):
+    """
+    CSV/XLSX downloads of every row matching `query`, not just the page on
+    screen. The file is only built when a button is clicked.
+    """
+    cols = st.columns(len(EXPORT_FORMATS))
+    for col, fmt in zip(cols, EXPORT_FORMATS):
+        col.download_button(
+            f"⬇️ Export {fmt.upper()}",
+            data=partial(export_transactions, user_id, query, fmt),
+            file_name=export_filename("view", fmt),
+            mime=MIME_TYPES[fmt],
+            key=f"{key}_export_{fmt}",
+            use_container_width=True
+        )
@@ -0,0 +1,122 @@
+"""
+Budget evaluation for every period type, read from precomputed counters.
+
+Each budget's current window is worked out in SQL from its period:
+Weekly is this Monday-Sunday clamped to the current month, Monthly and
+Yearly are the calendar month/year containing `today`, and Custom uses
+the budget's own start_date/end_date (open-ended when end_date is NULL).
+Spent amounts come from budget_usage, one row per (budget, period start),
+which triggers keep in step with every transaction and budget write
+(migration 8). Reading status is one key lookup per budget; a period that
+has just started has no row yet, which reads as nothing spent.
+
+Repair the counters from the daily_spend rollup with:
+    python -m src.database.budget_engine [user_id ...]
+"""
+import sys
+from datetime import date
+import pandas as pd
+from .crud import _cached
+from .schema import borrow_connection, init_db
+
+# Start/end of the period containing `day` for budget row `b`.
+# PERIOD_START must match the frozen copy in migration 8.
+PERIOD_START = """CASE b.period
+    WHEN 'Weekly' THEN max(date({day}, 'weekday 0', '-6 days'), date({day}, 'start of month'))
+    WHEN 'Monthly' THEN date({day}, 'start of month')
+    WHEN 'Yearly' THEN date({day}, 'start of year')
+    ELSE date(b.start_date)
+END"""
+PERIOD_END = """CASE b.period
+    WHEN 'Weekly' THEN min(date({day}, 'weekday 0'), date({day}, 'start of month', '+1 month', '-1 day'))
+    WHEN 'Monthly' THEN date({day}, 'start of month', '+1 month', '-1 day')
+    WHEN 'Yearly' THEN date({day}, 'start of year', '+1 year', '-1 day')
+    ELSE date(b.end_date)
+END"""
+
+_BUDGET_STATUS_SQL = f"""
+    WITH periods AS (
+        SELECT b.id, b.category, b.period, b.amount_paise,
+               {PERIOD_START.format(day=':today')} AS period_start,
+               {PERIOD_END.format(day=':today')} AS period_end
+        FROM budgets b WHERE b.user_id = :user_id
+    )
+    SELECT p.id, p.category, p.period, p.amount_paise AS limit_paise, p.period_start, p.period_end,
+           COALESCE(u.spent_paise, 0) AS spent_paise
+    FROM periods p
+    LEFT JOIN budget_usage u ON u.budget_id = p.id AND u.period_start = p.period_start
+    ORDER BY p.id
+"""
+
+# Every period's spend for the budgets matching {scope}, from the daily rollup
+_BACKFILL_SQL = f"""
+    INSERT INTO budget_usage (budget_id, period_start, spent_paise)
+    SELECT b.id, {PERIOD_START.format(day='d.day')}, SUM(d.total_paise)
+    FROM budgets b JOIN daily_spend d ON d.user_id = b.user_id
+    WHERE {{scope}}
+      AND (b.category = 'Global' OR d.category_id IN (
+           SELECT id FROM categories WHERE user_id = b.user_id AND name = b.category))
+      AND (b.period != 'Custom' OR (d.day >= date(b.start_date) AND (b.end_date IS NULL OR d.day <= date(b.end_date))))
+    GROUP BY 1, 2
+"""
+
+def budget_status(user_id, today=None):
+    """
+    Spent, remaining and utilization for all of the user's budgets.
+    Returns a DataFrame, one row per budget: id, category, period,
+    period_start/period_end (Timestamps; period_end NaT when open-ended),
+    limit_paise/spent_paise/remaining_paise (exact), limit/spent/remaining
+    (rupees) and utilization (spent / limit, not capped at 1).
+    Cached per (user_id, generation, today) like the crud readers;
+    the read itself is a budget_usage key lookup per budget.
+    """
+    today = today or date.today()
+    return _cached('budget_status', user_id, lambda: _read_budget_status(user_id, today), today)
+
+def _read_budget_status(user_id, today):
+    with borrow_connection() as conn:
+        df = pd.read_sql(_BUDGET_STATUS_SQL, conn, params={'user_id': user_id, 'today': today.isoformat()})
+
+    df['period_start'] = pd.to_datetime(df['period_start'], format='%Y-%m-%d')
+    df['period_end'] = pd.to_datetime(df['period_end'], format='%Y-%m-%d')
+    df['spent_paise'] = df['spent_paise'].astype('int64')
+    df['remaining_paise'] = df['limit_paise'] - df['spent_paise']
+    for col in ('limit', 'spent', 'remaining'):
+        df[col] = df[f'{col}_paise'] / 100
+    df['utilization'] = (df['spent_paise'] / df['limit_paise'].where(df['limit_paise'] > 0)).fillna(0.0)
+    return df
+
+def budget_totals(status):
+    """Sums a budget_status frame into the dashboard's limit/spent/remaining/overspent figures (rupees)."""
+    limit = int(status['limit_paise'].sum())
+    spent = int(status['spent_paise'].sum())
+    return {
+        'limit': limit / 100,
+        'spent': spent / 100,
+        'remaining': max(0, limit - spent) / 100,
+        'overspent': max(0, spent - limit) / 100,
+        'utilization': spent / limit if limit > 0 else 0.0,
+    }
+
+def rebuild_budget_usage(user_ids=None):
+    """
+    Recomputes budget_usage from daily_spend for `user_ids` (all users when
+    None) in one transaction, and bumps their generations so no server
+    process keeps serving cached status. Returns the number of rows written.
+    """
+    users, params = "1", []
+    if user_ids:
+        users, params = f"user_id IN ({', '.join('?' * len(user_ids))})", list(user_ids)
+    with borrow_connection() as conn:
+        conn.execute(f"DELETE FROM budget_usage WHERE budget_id IN (SELECT id FROM budgets WHERE {users})", params)
+        # Counters whose budget no longer exists
+        conn.execute("DELETE FROM budget_usage WHERE budget_id NOT IN (SELECT id FROM budgets)")
+        written = conn.execute(_BACKFILL_SQL.format(scope=f"b.{users}" if user_ids else users), params).rowcount
+        conn.execute(f"UPDATE user_data_version SET generation = generation + 1 WHERE {users}", params)
+        conn.commit()
+    return written
+
+if __name__ == "__main__":
+    init_db()
+    users = [int(arg) for arg in sys.argv[1:]]
+    print(f"Rebuilt {rebuild_budget_usage(users or None)} budget_usage rows")
@@ -0,0 +1,115 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+
+# Process-wide budget shared by every session; override per deployment
+CACHE_MAX_BYTES = int(os.environ.get("FINANCE_CACHE_MAX_MB", "256")) * 1024 * 1024
+CACHE_TTL_SECONDS = float(os.environ.get("FINANCE_CACHE_TTL_SECONDS", "600"))
+
+def sizeof(value):
+    """Approximate in-memory size of a cached value, in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+def _copy(value):
+    # Callers mutate frames (new columns, in-place edits); never hand out the cached object
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+class LRUCache:
+    """
+    Thread-safe LRU cache bounded by total bytes rather than entry count.
+    Entries older than `ttl` seconds are treated as misses. Values larger
+    than the whole budget are returned but never stored.
+    """
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL_SECONDS, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (value, size, stored_at)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and self._clock() - entry[2] > self.ttl:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy(entry[0])
+
+    def put(self, key, value):
+        size = sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return
+            while self.bytes + size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+            self._entries[key] = (value, size, self._clock())
+            self.bytes += size
+
+    def get_or_load(self, key, load):
+        """Returns a copy of the cached value for `key`, calling `load()` on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = load()
+            self.put(key, value)
+            value = _copy(value)
+        return value
+
+    def discard(self, predicate):
+        """Drops every entry whose key satisfies `predicate`."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+# The one cache crud reads through
+data_cache = LRUCache()
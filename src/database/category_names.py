@@ -0,0 +1,26 @@
+import re
+
+# Category names are stored bare; icons live in categories.emoji.
+# Emoji pictographs only, plus the variation selectors, keycap and
+# zero-width joiner that glue multi-codepoint emoji together. Plain
+# arrows and circled numbers are text ('→ Transfers', '①') and stay.
+ICON_CHARS = (
+    "\U0001F000-\U0001FAFF\u2600-\u2775"
+    # Emoji-presentation symbols outside those blocks: ⌚⌛ ⏩-⏺ ➕-➿ ⬅-⭕
+    "\u231A\u231B\u23E9-\u23FA\u2795-\u27BF\u2B05-\u2B55"
+    "\uFE00-\uFE0F\u200D\u20E3"
+)
+ICON_PATTERN = re.compile(f"[{ICON_CHARS}]+")
+
+def icon_pattern(extra_icons=()):
+    """ICON_PATTERN widened with any custom icons (e.g. a user's category emojis)."""
+    extra = sorted({icon for icon in extra_icons if icon and not ICON_PATTERN.fullmatch(icon)}, key=len, reverse=True)
+    if not extra:
+        return ICON_PATTERN
+    return re.compile("|".join([ICON_PATTERN.pattern] + [re.escape(icon) for icon in extra]))
+
+def normalize_category_name(name, pattern=ICON_PATTERN):
+    """Strips icons and collapses whitespace: '🍽️  Food & Dining' -> 'Food & Dining'."""
+    if name is None:
+        return None
+    return " ".join(pattern.sub(" ", str(name)).split())
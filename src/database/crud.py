@@ -1,59 +1,114 @@
-from .schema import get_connection
+from .schema import borrow_connection
+from .cache import data_cache
+from .query import TransactionQuery
+from .money import to_paise, from_paise
+from .category_names import icon_pattern, normalize_category_name
+from dataclasses import replace
 import pandas as pd
-import streamlit as st
 
-# --- Caching (V6: Internal cache clearing) ---
-def _clear_cache():
-    """Invalidates Streamlit's data cache to ensure fresh data load."""
-    st.cache_data.clear()
+# --- Caching (per-user data generations) ---
+# Every write bumps the user's generation inside its own transaction.
+# Cached readers key on (user_id, generation), so a write only retires
+# that user's entries, and other server processes see the bump via SQLite.
+def _bump_generation(cursor, user_id):
+    cursor.execute("""
+        INSERT INTO user_data_version (user_id, generation) VALUES (?, 1)
+        ON CONFLICT (user_id) DO UPDATE SET generation = generation + 1
+    """, (user_id,))
+    # Superseded entries could never hit again; free their bytes now
+    data_cache.discard(lambda key: key[1] == user_id)
+
+def _cached(name, user_id, load, *args):
+    """Reads through the process-wide data_cache under (name, user_id, generation, *args)."""
+    return data_cache.get_or_load((name, user_id, get_generation(user_id), *args), load)
+
+def bump_generation(user_id):
+    """Marks the user's data as changed, for writers that defer the bump (see add_transactions_bulk)."""
+    with borrow_connection() as conn:
+        _bump_generation(conn, user_id)
+        conn.commit()
+
+def get_generation(user_id):
+    """The user's current data generation (0 before their first write)."""
+    with borrow_connection() as conn:
+        row = conn.execute("SELECT generation FROM user_data_version WHERE user_id = ?", (user_id,)).fetchone()
+    return row[0] if row else 0
 
 # --- User Management (V34: Only Username) ---
 def create_user(username, password_hash):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "INSERT INTO users (username, password_hash) VALUES (?, ?)",
-            (username, password_hash)
-        )
-        user_id = cursor.lastrowid
-        init_user_defaults(user_id, cursor)
-        conn.commit()
-        return user_id
-    except Exception as e:
-        print(f"Error creating user: {e}")
-        conn.rollback()
-        return None
-    finally:
-        conn.close()
+    with borrow_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "INSERT INTO users (username, password_hash) VALUES (?, ?)",
+                (username, password_hash)
+            )
+            user_id = cursor.lastrowid
+            init_user_defaults(user_id, cursor)
+            conn.commit()
+            return user_id
+        except Exception as e:
+            print(f"Error creating user: {e}")
+            conn.rollback()
+            return None
 
 # Removed get_user_by_email as per user request (strict username auth)
 
 def get_user_by_username(username):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-    user = cursor.fetchone()
-    conn.close()
-    return user
+    with borrow_connection() as conn:
+        return conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
 
 
 def update_password(user_id, new_password_hash):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("UPDATE users SET password_hash = ? WHERE id = ?", 
-                       (new_password_hash, user_id))
+    with borrow_connection() as conn:
+        try:
+            conn.execute("UPDATE users SET password_hash = ? WHERE id = ?", 
+                         (new_password_hash, user_id))
+            conn.commit()
+            return True
+        except: return False
+
+# --- Remember-me Sessions (tokens are issued by auth.security) ---
+def add_session(user_id, selector, verifier_hash, created_at, expires_at):
+    with borrow_connection() as conn:
+        # The user's expired sessions go whenever they get a new one
+        conn.execute("DELETE FROM sessions WHERE user_id = ? AND expires_at <= ?", (user_id, created_at))
+        conn.execute(
+            "INSERT INTO sessions (selector, verifier_hash, user_id, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (selector, verifier_hash, user_id, created_at, expires_at)
+        )
+        conn.commit()
+
+def get_session(selector):
+    """The session row for `selector` with its user's username, or None."""
+    with borrow_connection() as conn:
+        return conn.execute("""
+            SELECT s.selector, s.verifier_hash, s.user_id, u.username, s.expires_at
+            FROM sessions s JOIN users u ON u.id = s.user_id
+            WHERE s.selector = ?
+        """, (selector,)).fetchone()
+
+def extend_session(selector, expires_at):
+    with borrow_connection() as conn:
+        conn.execute("UPDATE sessions SET expires_at = ? WHERE selector = ?", (expires_at, selector))
+        conn.commit()
+
+def delete_session(selector):
+    with borrow_connection() as conn:
+        conn.execute("DELETE FROM sessions WHERE selector = ?", (selector,))
+        conn.commit()
+
+def delete_user_sessions(user_id):
+    with borrow_connection() as conn:
+        conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
         conn.commit()
-        return True
-    except: return False
-    finally: conn.close()
 
 def init_user_defaults(user_id, cursor=None):
-    conn = None
     if cursor is None:
-        conn = get_connection()
-        cursor = conn.cursor()
+        with borrow_connection() as conn:
+            init_user_defaults(user_id, conn.cursor())
+            conn.commit()
+        return
     
     # V3: Default categories with Emojis
     default_categories = [
@@ -71,230 +126,592 @@ def init_user_defaults(user_id, cursor=None):
         "INSERT INTO categories (user_id, name, emoji) VALUES (?, ?, ?)",
         [(user_id, *cat) for cat in default_categories]
     )
-    
-    if conn:
-        conn.commit()
-        conn.close()
+    _bump_generation(cursor, user_id)
 
 # --- Category Management ---
 def get_categories(user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM categories WHERE user_id = ?", (user_id,))
-    categories = cursor.fetchall()
-    conn.close()
-    return categories
+    def load():
+        with borrow_connection() as conn:
+            return conn.execute("SELECT * FROM categories WHERE user_id = ?", (user_id,)).fetchall()
+    return _cached('categories', user_id, load)
 
 def add_category(user_id, name, emoji):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT INTO categories (user_id, name, emoji) VALUES (?, ?, ?)",
-                       (user_id, name, emoji))
-        conn.commit()
-        return True
-    except: return False
-    finally: conn.close()
+    name = normalize_category_name(name, _user_icon_pattern(user_id))
+    if not name:
+        return False
+    with borrow_connection() as conn:
+        try:
+            conn.execute("INSERT INTO categories (user_id, name, emoji) VALUES (?, ?, ?)",
+                         (user_id, name, emoji))
+            _bump_generation(conn, user_id)
+            conn.commit()
+            return True
+        except: return False
 
 def delete_category(user_id, category_name):
-    conn = get_connection()
-    cursor = conn.cursor()
-    # Deletion Safety (V3 requirement)
-    cursor.execute("SELECT COUNT(*) FROM transactions WHERE user_id = ? AND category = ?", (user_id, category_name))
-    count = cursor.fetchone()[0]
-    if count > 0:
-        conn.close()
-        return False, f"Cannot delete '{category_name}': It is linked to {count} transactions."
-    
-    cursor.execute("DELETE FROM categories WHERE user_id = ? AND name = ?", (user_id, category_name))
-    conn.commit()
-    conn.close()
-    return True, "Category deleted successfully."
+    with borrow_connection() as conn:
+        cursor = conn.cursor()
+        # Deletion Safety (V3 requirement): integer lookup on the category index
+        cursor.execute("""
+            SELECT COUNT(*) FROM transactions
+            WHERE user_id = ? AND category_id IN (SELECT id FROM categories WHERE user_id = ? AND name = ?)
+        """, (user_id, user_id, category_name))
+        count = cursor.fetchone()[0]
+        if count > 0:
+            return False, f"Cannot delete '{category_name}': It is linked to {count} transactions."
+        
+        cursor.execute("DELETE FROM categories WHERE user_id = ? AND name = ?", (user_id, category_name))
+        _bump_generation(cursor, user_id)
+        conn.commit()
+        return True, "Category deleted successfully."
+
+def get_category_counts(user_id):
+    """Returns a Dict mapping category id to its number of transactions."""
+    with borrow_connection() as conn:
+        rows = conn.execute("""
+            SELECT category_id, COUNT(*) FROM transactions
+            WHERE user_id = ? GROUP BY category_id
+        """, (user_id,)).fetchall()
+    return {category_id: count for category_id, count in rows}
+
+def _user_icon_pattern(user_id):
+    """Icon regex for this user: the common emoji ranges plus their own category emojis."""
+    return _cached('icon_pattern', user_id, lambda: icon_pattern(c['emoji'] for c in get_categories(user_id)))
+
+def _resolve_category_id(cursor, user_id, name):
+    """
+    Returns the id of the user's category `name`, creating it if missing.
+    Names are stored without icons, so '🍴 Food & Dining' resolves to 'Food & Dining';
+    a name that is nothing but an icon falls back to 'Others'.
+    """
+    name = normalize_category_name(name, _user_icon_pattern(user_id)) or "Others"
+    cursor.execute("SELECT MIN(id) FROM categories WHERE user_id = ? AND name = ?", (user_id, name))
+    category_id = cursor.fetchone()[0]
+    if category_id is None:
+        cursor.execute("INSERT INTO categories (user_id, name) VALUES (?, ?)", (user_id, name))
+        category_id = cursor.lastrowid
+    return category_id
 
 def get_category_map(user_id):
     """Returns a Dict mapping category name to its Emoji"""
-    cats = get_categories(user_id)
-    return {c['name']: c['emoji'] for c in cats}
+    def load():
+        return {c['name']: c['emoji'] for c in get_categories(user_id)}
+    return _cached('category_map', user_id, load)
+
+# Columns every transaction frame carries; the name is joined back from categories.
+# user_id is implied by the query and created_at is never read, so neither is fetched.
+_TRANSACTION_COLUMNS = """
+    t.id, t.amount_paise, t.category_id, c.name AS category,
+    t.payment_method, t.date, t.notes
+"""
+
+def _typed_transactions(df):
+    """
+    Gives a raw transactions frame its compact schema: int32 ids, exact
+    int64 paise, categorical category/payment_method and day-normalized
+    datetime64 dates, so pages filter with Timestamp bounds, not objects.
+    """
+    df['id'] = df['id'].astype('int32')
+    df['category_id'] = df['category_id'].astype('int32')
+    # Exact integer paise for arithmetic; rupees only for display
+    df['amount_paise'] = df['amount_paise'].astype('int64')
+    df['amount'] = df['amount_paise'] / 100
+    df['date'] = pd.to_datetime(df['date'], format='ISO8601').dt.normalize()
+    # Names and modes repeat across rows; group-bys and filters work on the codes
+    df['category'] = df['category'].astype('category')
+    df['payment_method'] = df['payment_method'].astype('category')
+    return df
 
 def load_transactions_df(user_id, filters=None):
     """
-    Loads transactions from SQL. 
-    Strictly reads fresh data to ensure deployment sync.
+    Loads transactions from SQL through the process-wide data_cache, keyed
+    per (user_id, generation) so any write by this user (from any server
+    process) forces a fresh read. Callers get their own copy.
+    `filters` is a TransactionQuery (or the legacy dict of the same keys);
+    it is applied in SQL so only matching rows leave the database.
     """
-    conn = get_connection()
-    try:
-        query = "SELECT * FROM transactions WHERE user_id = ?"
-        params = [user_id]
-        
-        if filters:
-            if 'start_date' in filters and filters['start_date']:
-                query += " AND date >= ?"
-                params.append(filters['start_date'])
-            if 'end_date' in filters and filters['end_date']:
-                query += " AND date <= ?"
-                params.append(filters['end_date'])
-            if 'category' in filters and filters['category'] and filters['category'] != "All":
-                query += " AND category = ?"
-                params.append(filters['category'])
-            if 'payment_mode' in filters and filters['payment_mode'] and filters['payment_mode'] != "All":
-                query += " AND payment_method = ?"
-                params.append(filters['payment_mode'])
-        
-        query += " ORDER BY date DESC"
+    query = TransactionQuery.from_filters(filters)
+    return _cached('transactions', user_id, lambda: _read_transactions(user_id, query), query)
+
+def _read_transactions(user_id, query):
+    where, params = query.where_clause(user_id, alias="t")
+    with borrow_connection() as conn:
+        query = f"""
+            SELECT {_TRANSACTION_COLUMNS}
+            FROM transactions t JOIN categories c ON c.id = t.category_id
+            WHERE {where} ORDER BY t.date DESC
+        """
         df = pd.read_sql(query, conn, params=params)
         
-        if not df.empty:
-            df['date'] = pd.to_datetime(df['date'])
-            
-        return df
-    finally:
-        conn.close()
+    return _typed_transactions(df)
 
-    return df
+# --- Keyset pagination (newest first, on (date, id)) ---
+HISTORY_PAGE_SIZE = 50
+
+def count_transactions(user_id, filters=None):
+    """Number of transactions matching `filters`, counted off the (user_id, ...) indexes."""
+    where, params = TransactionQuery.from_filters(filters).where_clause(user_id)
+    with borrow_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM transactions WHERE {where}", params).fetchone()[0]
+
+def page_transactions(user_id, filters=None, page_size=HISTORY_PAGE_SIZE, after=None, before=None):
+    """
+    Loads one page of transactions, newest first.
+    Pages are addressed by keyset cursors, a (date, id) pair taken from the
+    edge rows of the previous page, so each page costs one index range read
+    however deep the user has paged. Pass `after` (a page's next_cursor) for
+    older rows or `before` (its prev_cursor) for newer ones; neither gives
+    the first page.
+    Returns a Dict with 'rows' (a frame shaped like load_transactions_df),
+    'next_cursor' and 'prev_cursor' (None at either end).
+    """
+    where, params = TransactionQuery.from_filters(filters).where_clause(user_id, alias="t")
+    if before is not None:
+        where += " AND (t.date, t.id) > (?, ?)"
+        params += list(before)
+        order = "t.date ASC, t.id ASC"
+    else:
+        if after is not None:
+            where += " AND (t.date, t.id) < (?, ?)"
+            params += list(after)
+        order = "t.date DESC, t.id DESC"
+
+    with borrow_connection() as conn:
+        # One extra row tells whether another page follows in this direction
+        df = pd.read_sql(f"""
+            SELECT {_TRANSACTION_COLUMNS}
+            FROM transactions t JOIN categories c ON c.id = t.category_id
+            WHERE {where} ORDER BY {order} LIMIT ?
+        """, conn, params=params + [page_size + 1])
+
+    more = len(df) > page_size
+    df = df.iloc[:page_size]
+    if before is not None:
+        df = df.iloc[::-1]
+    df = df.reset_index(drop=True)
+
+    cursors = list(zip(df['date'], df['id'].astype(int)))
+    if before is not None:
+        prev_cursor = cursors[0] if more and cursors else None
+        next_cursor = cursors[-1] if cursors else None
+    else:
+        prev_cursor = cursors[0] if after is not None and cursors else None
+        next_cursor = cursors[-1] if more else None
+
+    return {'rows': _typed_transactions(df), 'next_cursor': next_cursor, 'prev_cursor': prev_cursor}
+
+# --- Notes search (trigram FTS5 index, migration 9) ---
+SEARCH_LIMIT = 50
+# Trigram matching needs at least 3 characters; shorter text is scanned
+SEARCH_MIN_FTS_CHARS = 3
+# Newest index hits that get ranked. bm25 needs a pass over every hit,
+# which grows with the history; for a single phrase it only rewards more
+# occurrences in a shorter note, so that order is applied to these instead.
+SEARCH_CANDIDATES = 500
+
+def notes_owner(user_id):
+    """The index's `owner` value for a user's rows; the '#'s keep user 12 from matching user 112."""
+    return f"#{user_id}#"
+
+def _has_notes_index(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transaction_notes_fts'"
+    ).fetchone() is not None
+
+def search_transactions(user_id, text, limit=SEARCH_LIMIT):
+    """
+    Transactions whose notes contain `text` (case-insensitive substring),
+    best matches first: most occurrences, then shortest note, then newest.
+    Returns a frame shaped like load_transactions_df with at most `limit` rows.
+    Served by the trigram index and ranked over the newest SEARCH_CANDIDATES
+    hits, so latency stays flat as the history grows.
+    """
+    text = " ".join(str(text or "").split())
+    if not text:
+        limit = 0  # Same empty, typed frame as a search with no hits
+
+    with borrow_connection() as conn:
+        if len(text) >= SEARCH_MIN_FTS_CHARS and _has_notes_index(conn):
+            # Quoted as one phrase, so the user's text is never FTS syntax.
+            # ANDed with the owner inside the index, so the candidate LIMIT
+            # only ever counts this user's rows.
+            phrase = '"' + text.replace('"', '""') + '"'
+            match = f'owner : "{notes_owner(user_id)}" AND notes : {phrase}'
+            df = pd.read_sql(f"""
+                WITH hits AS (
+                    SELECT rowid AS id FROM transaction_notes_fts
+                    WHERE transaction_notes_fts MATCH ?
+                    ORDER BY rowid DESC LIMIT ?
+                )
+                SELECT {_TRANSACTION_COLUMNS}
+                FROM hits h
+                JOIN transactions t ON t.id = h.id AND t.user_id = ?
+                JOIN categories c ON c.id = t.category_id
+                ORDER BY length(t.notes) - length(replace(lower(t.notes), lower(?), '')) DESC,
+                         length(t.notes), t.date DESC, t.id DESC
+                LIMIT ?
+            """, conn, params=[match, SEARCH_CANDIDATES, user_id, text, limit])
+        else:
+            df = pd.read_sql(f"""
+                SELECT {_TRANSACTION_COLUMNS}
+                FROM transactions t JOIN categories c ON c.id = t.category_id
+                WHERE t.user_id = ? AND instr(lower(t.notes), lower(?)) > 0
+                ORDER BY t.date DESC, t.id DESC LIMIT ?
+            """, conn, params=[user_id, text, limit])
+    return _typed_transactions(df)
+
+FIND_LIMIT = 20
+# 'YYYY-MM-DD | ₹123.45 | first 40 characters of the notes'
+_LABEL_SQL = "date(t.date) || ' | ₹' || printf('%.2f', t.amount_paise / 100.0) || ' | ' || substr(COALESCE(t.notes, ''), 1, 40)"
+
+def find_transactions(user_id, category, mode=None, amount_range=None, date=None, limit=FIND_LIMIT):
+    """
+    The user's transactions in `category`, optionally narrowed to a payment
+    `mode`, an `amount_range` (low, high) in rupees with either end None,
+    and a single `date`. Returns a dict of id -> short label, newest first,
+    with at most `limit` entries. Filters go through TransactionQuery, so
+    the (user_id, category_id, date) index serves the lookup.
+    """
+    low, high = amount_range or (None, None)
+    query = TransactionQuery(start_date=date, end_date=date, category=category,
+                             payment_mode=mode, min_amount=low, max_amount=high)
+    with borrow_connection() as conn:
+        category_ids = conn.execute("SELECT id FROM categories WHERE user_id = ? AND name = ?",
+                                    (user_id, query.category)).fetchall()
+        if not category_ids:
+            return {}
+        if len(category_ids) == 1:
+            # An id equality walks the index in date order; the name subquery
+            # would leave the planner scanning every row by date instead
+            query = replace(query, category_id=category_ids[0][0])
+        where, params = query.where_clause(user_id, alias="t")
+        rows = conn.execute(f"""
+            SELECT t.id, {_LABEL_SQL} FROM transactions t
+            WHERE {where} ORDER BY t.date DESC, t.id DESC LIMIT ?
+        """, [*params, limit]).fetchall()
+    return dict(rows)
+
+def transaction_labels(user_id, ids):
+    """Labels as find_transactions makes them for `ids`, in that order; ids that no longer exist are left out."""
+    ids = [int(i) for i in ids]
+    if not ids:
+        return {}
+    with borrow_connection() as conn:
+        rows = dict(conn.execute(f"""
+            SELECT t.id, {_LABEL_SQL} FROM transactions t
+            WHERE t.user_id = ? AND t.id IN ({', '.join('?' * len(ids))})
+        """, [user_id, *ids]).fetchall())
+    return {i: rows[i] for i in ids if i in rows}
+
+def has_transactions(user_id):
+    with borrow_connection() as conn:
+        row = conn.execute("SELECT 1 FROM transactions WHERE user_id = ? LIMIT 1", (user_id,)).fetchone()
+    return row is not None
+
+# --- Aggregation (V7: computed in SQL, only buckets leave the database) ---
+SUM_DIMENSIONS = ('category', 'payment_method')
+
+# SQLite expression and pandas parse format per time bucket
+BUCKET_EXPRESSIONS = {
+    'day': ("date(date)", "%Y-%m-%d"),
+    'week': ("date(date, 'weekday 0', '-6 days')", "%Y-%m-%d"),  # Monday of the week
+    'month': ("strftime('%Y-%m-01', date)", "%Y-%m-%d"),
+    'year': ("strftime('%Y-01-01', date)", "%Y-%m-%d"),
+}
+
+def sum_by(user_id, dims=(), start=None, end=None, granularity=None, filters=None):
+    """
+    Sums spending grouped by `dims` (any of SUM_DIMENSIONS) and optionally
+    bucketed by `granularity` ('day', 'week', 'month', 'year').
+    Returns a DataFrame with the dims, a 'bucket' Timestamp column when
+    bucketed, plus 'amount_paise' (exact), 'amount' (rupees) and 'count'.
+    `start`/`end` override the
+    period of `filters` (a TransactionQuery). Cached like load_transactions_df.
+    """
+    dims = list(dims)
+    unknown = set(dims) - set(SUM_DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Cannot group by {sorted(unknown)}")
+    if granularity is not None and granularity not in BUCKET_EXPRESSIONS:
+        raise ValueError(f"Unknown granularity '{granularity}'")
+
+    query = TransactionQuery.from_filters(filters)
+    if start is not None or end is not None:
+        query = replace(query, start_date=start or query.start_date, end_date=end or query.end_date)
+    dims = tuple(dims)
+    return _cached('sum_by', user_id, lambda: _read_sum_by(user_id, dims, granularity, query), dims, granularity, query)
+
+def _read_sum_by(user_id, dims, granularity, query):
+    where, params = query.where_clause(user_id)
+
+    # Group on the integer category_id; names are joined onto the buckets afterwards
+    group_cols = ['category_id' if d == 'category' else d for d in dims]
+    select_cols = list(group_cols)
+    if granularity:
+        select_cols.append(f"{BUCKET_EXPRESSIONS[granularity][0]} AS bucket")
+        group_cols.append("bucket")
+
+    sql = f"SELECT {', '.join(select_cols + ['SUM(amount_paise) AS amount_paise', 'COUNT(*) AS count'])} FROM transactions WHERE {where}"
+    if group_cols:
+        sql += f" GROUP BY {', '.join(group_cols)}"
+    if 'category' in dims:
+        sql = f"SELECT c.name AS category, agg.* FROM ({sql}) agg JOIN categories c ON c.id = agg.category_id"
+    if group_cols:
+        order_cols = ['category' if c == 'category_id' else c for c in group_cols]
+        sql += f" ORDER BY {', '.join(order_cols)}"
+
+    with borrow_connection() as conn:
+        df = pd.read_sql(sql, conn, params=params)
+
+    if not group_cols:
+        # A bare aggregate always yields one row; drop it when nothing matched
+        df = df[df['count'] > 0]
+    df['amount_paise'] = df['amount_paise'].fillna(0).astype('int64')
+    df['amount'] = df['amount_paise'] / 100
+    if granularity:
+        df['bucket'] = pd.to_datetime(df['bucket'], format=BUCKET_EXPRESSIONS[granularity][1])
+    return df.reset_index(drop=True)
+
+def get_spend_summary(user_id, start, end=None, category=None):
+    """
+    Total, count and largest single expense between `start` and `end`
+    (inclusive), read from the daily_spend rollup so the cost depends on
+    the number of days rather than the number of transactions.
+    `category` of None or "Global" means all categories.
+    """
+    query = "SELECT SUM(total_paise), SUM(count), MAX(max_paise) FROM daily_spend WHERE user_id = ? AND day >= ?"
+    params = [user_id, start.isoformat()]
+    if end is not None:
+        query += " AND day <= ?"
+        params.append(end.isoformat())
+    if category not in (None, "Global"):
+        query += " AND category_id IN (SELECT id FROM categories WHERE user_id = ? AND name = ?)"
+        params.extend([user_id, category])
+    with borrow_connection() as conn:
+        total_paise, count, max_paise = conn.execute(query, params).fetchone()
+    return {
+        'total': from_paise(total_paise or 0),
+        'count': count or 0,
+        'max_amount': from_paise(max_paise or 0),
+    }
+
+# --- Export (streamed in fixed-size chunks, never a whole-history frame) ---
+EXPORT_CHUNK_ROWS = 5_000
+
+# Header and SELECT per exportable table. Transaction headers match the
+# importer's column aliases so an exported file imports back unchanged.
+EXPORT_TABLES = {
+    'transactions': (
+        ('Date', 'Category', 'Payment Mode', 'Amount', 'Description'),
+        """SELECT t.date, c.name, t.payment_method, t.amount_paise / 100.0, t.notes
+           FROM transactions t JOIN categories c ON c.id = t.category_id
+           WHERE {where} ORDER BY t.date DESC, t.id DESC"""
+    ),
+    'budgets': (
+        ('Category', 'Period', 'Amount', 'Start Date', 'End Date'),
+        """SELECT category, period, amount_paise / 100.0, start_date, end_date
+           FROM budgets WHERE user_id = ? ORDER BY id"""
+    ),
+    'categories': (
+        ('Name', 'Emoji'),
+        "SELECT name, emoji FROM categories WHERE user_id = ? ORDER BY id"
+    ),
+}
+
+def iter_export_rows(user_id, table, filters=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yields one of EXPORT_TABLES as lists of at most `chunk_rows` tuples,
+    read off a single cursor with fetchmany. `filters` (a TransactionQuery)
+    applies to transactions only. A pooled connection is held across
+    yields and only returned when the iterator is exhausted or closed, so
+    callers that may stop early wrap it in contextlib.closing.
+    """
+    _, sql = EXPORT_TABLES[table]
+    if table == 'transactions':
+        where, params = TransactionQuery.from_filters(filters).where_clause(user_id, alias="t")
+        sql = sql.format(where=where)
+    else:
+        params = [user_id]
+    with borrow_connection() as conn:
+        cursor = conn.execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yield [tuple(r) for r in rows]
+        finally:
+            cursor.close()
 
 # --- Transaction Management ---
 def add_transaction(user_id, amount, category, payment, date, notes):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "INSERT INTO transactions (user_id, amount, category, payment_method, date, notes) VALUES (?, ?, ?, ?, ?, ?)",
-            (user_id, amount, category, payment, date, notes)
+    with borrow_connection() as conn:
+        try:
+            category_id = _resolve_category_id(conn.cursor(), user_id, category)
+            conn.execute(
+                "INSERT INTO transactions (user_id, amount_paise, category_id, payment_method, date, notes) VALUES (?, ?, ?, ?, ?, ?)",
+                (user_id, to_paise(amount), category_id, payment, date, notes)
+            )
+            _bump_generation(conn, user_id)
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error adding transaction: {e}")
+            return False
+
+def add_transactions_bulk(user_id, rows, bump=True):
+    """
+    Inserts many transactions in a single transaction with executemany.
+    `rows` is a frame of date, amount_paise, category, payment_method and
+    notes (see utils.importer.clean_chunk); unknown categories are created.
+    A caller writing several batches passes bump=False and calls
+    bump_generation once after the last. Returns the number of rows inserted.
+    """
+    with borrow_connection() as conn:
+        cursor = conn.cursor()
+        category_ids = {name: _resolve_category_id(cursor, user_id, name) for name in rows['category'].unique()}
+        index_notes = _has_notes_index(conn)
+        if index_notes:
+            # Pauses the per-row notes trigger; read last_id only once this
+            # transaction holds the write lock (see migration 9)
+            cursor.execute("INSERT INTO notes_index_paused (id) VALUES (1)")
+            last_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+        cursor.executemany(
+            "INSERT INTO transactions (user_id, amount_paise, category_id, payment_method, date, notes) VALUES (?, ?, ?, ?, ?, ?)",
+            zip(
+                [user_id] * len(rows),
+                rows['amount_paise'].astype(int).tolist(),
+                rows['category'].map(category_ids).tolist(),
+                rows['payment_method'].tolist(),
+                rows['date'].tolist(),
+                rows['notes'].tolist(),
+            )
         )
+        if index_notes:
+            cursor.execute("""
+                INSERT INTO transaction_notes_fts (rowid, notes, owner)
+                SELECT id, notes, ? FROM transactions WHERE id > ?
+            """, (notes_owner(user_id), last_id))
+            cursor.execute("DELETE FROM notes_index_paused")
+        if bump:
+            _bump_generation(cursor, user_id)
         conn.commit()
-        _clear_cache() # Ensure fresh load on next page visit
-        return True
-    except Exception as e:
-        print(f"Error adding transaction: {e}")
-        return False
-    finally:
-        conn.close()
+        return len(rows)
 
 def delete_transaction(transaction_id, user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM transactions WHERE id = ? AND user_id = ?", (transaction_id, user_id))
-        conn.commit()
-        _clear_cache() # V6: Invalidate cache on delete
-        return True
-    except: return False
-    finally: conn.close()
+    with borrow_connection() as conn:
+        try:
+            conn.execute("DELETE FROM transactions WHERE id = ? AND user_id = ?", (transaction_id, user_id))
+            _bump_generation(conn, user_id)
+            conn.commit()
+            return True
+        except: return False
 
 # --- Budget Management ---
 def get_budgets(user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM budgets WHERE user_id = ?", (user_id,))
-    budgets = cursor.fetchall()
-    conn.close()
-    return budgets
+    with borrow_connection() as conn:
+        return conn.execute("""
+            SELECT id, user_id, category, amount_paise / 100.0 AS amount, amount_paise,
+                   period, start_date, end_date
+            FROM budgets WHERE user_id = ?
+        """, (user_id,)).fetchall()
 
 def add_budget(user_id, category, amount, period, start_date, end_date=None):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        # Check if exists
-        cursor.execute(
-            "SELECT id FROM budgets WHERE user_id = ? AND category = ? AND period = ?",
-            (user_id, category, period)
-        )
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update
-            cursor.execute(
-                "UPDATE budgets SET amount = ?, start_date = ?, end_date = ? WHERE id = ?",
-                (amount, start_date, end_date, existing[0])
-            )
-        else:
-            # Insert
+    category = normalize_category_name(category, _user_icon_pattern(user_id))
+    with borrow_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            # Check if exists
             cursor.execute(
-                "INSERT INTO budgets (user_id, category, amount, period, start_date, end_date) VALUES (?, ?, ?, ?, ?, ?)",
-                (user_id, category, amount, period, start_date, end_date)
+                "SELECT id FROM budgets WHERE user_id = ? AND category = ? AND period = ?",
+                (user_id, category, period)
             )
-        conn.commit()
-        return True
-    except Exception as e: 
-        print(f"Error adding budget: {e}")
-        return False
-    finally: conn.close()
+            existing = cursor.fetchone()
+            
+            if existing:
+                # Update
+                cursor.execute(
+                    "UPDATE budgets SET amount_paise = ?, start_date = ?, end_date = ? WHERE id = ?",
+                    (to_paise(amount), start_date, end_date, existing[0])
+                )
+            else:
+                # Insert
+                cursor.execute(
+                    "INSERT INTO budgets (user_id, category, amount_paise, period, start_date, end_date) VALUES (?, ?, ?, ?, ?, ?)",
+                    (user_id, category, to_paise(amount), period, start_date, end_date)
+                )
+            _bump_generation(cursor, user_id)
+            conn.commit()
+            return True
+        except Exception as e: 
+            print(f"Error adding budget: {e}")
+            return False
 
 def delete_budget(budget_id, user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM budgets WHERE id = ? AND user_id = ?", (budget_id, user_id))
-        conn.commit()
-        return True
-    except: return False
-    finally: conn.close()
+    with borrow_connection() as conn:
+        try:
+            conn.execute("DELETE FROM budgets WHERE id = ? AND user_id = ?", (budget_id, user_id))
+            _bump_generation(conn, user_id)
+            conn.commit()
+            return True
+        except: return False
 
 # --- Reset Management ---
 def reset_user_data(user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM transactions WHERE user_id = ?", (user_id,))
-        cursor.execute("DELETE FROM budgets WHERE user_id = ?", (user_id,))
-        cursor.execute("DELETE FROM categories WHERE user_id = ?", (user_id,))
-        init_user_defaults(user_id, cursor)
-        conn.commit()
-        _clear_cache()
-        return True
-    except: return False
-    finally: conn.close()
+    with borrow_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM transactions WHERE user_id = ?", (user_id,))
+            cursor.execute("DELETE FROM budgets WHERE user_id = ?", (user_id,))
+            cursor.execute("DELETE FROM categories WHERE user_id = ?", (user_id,))
+            init_user_defaults(user_id, cursor)
+            conn.commit()
+            return True
+        except: return False
 
 def delete_user_account(user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
-        conn.commit()
-        return True
-    except: return False
-    finally: conn.close()
+    with borrow_connection() as conn:
+        try:
+            conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+            conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+            _bump_generation(conn, user_id)
+            conn.commit()
+            return True
+        except: return False
 
 # --- Password Reset Flow (V32) ---
 
 
 def update_password_by_email(email, hashed_password):
     """Updates the user's password using email identifier."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute('UPDATE users SET password_hash = ? WHERE email = ?', (hashed_password, email))
+    with borrow_connection() as conn:
+        cursor = conn.execute('UPDATE users SET password_hash = ? WHERE email = ?', (hashed_password, email))
         conn.commit()
         return cursor.rowcount > 0
-    finally: conn.close()
 def get_most_used_category(user_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT category, COUNT(category) as count 
-        FROM transactions 
-        WHERE user_id = ? 
-        GROUP BY category 
-        ORDER BY count DESC 
-        LIMIT 1
-    """, (user_id,))
-    res = cursor.fetchone()
-    conn.close()
+    with borrow_connection() as conn:
+        res = conn.execute("""
+            SELECT c.name AS category, COUNT(*) as count 
+            FROM transactions t JOIN categories c ON c.id = t.category_id
+            WHERE t.user_id = ? 
+            GROUP BY t.category_id 
+            ORDER BY count DESC 
+            LIMIT 1
+        """, (user_id,)).fetchone()
     return res['category'] if res else None
 
 def update_transaction(transaction_id, user_id, amount, category, payment_method, date, notes):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            UPDATE transactions 
-            SET amount = ?, category = ?, payment_method = ?, date = ?, notes = ?
-            WHERE id = ? AND user_id = ?
-        """, (amount, category, payment_method, date, notes, transaction_id, user_id))
-        conn.commit()
-        _clear_cache()
-        return cursor.rowcount > 0
-    except Exception as e:
-        print(f"Error updating transaction: {e}")
-        return False
-    finally: conn.close()
+    with borrow_connection() as conn:
+        try:
+            category_id = _resolve_category_id(conn.cursor(), user_id, category)
+            cursor = conn.execute("""
+                UPDATE transactions 
+                SET amount_paise = ?, category_id = ?, payment_method = ?, date = ?, notes = ?
+                WHERE id = ? AND user_id = ?
+            """, (to_paise(amount), category_id, payment_method, date, notes, transaction_id, user_id))
+            _bump_generation(conn, user_id)
+            conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error updating transaction: {e}")
+            return False
@@ -0,0 +1,651 @@
+"""
+Versioned schema migrations.
+
+The applied version lives in PRAGMA user_version, so a database that is
+already current costs a single PRAGMA read at startup. Pending steps run
+in order inside one transaction; if any of them fails nothing is applied
+and the version is left untouched.
+
+To change the schema, append a new function decorated with the next
+version number. Never edit a step that has already shipped.
+"""
+import re
+import sqlite3
+
+MIGRATIONS = []  # (version, description, step) in ascending version order
+
+def migration(version, description):
+    """Registers a migration step. Versions must be added in increasing order."""
+    def register(step):
+        if MIGRATIONS and version <= MIGRATIONS[-1][0]:
+            raise ValueError(f"Migration {version} registered out of order")
+        MIGRATIONS.append((version, description, step))
+        return step
+    return register
+
+def latest_version():
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn):
+    """Applies every pending migration and returns the resulting schema version."""
+    version = current_version(conn)
+    if version >= latest_version():
+        return version
+
+    conn.commit()
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None  # Take manual control of BEGIN/COMMIT
+    try:
+        # IMMEDIATE takes the write lock up front, so a second process
+        # starting at the same time waits and then sees the new version.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = current_version(conn)
+            cursor = conn.cursor()
+            for step_version, description, step in MIGRATIONS:
+                if step_version <= version:
+                    continue
+                print(f"Applying migration {step_version}: {description}")
+                step(cursor)
+                version = step_version
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = isolation_level
+    return version
+
+def _table_columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {col['name']: col for col in cursor.fetchall()}
+
+def migrate_users_to_nullable_email(cursor):
+    """
+    Migration: SQLite doesn't support ALTER TABLE ... MODIFY COLUMN.
+    We need to rename, create new, and copy.
+    """
+    # Check if email is NOT NULL
+    email_col = _table_columns(cursor, 'users').get('email')
+
+    # if email_col['notnull'] == 1, then it's NOT NULL and we need to migrate
+    if email_col and email_col['notnull'] == 1:
+        print("Migrating users table to make email nullable...")
+
+        # Check if users_old already exists (from a failed previous run)
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users_old'")
+        if cursor.fetchone():
+            cursor.execute("DROP TABLE users_old")
+
+        # 1. Rename old table
+        cursor.execute("ALTER TABLE users RENAME TO users_old")
+
+        # 2. Create new table with nullable email
+        cursor.execute('''
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE,
+            password_hash TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+
+        # 3. Copy data
+        # Suffix migrated usernames with the id to avoid UNIQUE conflicts
+        cursor.execute('''
+        INSERT INTO users (id, username, email, password_hash, created_at)
+        SELECT id,
+               COALESCE(username, SUBSTR(email, 1, INSTR(email, '@') - 1)) || '_' || id,
+               email,
+               password_hash,
+               created_at
+        FROM users_old
+        ''')
+
+        # 4. Drop old table
+        cursor.execute("DROP TABLE users_old")
+
+@migration(1, "baseline schema (users, categories, transactions, budgets)")
+def _baseline(cursor):
+    # Idempotent on purpose: databases created before versioning already
+    # have some or all of these tables and start at user_version 0.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE,
+        password_hash TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+
+    # Add username column if missing from very old versions
+    if 'username' not in _table_columns(cursor, 'users'):
+        cursor.execute("ALTER TABLE users ADD COLUMN username TEXT")
+        cursor.execute("""
+            UPDATE users
+            SET username = SUBSTR(email, 1, INSTR(email, '@') - 1)
+            WHERE username IS NULL
+        """)
+
+    migrate_users_to_nullable_email(cursor)
+
+    # Categories Table (V3: Emoji support, no color)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        emoji TEXT DEFAULT '🏷️',
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    ''')
+
+    # Transactions Table
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        amount REAL NOT NULL,
+        category TEXT NOT NULL,
+        payment_method TEXT NOT NULL,
+        date DATE NOT NULL,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    ''')
+
+    # Budgets Table (V41: Supporting Weekly, Monthly & Custom)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS budgets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        category TEXT,
+        amount REAL NOT NULL,
+        period TEXT CHECK(period IN ('Weekly', 'Monthly', 'Custom', 'Yearly')) NOT NULL,
+        start_date DATE NOT NULL,
+        end_date DATE,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    ''')
+
+@migration(2, "per-user secondary indexes")
+def _user_indexes(cursor):
+    # Every query is scoped to one user, so lead with user_id to avoid
+    # scanning the whole table as the user base grows.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_user_date ON transactions (user_id, date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_user_category_date ON transactions (user_id, category, date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_budgets_user_category_period ON budgets (user_id, category, period)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_categories_user_name ON categories (user_id, name)")
+
+def rebuild_daily_spend(cursor, user_id=None):
+    """Recomputes the daily_spend rollup from transactions (all users or one)."""
+    scope, params = ("WHERE user_id = ?", (user_id,)) if user_id is not None else ("", ())
+    cursor.execute(f"DELETE FROM daily_spend {scope}", params)
+    cursor.execute(f"""
+        INSERT INTO daily_spend (user_id, day, category, payment_method, total, count, max_amount)
+        SELECT user_id, date(date), category, payment_method, SUM(amount), COUNT(*), MAX(amount)
+        FROM transactions {scope}
+        GROUP BY user_id, date(date), category, payment_method
+    """, params)
+
+@migration(3, "daily_spend rollup maintained by triggers")
+def _daily_spend(cursor):
+    # One row per user/day/category/mode; dashboard cards and budget sums
+    # read this instead of scanning transactions.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS daily_spend (
+        user_id INTEGER NOT NULL,
+        day DATE NOT NULL,
+        category TEXT NOT NULL,
+        payment_method TEXT NOT NULL,
+        total REAL NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        max_amount REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, day, category, payment_method)
+    ) WITHOUT ROWID
+    ''')
+
+    add_new_row = '''
+        INSERT INTO daily_spend (user_id, day, category, payment_method, total, count, max_amount)
+        VALUES (NEW.user_id, date(NEW.date), NEW.category, NEW.payment_method, NEW.amount, 1, NEW.amount)
+        ON CONFLICT (user_id, day, category, payment_method) DO UPDATE SET
+            total = total + excluded.total,
+            count = count + 1,
+            max_amount = MAX(max_amount, excluded.max_amount);
+    '''
+    # MAX cannot be decremented, so it is re-read for the affected bucket
+    # through the (user_id, category, date) index.
+    remove_old_row = '''
+        UPDATE daily_spend SET
+            total = total - OLD.amount,
+            count = count - 1,
+            max_amount = COALESCE((
+                SELECT MAX(amount) FROM transactions
+                WHERE user_id = OLD.user_id AND category = OLD.category
+                  AND date >= date(OLD.date) AND date < date(OLD.date, '+1 day')
+                  AND payment_method = OLD.payment_method
+            ), 0)
+        WHERE user_id = OLD.user_id AND day = date(OLD.date)
+          AND category = OLD.category AND payment_method = OLD.payment_method;
+        DELETE FROM daily_spend
+        WHERE user_id = OLD.user_id AND day = date(OLD.date)
+          AND category = OLD.category AND payment_method = OLD.payment_method
+          AND count <= 0;
+    '''
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_daily_spend_insert AFTER INSERT ON transactions BEGIN {add_new_row} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_daily_spend_delete AFTER DELETE ON transactions BEGIN {remove_old_row} END")
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_spend_update
+        AFTER UPDATE OF user_id, amount, category, payment_method, date ON transactions
+        BEGIN {remove_old_row} {add_new_row} END
+    """)
+
+    rebuild_daily_spend(cursor)
+
+@migration(4, "store amounts as integer paise")
+def _integer_paise(cursor):
+    # Budgets created before V41 have no end_date, and the copy below reads it
+    if 'end_date' not in _table_columns(cursor, 'budgets'):
+        cursor.execute("ALTER TABLE budgets ADD COLUMN end_date DATE")
+
+    # SQLite cannot change a column type in place: rebuild, copy, swap.
+    # Dropping the old tables also drops their indexes and triggers,
+    # which are recreated below against the new columns.
+    cursor.execute('''
+    CREATE TABLE transactions_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        amount_paise INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        payment_method TEXT NOT NULL,
+        date DATE NOT NULL,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    ''')
+    cursor.execute("""
+        INSERT INTO transactions_new (id, user_id, amount_paise, category, payment_method, date, notes, created_at)
+        SELECT id, user_id, CAST(ROUND(amount * 100) AS INTEGER), category,
+               COALESCE(payment_method, 'Cash'),  -- very old schemas allowed NULL
+               date, notes, created_at
+        FROM transactions
+    """)
+    cursor.execute("DROP TABLE transactions")
+    cursor.execute("ALTER TABLE transactions_new RENAME TO transactions")
+    cursor.execute("CREATE INDEX idx_transactions_user_date ON transactions (user_id, date)")
+    cursor.execute("CREATE INDEX idx_transactions_user_category_date ON transactions (user_id, category, date)")
+    # Exact amount lookups (ledger search) become an index probe
+    cursor.execute("CREATE INDEX idx_transactions_user_amount ON transactions (user_id, amount_paise)")
+
+    cursor.execute('''
+    CREATE TABLE budgets_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        category TEXT,
+        amount_paise INTEGER NOT NULL,
+        period TEXT CHECK(period IN ('Weekly', 'Monthly', 'Custom', 'Yearly')) NOT NULL,
+        start_date DATE NOT NULL,
+        end_date DATE,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    ''')
+    cursor.execute("""
+        INSERT INTO budgets_new (id, user_id, category, amount_paise, period, start_date, end_date)
+        SELECT id, user_id, category, CAST(ROUND(amount * 100) AS INTEGER), period, start_date, end_date
+        FROM budgets
+    """)
+    cursor.execute("DROP TABLE budgets")
+    cursor.execute("ALTER TABLE budgets_new RENAME TO budgets")
+    cursor.execute("CREATE INDEX idx_budgets_user_category_period ON budgets (user_id, category, period)")
+
+    cursor.execute("DROP TABLE daily_spend")
+    cursor.execute('''
+    CREATE TABLE daily_spend (
+        user_id INTEGER NOT NULL,
+        day DATE NOT NULL,
+        category TEXT NOT NULL,
+        payment_method TEXT NOT NULL,
+        total_paise INTEGER NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        max_paise INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, day, category, payment_method)
+    ) WITHOUT ROWID
+    ''')
+
+    add_new_row = '''
+        INSERT INTO daily_spend (user_id, day, category, payment_method, total_paise, count, max_paise)
+        VALUES (NEW.user_id, date(NEW.date), NEW.category, NEW.payment_method, NEW.amount_paise, 1, NEW.amount_paise)
+        ON CONFLICT (user_id, day, category, payment_method) DO UPDATE SET
+            total_paise = total_paise + excluded.total_paise,
+            count = count + 1,
+            max_paise = MAX(max_paise, excluded.max_paise);
+    '''
+    remove_old_row = '''
+        UPDATE daily_spend SET
+            total_paise = total_paise - OLD.amount_paise,
+            count = count - 1,
+            max_paise = COALESCE((
+                SELECT MAX(amount_paise) FROM transactions
+                WHERE user_id = OLD.user_id AND category = OLD.category
+                  AND date >= date(OLD.date) AND date < date(OLD.date, '+1 day')
+                  AND payment_method = OLD.payment_method
+            ), 0)
+        WHERE user_id = OLD.user_id AND day = date(OLD.date)
+          AND category = OLD.category AND payment_method = OLD.payment_method;
+        DELETE FROM daily_spend
+        WHERE user_id = OLD.user_id AND day = date(OLD.date)
+          AND category = OLD.category AND payment_method = OLD.payment_method
+          AND count <= 0;
+    '''
+    cursor.execute(f"CREATE TRIGGER trg_daily_spend_insert AFTER INSERT ON transactions BEGIN {add_new_row} END")
+    cursor.execute(f"CREATE TRIGGER trg_daily_spend_delete AFTER DELETE ON transactions BEGIN {remove_old_row} END")
+    cursor.execute(f"""
+        CREATE TRIGGER trg_daily_spend_update
+        AFTER UPDATE OF user_id, amount_paise, category, payment_method, date ON transactions
+        BEGIN {remove_old_row} {add_new_row} END
+    """)
+    cursor.execute("""
+        INSERT INTO daily_spend (user_id, day, category, payment_method, total_paise, count, max_paise)
+        SELECT user_id, date(date), category, payment_method, SUM(amount_paise), COUNT(*), MAX(amount_paise)
+        FROM transactions
+        GROUP BY user_id, date(date), category, payment_method
+    """)
+
+@migration(5, "reference categories by id from transactions")
+def _category_ids(cursor):
+    # Free-text names with no matching category row become categories,
+    # so every transaction can point at one.
+    cursor.execute("""
+        INSERT INTO categories (user_id, name)
+        SELECT DISTINCT t.user_id, t.category FROM transactions t
+        WHERE NOT EXISTS (
+            SELECT 1 FROM categories c WHERE c.user_id = t.user_id AND c.name = t.category
+        )
+    """)
+
+    cursor.execute('''
+    CREATE TABLE transactions_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        amount_paise INTEGER NOT NULL,
+        category_id INTEGER NOT NULL REFERENCES categories (id),
+        payment_method TEXT NOT NULL,
+        date DATE NOT NULL,
+        notes TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+    )
+    ''')
+    cursor.execute("""
+        INSERT INTO transactions_new (id, user_id, amount_paise, category_id, payment_method, date, notes, created_at)
+        SELECT t.id, t.user_id, t.amount_paise,
+               (SELECT MIN(c.id) FROM categories c WHERE c.user_id = t.user_id AND c.name = t.category),
+               t.payment_method, t.date, t.notes, t.created_at
+        FROM transactions t
+    """)
+    cursor.execute("DROP TABLE transactions")
+    cursor.execute("ALTER TABLE transactions_new RENAME TO transactions")
+    cursor.execute("CREATE INDEX idx_transactions_user_date ON transactions (user_id, date)")
+    cursor.execute("CREATE INDEX idx_transactions_user_category_date ON transactions (user_id, category_id, date)")
+    cursor.execute("CREATE INDEX idx_transactions_user_amount ON transactions (user_id, amount_paise)")
+
+    cursor.execute("DROP TABLE daily_spend")
+    cursor.execute('''
+    CREATE TABLE daily_spend (
+        user_id INTEGER NOT NULL,
+        day DATE NOT NULL,
+        category_id INTEGER NOT NULL,
+        payment_method TEXT NOT NULL,
+        total_paise INTEGER NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        max_paise INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, day, category_id, payment_method)
+    ) WITHOUT ROWID
+    ''')
+
+    add_new_row = '''
+        INSERT INTO daily_spend (user_id, day, category_id, payment_method, total_paise, count, max_paise)
+        VALUES (NEW.user_id, date(NEW.date), NEW.category_id, NEW.payment_method, NEW.amount_paise, 1, NEW.amount_paise)
+        ON CONFLICT (user_id, day, category_id, payment_method) DO UPDATE SET
+            total_paise = total_paise + excluded.total_paise,
+            count = count + 1,
+            max_paise = MAX(max_paise, excluded.max_paise);
+    '''
+    remove_old_row = '''
+        UPDATE daily_spend SET
+            total_paise = total_paise - OLD.amount_paise,
+            count = count - 1,
+            max_paise = COALESCE((
+                SELECT MAX(amount_paise) FROM transactions
+                WHERE user_id = OLD.user_id AND category_id = OLD.category_id
+                  AND date >= date(OLD.date) AND date < date(OLD.date, '+1 day')
+                  AND payment_method = OLD.payment_method
+            ), 0)
+        WHERE user_id = OLD.user_id AND day = date(OLD.date)
+          AND category_id = OLD.category_id AND payment_method = OLD.payment_method;
+        DELETE FROM daily_spend
+        WHERE user_id = OLD.user_id AND day = date(OLD.date)
+          AND category_id = OLD.category_id AND payment_method = OLD.payment_method
+          AND count <= 0;
+    '''
+    cursor.execute(f"CREATE TRIGGER trg_daily_spend_insert AFTER INSERT ON transactions BEGIN {add_new_row} END")
+    cursor.execute(f"CREATE TRIGGER trg_daily_spend_delete AFTER DELETE ON transactions BEGIN {remove_old_row} END")
+    cursor.execute(f"""
+        CREATE TRIGGER trg_daily_spend_update
+        AFTER UPDATE OF user_id, amount_paise, category_id, payment_method, date ON transactions
+        BEGIN {remove_old_row} {add_new_row} END
+    """)
+    cursor.execute("""
+        INSERT INTO daily_spend (user_id, day, category_id, payment_method, total_paise, count, max_paise)
+        SELECT user_id, date(date), category_id, payment_method, SUM(amount_paise), COUNT(*), MAX(amount_paise)
+        FROM transactions
+        GROUP BY user_id, date(date), category_id, payment_method
+    """)
+
+
+@migration(6, "per-user data generation for cache keys")
+def _user_data_version(cursor):
+    # No foreign key: a generation must never restart for a user id, even
+    # after the account's rows are deleted, or old cache entries would match.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_data_version (
+            user_id INTEGER PRIMARY KEY,
+            generation INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+
+@migration(7, "strip icons from stored category names")
+def _bare_category_names(cursor):
+    # Frozen copy of category_names.ICON_PATTERN as of this migration
+    icons = re.compile(
+        "[\U0001F000-\U0001FAFF\u2600-\u2775\u231A\u231B\u23E9-\u23FA\u2795-\u27BF"
+        "\u2B05-\u2B55\uFE00-\uFE0F\u200D\u20E3]+"
+    )
+
+    def bare(name, emoji):
+        cleaned = icons.sub(" ", name)
+        if emoji:
+            cleaned = cleaned.replace(emoji, " ")
+        return " ".join(cleaned.split()) or "Others"
+
+    # Categories: rename in place, or fold into an existing bare twin
+    rows = cursor.execute("SELECT id, user_id, name, emoji FROM categories ORDER BY id").fetchall()
+    keep = {}
+    for cat_id, user_id, name, emoji in rows:
+        clean = bare(name, emoji)
+        if clean == name and (user_id, clean) not in keep:
+            keep[(user_id, clean)] = cat_id
+    for cat_id, user_id, name, emoji in rows:
+        clean = bare(name, emoji)
+        target = keep.setdefault((user_id, clean), cat_id)
+        if target == cat_id:
+            if clean != name:
+                cursor.execute("UPDATE categories SET name = ? WHERE id = ?", (clean, cat_id))
+        else:
+            # Triggers move the daily_spend totals along with the rows
+            cursor.execute("UPDATE transactions SET category_id = ? WHERE category_id = ?", (target, cat_id))
+            cursor.execute("DELETE FROM categories WHERE id = ?", (cat_id,))
+
+    # Budgets reference categories by name; keep the newest of any duplicates
+    rows = cursor.execute("SELECT id, user_id, category, period FROM budgets ORDER BY id DESC").fetchall()
+    seen = set()
+    for budget_id, user_id, category, period in rows:
+        clean = category if category == "Global" else bare(category, None)
+        if (user_id, clean, period) in seen:
+            cursor.execute("DELETE FROM budgets WHERE id = ?", (budget_id,))
+            continue
+        seen.add((user_id, clean, period))
+        if clean != category:
+            cursor.execute("UPDATE budgets SET category = ? WHERE id = ?", (clean, budget_id))
+
+    # Every user's cached frames predate the rename
+    cursor.execute("UPDATE user_data_version SET generation = generation + 1")
+
+
+@migration(8, "budget_usage counters maintained by triggers")
+def _budget_usage(cursor):
+    # Spent per budget per period, so budget status is a key lookup.
+    # A new period simply has no row yet (spent 0): that is the rollover.
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS budget_usage (
+        budget_id INTEGER NOT NULL,
+        period_start DATE NOT NULL,
+        spent_paise INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (budget_id, period_start)
+    ) WITHOUT ROWID
+    ''')
+
+    # Frozen copy of budget_engine.PERIOD_START as of this migration
+    def period_start(day):
+        return f"""CASE b.period
+            WHEN 'Weekly' THEN max(date({day}, 'weekday 0', '-6 days'), date({day}, 'start of month'))
+            WHEN 'Monthly' THEN date({day}, 'start of month')
+            WHEN 'Yearly' THEN date({day}, 'start of year')
+            ELSE date(b.start_date)
+        END"""
+
+    def in_custom_range(day):
+        return f"(b.period != 'Custom' OR ({day} >= date(b.start_date) AND (b.end_date IS NULL OR {day} <= date(b.end_date))))"
+
+    def apply_row(row, sign):
+        # Every budget of the row's user that covers its category and date
+        return f'''
+            INSERT INTO budget_usage (budget_id, period_start, spent_paise)
+            SELECT b.id, {period_start(f"date({row}.date)")}, {sign}{row}.amount_paise
+            FROM budgets b
+            WHERE b.user_id = {row}.user_id
+              AND b.category IN ('Global', (SELECT name FROM categories WHERE id = {row}.category_id))
+              AND {in_custom_range(f"date({row}.date)")}
+            ON CONFLICT (budget_id, period_start) DO UPDATE SET spent_paise = spent_paise + excluded.spent_paise;
+        '''
+    # Periods emptied by a delete or move read as 0 either way; drop their rows
+    drop_empty = '''
+        DELETE FROM budget_usage
+        WHERE spent_paise = 0 AND budget_id IN (SELECT id FROM budgets WHERE user_id = OLD.user_id);
+    '''
+    cursor.execute(f"CREATE TRIGGER trg_budget_usage_insert AFTER INSERT ON transactions BEGIN {apply_row('NEW', '')} END")
+    cursor.execute(f"CREATE TRIGGER trg_budget_usage_delete AFTER DELETE ON transactions BEGIN {apply_row('OLD', '-')} {drop_empty} END")
+    cursor.execute(f"""
+        CREATE TRIGGER trg_budget_usage_update
+        AFTER UPDATE OF user_id, amount_paise, category_id, date ON transactions
+        BEGIN {apply_row('OLD', '-')} {drop_empty} {apply_row('NEW', '')} END
+    """)
+
+    # A budget's own rows are rebuilt from the daily rollup when it is
+    # created or its window/category changes; an amount change needs nothing.
+    def backfill(scope):
+        return f'''
+            INSERT INTO budget_usage (budget_id, period_start, spent_paise)
+            SELECT b.id, {period_start("d.day")}, SUM(d.total_paise)
+            FROM budgets b JOIN daily_spend d ON d.user_id = b.user_id
+            WHERE {scope}
+              AND (b.category = 'Global' OR d.category_id IN (
+                   SELECT id FROM categories WHERE user_id = b.user_id AND name = b.category))
+              AND {in_custom_range("d.day")}
+            GROUP BY 1, 2;
+        '''
+    cursor.execute(f"CREATE TRIGGER trg_budget_usage_budget_insert AFTER INSERT ON budgets BEGIN {backfill('b.id = NEW.id')} END")
+    cursor.execute(f"""
+        CREATE TRIGGER trg_budget_usage_budget_update
+        AFTER UPDATE OF user_id, category, period, start_date, end_date ON budgets
+        BEGIN
+            DELETE FROM budget_usage WHERE budget_id = OLD.id;
+            {backfill('b.id = NEW.id')}
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER trg_budget_usage_budget_delete AFTER DELETE ON budgets
+        BEGIN DELETE FROM budget_usage WHERE budget_id = OLD.id; END
+    """)
+
+    cursor.execute(backfill("1"))
+
+
+@migration(9, "trigram full-text index over transaction notes")
+def _notes_search(cursor):
+    # External content: the index stores trigrams only and reads notes
+    # back from transactions. Builds without FTS5 skip this step and
+    # crud.search_transactions falls back to a scan.
+    # `owner` ('#<user_id>#') is indexed next to the notes so a search
+    # intersects the user's rows inside the index rather than walking
+    # every user's hits (see crud.notes_owner).
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE transaction_notes_fts USING fts5(
+                notes, owner, content='transaction_notes_source', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search unavailable ({e}); notes search will scan")
+        return
+    cursor.execute("""
+        CREATE VIEW transaction_notes_source AS
+        SELECT id, notes, '#' || user_id || '#' AS owner FROM transactions
+    """)
+
+    # Bulk writers hold a row here for the length of their transaction and
+    # index their rows in one INSERT ... SELECT, which is several times
+    # cheaper than firing the insert trigger row by row
+    cursor.execute("CREATE TABLE notes_index_paused (id INTEGER PRIMARY KEY)")
+    add_row = "INSERT INTO transaction_notes_fts (rowid, notes, owner) VALUES (NEW.id, NEW.notes, '#' || NEW.user_id || '#');"
+    remove_row = """
+        INSERT INTO transaction_notes_fts (transaction_notes_fts, rowid, notes, owner)
+        VALUES ('delete', OLD.id, OLD.notes, '#' || OLD.user_id || '#');
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER trg_notes_fts_insert AFTER INSERT ON transactions
+        WHEN NOT EXISTS (SELECT 1 FROM notes_index_paused)
+        BEGIN {add_row} END
+    """)
+    cursor.execute(f"CREATE TRIGGER trg_notes_fts_delete AFTER DELETE ON transactions BEGIN {remove_row} END")
+    cursor.execute(f"""
+        CREATE TRIGGER trg_notes_fts_update AFTER UPDATE OF notes, user_id ON transactions
+        BEGIN {remove_row} {add_row} END
+    """)
+    cursor.execute("INSERT INTO transaction_notes_fts (transaction_notes_fts) VALUES ('rebuild')")
+
+
+@migration(10, "remember-me sessions")
+def _sessions(cursor):
+    # A token is selector + verifier. The selector finds the row; only a
+    # SHA-256 digest of the verifier is kept, so a leaked table cannot be
+    # replayed. Times are unix seconds.
+    cursor.execute('''
+    CREATE TABLE sessions (
+        selector TEXT PRIMARY KEY,
+        verifier_hash BLOB NOT NULL,
+        user_id INTEGER NOT NULL,
+        created_at INTEGER NOT NULL,
+        expires_at INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''')
+    cursor.execute("CREATE INDEX idx_sessions_user ON sessions (user_id)")
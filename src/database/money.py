@@ -0,0 +1,25 @@
+from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
+
+# Amounts are stored as integer paise so sums and equality checks are exact.
+# Rupee <-> paise conversion happens only here, at the crud boundary.
+
+def to_paise(amount):
+    """Converts a rupee amount (float, str or Decimal) to integer paise."""
+    if amount is None:
+        return None
+    return int((Decimal(str(amount)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+def from_paise(paise):
+    """Converts integer paise back to rupees for display."""
+    if paise is None:
+        return None
+    return paise / 100
+
+def series_to_paise(amounts):
+    """
+    Vectorised to_paise for a float Series (bulk import).
+    Snapping to 1e-6 paise first absorbs binary error like 1.005 * 100 ==
+    100.49999999999999, so halves round up as Decimal would.
+    """
+    return np.floor(np.round(amounts.to_numpy(dtype='float64') * 100, 6) + 0.5).astype('int64')
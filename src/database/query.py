@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Optional
+from .money import to_paise
+from .category_names import normalize_category_name
+
+# Selectbox placeholders that mean "no filter"
+_ANY = (None, "", "All", "Any", "Select")
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+@dataclass(frozen=True)
+class TransactionQuery:
+    """
+    Filter spec shared by every page that lists or charts transactions.
+    Pages build it from their selectboxes; crud turns it into a
+    parameterized WHERE clause that the (user_id, ...) indexes can serve.
+    Dates are inclusive; amounts are in rupees. A category may be given
+    by name or, cheaper, by category_id.
+    """
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    category: Optional[str] = None
+    payment_mode: Optional[str] = None
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    category_id: Optional[int] = None
+
+    def __post_init__(self):
+        # Normalise widget values so equal filters hash equally
+        object.__setattr__(self, "start_date", _as_date(self.start_date))
+        object.__setattr__(self, "end_date", _as_date(self.end_date))
+        if self.category in _ANY:
+            object.__setattr__(self, "category", None)
+        else:
+            object.__setattr__(self, "category", normalize_category_name(self.category))
+        if self.payment_mode in _ANY:
+            object.__setattr__(self, "payment_mode", None)
+        if not self.min_amount:
+            object.__setattr__(self, "min_amount", None)
+        if not self.max_amount:
+            object.__setattr__(self, "max_amount", None)
+
+    @classmethod
+    def from_filters(cls, filters):
+        """Builds a query from the legacy load_transactions_df filters dict."""
+        if isinstance(filters, cls):
+            return filters
+        filters = filters or {}
+        return cls(
+            start_date=filters.get('start_date'),
+            end_date=filters.get('end_date'),
+            category=filters.get('category'),
+            payment_mode=filters.get('payment_mode'),
+            min_amount=filters.get('min_amount'),
+            max_amount=filters.get('max_amount'),
+            category_id=filters.get('category_id'),
+        )
+
+    def where_clause(self, user_id, alias=None):
+        """
+        Returns (sql, params) for a WHERE clause scoped to one user.
+        `alias` qualifies the transactions columns when the query joins.
+        """
+        t = f"{alias}." if alias else ""
+        clauses = [f"{t}user_id = ?"]
+        params = [user_id]
+
+        if self.category_id is not None:
+            clauses.append(f"{t}category_id = ?")
+            params.append(self.category_id)
+        elif self.category is not None:
+            # Name -> id lookup stays inside SQL so the category index still applies
+            clauses.append(f"{t}category_id IN (SELECT id FROM categories WHERE user_id = ? AND name = ?)")
+            params.extend([user_id, self.category])
+        if self.payment_mode is not None:
+            clauses.append(f"{t}payment_method = ?")
+            params.append(self.payment_mode)
+        if self.start_date is not None:
+            clauses.append(f"{t}date >= ?")
+            params.append(self.start_date.isoformat())
+        if self.end_date is not None:
+            # Half-open upper bound so rows stored with a time part still match
+            clauses.append(f"{t}date < ?")
+            params.append((self.end_date + timedelta(days=1)).isoformat())
+        if self.min_amount is not None:
+            clauses.append(f"{t}amount_paise >= ?")
+            params.append(to_paise(self.min_amount))
+        if self.max_amount is not None:
+            clauses.append(f"{t}amount_paise <= ?")
+            params.append(to_paise(self.max_amount))
+
+        return " AND ".join(clauses), params
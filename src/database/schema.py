@@ -1,10 +1,21 @@
 import sqlite3
 import os
+import threading
+import time
+from contextlib import contextmanager
+from .migrations import migrate
 
 DB_PATH = "finance_pro.db"
 
+# Prepared statements kept per connection (sqlite3 default is 128).
+CACHED_STATEMENTS = 512
+# Idle connections kept for reuse; borrowers beyond this open their own
+POOL_MAX_IDLE = int(os.environ.get("FINANCE_DB_POOL_SIZE", "8"))
+# A connection idle longer than this is probed before it is handed out
+POOL_IDLE_CHECK_SECONDS = 300
+
 def get_connection():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=CACHED_STATEMENTS)
     conn.row_factory = sqlite3.Row
     # Enable WAL mode and stability pragmas for cloud deployment
     conn.execute("PRAGMA journal_mode=WAL;")
@@ -12,139 +23,123 @@ def get_connection():
     conn.execute("PRAGMA temp_store=MEMORY;")
     return conn
 
-def migrate_users_to_nullable_email(cursor):
+class ConnectionPool:
+    """
+    A bounded stack of idle connections shared by every thread, so the
+    PRAGMAs and the statement cache are paid for once instead of on every
+    crud call. Streamlit runs each rerun on a new thread, so connections
+    are not tied to one: a borrow takes the most recently returned one,
+    and nested borrows on a thread reuse it. Up to `max_idle` are kept;
+    a connection is only probed after an error or a long idle spell.
+    """
+
+    def __init__(self, max_idle=POOL_MAX_IDLE, idle_check_seconds=POOL_IDLE_CHECK_SECONDS, clock=time.monotonic):
+        self.max_idle = max_idle
+        self.idle_check_seconds = idle_check_seconds
+        self._clock = clock
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._idle = []  # (conn, path, generation, returned_at), newest last
+        self._generation = 0  # bumped by close_all; older connections are closed on return
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _take(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, path, generation, returned_at = self._idle.pop()
+            # Reopen if the database was switched or the handle went bad
+            if path != DB_PATH:
+                self._close(conn)
+                continue
+            if self._clock() - returned_at > self.idle_check_seconds and not self._is_healthy(conn):
+                self._close(conn)
+                continue
+            return conn, generation
+        with self._lock:
+            generation = self._generation
+        return get_connection(), generation
+
+    def _give_back(self, conn, path, generation, suspect):
+        if suspect and not self._is_healthy(conn):
+            self._close(conn)
+            return
+        with self._lock:
+            if generation == self._generation and path == DB_PATH and len(self._idle) < self.max_idle:
+                self._idle.append((conn, path, generation, self._clock()))
+                return
+        self._close(conn)
+
+    def close_all(self):
+        with self._lock:
+            conns = [entry[0] for entry in self._idle]
+            self._idle.clear()
+            self._generation += 1
+        for conn in conns:
+            self._close(conn)
+
+    @contextmanager
+    def borrow(self):
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            # Nested borrow: same connection, the outermost one cleans up
+            yield held
+            return
+
+        conn, generation = self._take()
+        path = DB_PATH
+        self._local.held = conn
+        suspect = False
+        try:
+            yield conn
+        except sqlite3.Error:
+            suspect = True
+            raise
+        finally:
+            self._local.held = None
+            # Never hand a half-finished transaction to the next caller
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                suspect = True
+            self._give_back(conn, path, generation, suspect)
+
+_pool = ConnectionPool()
+
+def borrow_connection():
     """
-    Migration: SQLite doesn't support ALTER TABLE ... MODIFY COLUMN.
-    We need to rename, create new, and copy.
+    Context manager yielding a pooled connection; nested borrows on one
+    thread get the same connection. Do not close it; commit explicitly,
+    anything uncommitted is rolled back when the outermost borrow exits.
     """
-    try:
-        # Check if email is NOT NULL
-        cursor.execute("PRAGMA table_info(users)")
-        columns = cursor.fetchall()
-        email_col = next((col for col in columns if col['name'] == 'email'), None)
-        
-        # if email_col['notnull'] == 1, then it's NOT NULL and we need to migrate
-        if email_col and email_col['notnull'] == 1:
-            print("Migrating users table to make email nullable...")
-            
-            # Check if users_old already exists (from a failed previous run)
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users_old'")
-            if cursor.fetchone():
-                cursor.execute("DROP TABLE users_old")
-
-            # 1. Rename old table
-            cursor.execute("ALTER TABLE users RENAME TO users_old")
-            
-            # 2. Create new table with nullable email
-            cursor.execute('''
-            CREATE TABLE users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE,
-                password_hash TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            ''')
-            
-            # 3. Copy data
-            # To avoid UNIQUE constraint failures on username, we'll append the id if the prefix is not unique
-            # But for simplicity and safety of duplicates, let's just use the ID as a suffix for all MIGRATED users 
-            # OR use a more clever approach. Let's try prefix_id for conflict cases.
-            cursor.execute('''
-            INSERT INTO users (id, username, email, password_hash, created_at)
-            SELECT id, 
-                   COALESCE(username, SUBSTR(email, 1, INSTR(email, '@') - 1)) || '_' || id,
-                   email, 
-                   password_hash, 
-                   created_at
-            FROM users_old
-            ''')
-            
-            # 4. Drop old table
-            cursor.execute("DROP TABLE users_old")
-            print("Migration successful.")
-    except Exception as e:
-        print(f"Migration error (nullable email): {e}")
+    return _pool.borrow()
+
+def close_connections():
+    """Closes every pooled connection (tests, DB_PATH switches, shutdown)."""
+    _pool.close_all()
 
 def init_db():
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    # 1. Users Table Shell (Ensure table exists first)
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE NOT NULL,
-        email TEXT UNIQUE,
-        password_hash TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-    
-    # 2. Migration: Add username column if missing from very old versions
-    try:
-        cursor.execute("PRAGMA table_info(users)")
-        columns = [col['name'] for col in cursor.fetchall()]
-        if 'username' not in columns:
-            cursor.execute("ALTER TABLE users ADD COLUMN username TEXT")
-            cursor.execute("""
-                UPDATE users 
-                SET username = SUBSTR(email, 1, INSTR(email, '@') - 1)
-                WHERE username IS NULL
-            """)
-    except Exception as e:
-        print(f"Migration error (username column): {e}")
-
-    # 3. Migration: Make email nullable
-    migrate_users_to_nullable_email(cursor)
-    
-    # Categories Table (V3: Emoji support, no color)
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS categories (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        name TEXT NOT NULL,
-        emoji TEXT DEFAULT '🏷️',
-        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-    )
-    ''')
-    
-    # Transactions Table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS transactions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        amount REAL NOT NULL,
-        category TEXT NOT NULL,
-        payment_method TEXT NOT NULL,
-        date DATE NOT NULL,
-        notes TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-    )
-    ''')
-    
-    # Budgets Table (V41: Supporting Weekly, Monthly & Custom)
-    try:
-        # Instead of dropping, we can try to add the column if it doesn't exist
-        # But for this dev phase, the user requested a clean export/fix, so let's ensure schema is correct
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS budgets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            category TEXT,
-            amount REAL NOT NULL,
-            period TEXT CHECK(period IN ('Weekly', 'Monthly', 'Custom', 'Yearly')) NOT NULL,
-            start_date DATE NOT NULL,
-            end_date DATE,
-            FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
-        )
-        ''')
-    except Exception as e:
-        print(f"Migration warning for budgets: {e}")
-
-    conn.commit()
-    conn.close()
+    """
+    Brings the database up to the latest schema version.
+    On an up-to-date database this is a single PRAGMA user_version read.
+    """
+    with borrow_connection() as conn:
+        return migrate(conn)
 
 if __name__ == "__main__":
     init_db()
@@ -1,9 +1,10 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from datetime import date, datetime, timedelta
-from src.database.crud import load_transactions_df
-from src.utils.navigation import clean_category_icons, render_bottom_nav
+from datetime import date, timedelta
+from src.database.crud import has_transactions
+from src.analytics.range_index import range_index
+from src.analytics.trends import spending_trend
+from src.utils.navigation import render_bottom_nav
 
 def render_analytics():
     if not st.session_state.get('authenticated'):
@@ -63,23 +64,16 @@ def render_analytics():
             start_date = c_s.date_input("Start", value=today.replace(day=1), label_visibility="collapsed", key="an_start")
             end_date = c_e.date_input("End", value=today, label_visibility="collapsed", key="an_end")
 
-    # --- Load Data & Apply Filter ---
-    df = load_transactions_df(user_id)
-    
-    if df.empty:
+    # --- Aggregate from the prefix-sum index (O(categories/bars) per range) ---
+    if not has_transactions(user_id):
         st.info("No data available.")
         render_bottom_nav("analytics")
         return
 
-    # Fix Date & Clean Icons
-    df['date'] = pd.to_datetime(df['date'])
-    df = clean_category_icons(df, user_id=user_id)
-    
-    # Filter Data
-    mask = (df['date'].dt.date >= start_date) & (df['date'].dt.date <= end_date)
-    filtered_df = df[mask]
+    spend_index = range_index(user_id)
+    trend, granularity = spending_trend(user_id, start_date, end_date)
     
-    if filtered_df.empty:
+    if trend.empty:
         st.info(f"No transactions found for the selected period ({filter_mode}).")
     else:
         # --- Charts ---
@@ -88,7 +82,7 @@ def render_analytics():
         # 1. Category Distribution
         with c1:
             st.markdown("#### Category Distribution")
-            cat_df = filtered_df.groupby('category')['amount'].sum().reset_index()
+            cat_df = spend_index.breakdown(start_date, end_date, 'category')
             fig1 = px.pie(cat_df, values='amount', names='category', 
                         color_discrete_sequence=px.colors.qualitative.Pastel)
             fig1.update_layout(showlegend=True, height=350, margin=dict(t=0, b=0, l=0, r=0))
@@ -97,7 +91,7 @@ def render_analytics():
         # 2. Payment Method
         with c2:
             st.markdown("#### Payment Mode Split")
-            pay_df = filtered_df.groupby('payment_method')['amount'].sum().reset_index()
+            pay_df = spend_index.breakdown(start_date, end_date, 'payment_method')
             fig2 = px.pie(pay_df, values='amount', names='payment_method',
                         color_discrete_sequence=px.colors.sequential.Teal)
             fig2.update_layout(showlegend=True, height=350, margin=dict(t=0, b=0, l=0, r=0))
@@ -106,22 +100,7 @@ def render_analytics():
         # 3. Dynamic Trend (Daily vs Monthly based on Range)
         st.markdown("#### 📊 Spending Trend")
         
-        range_days = (end_date - start_date).days
-        plot_df = filtered_df.copy()
-        
-        if range_days <= 60:
-            # Daily View
-            daily = plot_df.groupby(plot_df['date'].dt.date)['amount'].sum().reset_index()
-            daily.columns = ['date', 'amount'] # explicit rename
-            daily['date_str'] = pd.to_datetime(daily['date']).apply(lambda d: d.strftime('%d %b'))
-            fig3 = px.bar(daily, x='date_str', y='amount', color_discrete_sequence=['#008080'])
-        else:
-            # Monthly View
-            plot_df['month_year'] = plot_df['date'].dt.strftime('%b %Y')
-            monthly = plot_df.groupby('month_year', as_index=False)['amount'].sum()
-            monthly['sort_key'] = pd.to_datetime(monthly['month_year'], format='%b %Y')
-            monthly = monthly.sort_values('sort_key')
-            fig3 = px.bar(monthly, x='month_year', y='amount', color_discrete_sequence=['#008080'])
+        fig3 = px.bar(trend, x='label', y='amount', color_discrete_sequence=['#008080'])
 
         fig3.update_layout(height=300, bargap=0.6, xaxis_title=None, yaxis_title="Amount") # Thin bars
         st.plotly_chart(fig3, use_container_width=True)
@@ -1,10 +1,11 @@
 import streamlit as st
 import pandas as pd
 import time
-from datetime import date, datetime, timedelta
-from src.database.crud import add_budget, get_budgets, delete_budget, load_transactions_df
+from datetime import date
+from src.database.crud import add_budget, delete_budget
+from src.database.budget_engine import budget_status
 from src.utils.formatting import format_currency
-from src.utils.constants import CATEGORIES, CATEGORY_ICONS
+from src.utils.constants import BUDGET_PERIODS, CATEGORIES, CATEGORY_ICONS
 
 def render_budgets():
     if not st.session_state.get('authenticated'):
@@ -30,7 +31,11 @@ def render_budgets():
             opts = ["Global (All Categories)"] + [f"{CATEGORY_ICONS.get(c, '')} {c}".strip() for c in CATEGORIES]
             cat_choice = c1.selectbox("Category", opts)
             amount = c2.number_input("Limit Amount (₹)", min_value=1.0, step=100.0)
-            cycle = c3.selectbox("Cycle", ["Monthly", "Weekly"])
+            cycle = c3.selectbox("Cycle", BUDGET_PERIODS)
+            # Only read for Custom budgets; leave "To" on its default for an open end
+            d1, d2 = st.columns(2)
+            custom_start = d1.date_input("From (Custom)", value=today)
+            custom_end = d2.date_input("To (Custom)", value=None)
             
             if st.form_submit_button("Save Budget", type="primary"):
                 # Parse Category
@@ -43,7 +48,14 @@ def render_budgets():
                             final_cat = c
                             break
                             
-                if add_budget(user_id, final_cat, amount, cycle, today):
+                if cycle == "Custom":
+                    start_d, end_d = custom_start, custom_end
+                else:
+                    start_d, end_d = today, None
+
+                if end_d is not None and end_d < start_d:
+                    st.error("End date must be on or after the start date.")
+                elif add_budget(user_id, final_cat, amount, cycle, start_d, end_d):
                     st.success("Budget saved successfully!")
                     time.sleep(1)
                     st.rerun()
@@ -54,35 +66,21 @@ def render_budgets():
 
     # --- Active Budgets ---
     st.markdown("### Budget Tracking")
-    budgets = get_budgets(user_id)
+    # Spent/remaining for every budget and period type, in one query
+    budgets = budget_status(user_id, today)
     
-    if budgets:
-        tx_df = load_transactions_df(user_id)
-        if not tx_df.empty:
-            tx_df['date'] = pd.to_datetime(tx_df['date']).dt.date
-            
-        for b in budgets:
-            limit = b['amount']
-            cat = b['category']
-            cycle = b['period']
+    if not budgets.empty:
+        for b in budgets.itertuples():
+            limit = b.limit
+            cat = b.category
+            cycle = b.period
+            spent = b.spent
+            remaining = b.remaining
+            usage = b.utilization
             
-            # Period Start
-            if cycle == "Monthly":
-                start_d = today.replace(day=1)
-            else:
-                curr_w_start = today - timedelta(days=today.weekday())
-                start_d = max(curr_w_start, today.replace(day=1))
-                
-            # Calc Spent
-            spent = 0.0
-            if not tx_df.empty:
-                sub = tx_df[tx_df['date'] >= start_d]
-                if cat != "Global":
-                    sub = sub[sub['category'] == cat]
-                spent = sub['amount'].sum()
-                
-            remaining = limit - spent
-            usage = min(spent / limit, 1.0) if limit > 0 else 0
+            if cycle == "Custom":
+                until = b.period_end.strftime('%d %b %Y') if pd.notna(b.period_end) else "open"
+                cycle = f"{b.period_start.strftime('%d %b %Y')} – {until}"
             
             # Color
             if usage > 1.0: color = "#ef4444"
@@ -101,14 +99,14 @@ def render_budgets():
                      <span>Limit: {format_currency(limit)}</span>
                  </div>
                  <div style='background:rgba(255,255,255,0.1); height:8px; border-radius:4px; margin-top:5px;'>
-                     <div style='background:{color}; width:{usage*100}%; height:100%; max-width:100%; border-radius:4px;'></div>
+                     <div style='background:{color}; width:{min(usage, 1.0)*100}%; height:100%; max-width:100%; border-radius:4px;'></div>
                  </div>
             </div>
             """, unsafe_allow_html=True)
             
             # Delete logic outside card HTML
-            if st.button(f"Delete ({cat})", key=f"del_b_{b['id']}"):
-                delete_budget(b['id'], user_id)
+            if st.button(f"Delete ({cat})", key=f"del_b_{b.id}"):
+                delete_budget(int(b.id), user_id)
                 st.success("Deleted.")
                 time.sleep(1)
                 st.rerun()
@@ -1,6 +1,6 @@
 import streamlit as st
 import time
-from src.database.crud import add_category, get_categories, delete_category, load_transactions_df
+from src.database.crud import add_category, get_categories, delete_category, get_category_counts
 
 def render_categories():
     if not st.session_state.get('authenticated'):
@@ -37,29 +37,14 @@ def render_categories():
     st.markdown("### Your Categories")
     
     cats = get_categories(user_id)
-    # Load transactions strictly for real-time counting
-    from src.database.crud import load_transactions_df
-    expenses_df = load_transactions_df(user_id)
-    
-    # REQUIRED DATA LOGIC: Calculate strictly from expenses
-    if not expenses_df.empty:
-        from src.utils.navigation import clean_category_icons
-        expenses_df = clean_category_icons(expenses_df.copy(), user_id=user_id)
-        # Pandas-style logic as requested:
-        txn_counts = (
-            expenses_df
-            .groupby("category")
-            .size()
-            .to_dict()
-        )
-    else:
-        txn_counts = {}
+    # REQUIRED DATA LOGIC: Calculate strictly from expenses (grouped by category id in SQL)
+    txn_counts = get_category_counts(user_id)
     
     if cats:
         for cat in cats:
             # Transaction count must be calculated ONLY from expenses
             category_name = cat['name']
-            count = txn_counts.get(category_name, 0)
+            count = txn_counts.get(cat['id'], 0)
             
             # UI Layout (Keep Same)
             c1, c2, c3 = st.columns([0.4, 3.6, 1.2]) 
@@ -1,8 +1,10 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from datetime import date, datetime, timedelta
-from src.database.crud import load_transactions_df, get_budgets
+from datetime import date, timedelta
+from src.database.crud import get_spend_summary
+from src.analytics.range_index import range_index
+from src.analytics.trends import spending_trend
+from src.database.budget_engine import budget_status, budget_totals
 from src.utils.formatting import format_currency
 from src.utils.navigation import render_bottom_nav
 
@@ -62,13 +64,6 @@ def render_dashboard():
             start_date_chart = c_s.date_input("Start", value=today.replace(day=1), label_visibility="collapsed")
             end_date_chart = c_e.date_input("End", value=today, label_visibility="collapsed")
 
-    # --- Load FULL Data ---
-    df = load_transactions_df(user_id)
-    if not df.empty:
-        df['date'] = pd.to_datetime(df['date']).dt.date
-        from src.utils.navigation import clean_category_icons
-        df = clean_category_icons(df, user_id=user_id)
-
     # =========================================================
     # 1. STATIC CARDS (Current Status) - IGNORES FILTER
     # =========================================================
@@ -78,19 +73,13 @@ def render_dashboard():
     start_week = max(curr_week_start, today.replace(day=1))
     start_month = today.replace(day=1)
     start_year = today.replace(month=1, day=1)
-    
-    val_week = 0.0
-    val_month = 0.0
-    val_year = 0.0
-    val_highest = 0.0
-    
-    if not df.empty:
-        val_week = df[df['date'] >= start_week]['amount'].sum()
-        month_data = df[df['date'] >= start_month]
-        val_month = month_data['amount'].sum()
-        if not month_data.empty:
-            val_highest = month_data['amount'].max()
-        val_year = df[df['date'] >= start_year]['amount'].sum()
+
+    # Read from the daily rollup: cost scales with days, not transactions
+    val_week = get_spend_summary(user_id, start_week)['total']
+    month_summary = get_spend_summary(user_id, start_month)
+    val_month = month_summary['total']
+    val_highest = month_summary['max_amount']
+    val_year = get_spend_summary(user_id, start_year)['total']
 
     st.write('<style>div[data-testid="column"] {width: 100% !important; min-width: 150px !important;}</style>', unsafe_allow_html=True)
     c1, c2, c3, c4 = st.columns([1,1,1,1])
@@ -127,24 +116,12 @@ def render_dashboard():
     # =========================================================
     st.markdown("### 💰 Budget Status")
     
-    budgets = get_budgets(user_id)
-    total_budget_limit = 0.0
-    total_spent_in_budgets = 0.0
-    
-    if budgets:
-        for b in budgets:
-            total_budget_limit += b['amount']
-            b_start = start_month if b['period'] == "Monthly" else start_week
-            
-            if not df.empty:
-                mask = (df['date'] >= b_start)
-                if b['category'] != "Global":
-                    mask &= (df['category'] == b['category'])
-                total_spent_in_budgets += df[mask]['amount'].sum()
-    
-    # Calculate remaining (no negative)
-    remaining_budget = max(0, total_budget_limit - total_spent_in_budgets)
-    overspent_amount = max(0, total_spent_in_budgets - total_budget_limit)
+    # Every budget's current window and spend, in one query
+    totals = budget_totals(budget_status(user_id, today))
+    total_budget_limit = totals['limit']
+    total_spent_in_budgets = totals['spent']
+    remaining_budget = totals['remaining']
+    overspent_amount = totals['overspent']
     is_overspent = overspent_amount > 0
     percent_actual = (total_spent_in_budgets / total_budget_limit * 100) if total_budget_limit > 0 else 0
 
@@ -171,34 +148,19 @@ def render_dashboard():
     # =========================================================
     # 3. DYNAMIC CHARTS - USES FILTER
     # =========================================================
-    # Create filtered DF for Chart
-    chart_df = pd.DataFrame()
-    if not df.empty:
-        mask = (df['date'] >= start_date_chart) & (df['date'] <= end_date_chart)
-        chart_df = df[mask]
+    # Bars and count come from the user's prefix-sum index: changing the
+    # range costs O(bars), whatever the number of transactions
+    spend_index = range_index(user_id)
+    trend, granularity = spending_trend(user_id, start_date_chart, end_date_chart)
     
     # Metrics for Filtered Data
-    txn_count = len(chart_df)
+    txn_count = spend_index.count(start_date_chart, end_date_chart)
     
     # Header with Count
     st.markdown(f"### 📊 Spending Trend <span style='font-size:1rem; font-weight:normal; color:#a4b0be; margin-left:10px;'>({txn_count} Transactions)</span>", unsafe_allow_html=True)
     
-    if not chart_df.empty:
-        range_days = (end_date_chart - start_date_chart).days
-        plot_df = chart_df.copy()
-        
-        if range_days <= 60:
-            # Daily View
-            daily = plot_df.groupby('date', as_index=False)['amount'].sum()
-            daily['date_str'] = daily['date'].apply(lambda d: d.strftime('%d %b'))
-            fig = px.bar(daily, x='date_str', y='amount', color_discrete_sequence=['#ff9f43'])
-        else:
-            # Monthly View
-            plot_df['month_year'] = pd.to_datetime(plot_df['date']).dt.strftime('%b %Y')
-            monthly = plot_df.groupby('month_year', as_index=False)['amount'].sum()
-            monthly['sort_key'] = pd.to_datetime(monthly['month_year'], format='%b %Y')
-            monthly = monthly.sort_values('sort_key')
-            fig = px.bar(monthly, x='month_year', y='amount', color_discrete_sequence=['#ff9f43'])
+    if not trend.empty:
+        fig = px.bar(trend, x='label', y='amount', color_discrete_sequence=['#ff9f43'])
 
         fig.update_layout(
                 bargap=0.8,
@@ -1,8 +1,9 @@
 import streamlit as st
-import pandas as pd
 import time
 from datetime import datetime, timedelta
-from src.database.crud import load_transactions_df, delete_transaction
+from src.database.crud import delete_transaction, has_transactions, find_transactions, transaction_labels, FIND_LIMIT
+from src.database.query import TransactionQuery
+from src.components.tables import render_transaction_pages, render_export_buttons
 from src.utils.formatting import format_currency
 from src.utils.constants import CATEGORIES, CATEGORY_ICONS, PAYMENT_MODES
 
@@ -21,10 +22,8 @@ def render_ledger():
     </div>
     """, unsafe_allow_html=True)
     
-    # --- Load Data Base ---
-    df_raw = load_transactions_df(user_id)
-    
-    if df_raw.empty:
+    # --- Empty State ---
+    if not has_transactions(user_id):
         st.info("No expense records found. Record your first movement to see history!")
         return
 
@@ -47,48 +46,30 @@ def render_ledger():
             if target_cat == "Select":
                 st.error("⚠️ Category must be selected.")
             else:
-                # Search Logic
-                df_all = load_transactions_df(user_id)
-                if not df_all.empty:
-                    mask = (df_all['category'] == target_cat)
-                    
-                    if target_mode != "Any":
-                        mask = mask & (df_all['payment_method'] == target_mode)
-                    
-                    if target_amt > 0:
-                        # Allow small float diff
-                        mask = mask & (abs(df_all['amount'] - target_amt) < 0.1)
-                        
-                    if target_date_enable:
-                        mask = mask & (df_all['date'].dt.date == target_date)
-                        
-                    matches = df_all[mask].copy()
-                    if not matches.empty:
-                        st.session_state['led_del_matches'] = matches
-                        st.success(f"Found {len(matches)} matches.")
-                    else:
-                        st.warning("No matches found.")
-                        if 'led_del_matches' in st.session_state: del st.session_state['led_del_matches']
-                else: st.warning("No records at all.")
+                # Indexed lookup; only the matching ids are kept across reruns
+                amount = (target_amt, target_amt) if target_amt > 0 else None
+                found = find_transactions(user_id, target_cat, target_mode, amount,
+                                          target_date if target_date_enable else None)
+                if found:
+                    st.session_state['led_del_ids'] = list(found)
+                    st.success(f"Found {len(found)} matches." if len(found) < FIND_LIMIT
+                               else f"Showing the {FIND_LIMIT} newest matches; narrow the search to see others.")
+                else:
+                    st.warning("No matches found.")
+                    st.session_state.pop('led_del_ids', None)
 
         # 2. Display & Action
-        if 'led_del_matches' in st.session_state and not st.session_state['led_del_matches'].empty:
-            matches = st.session_state['led_del_matches']
+        labels = transaction_labels(user_id, st.session_state.get('led_del_ids', []))
+        if labels:
             st.markdown("---")
             st.markdown("###### Select Record to Delete:")
             
-            # Format label
-            matches['label'] = matches.apply(
-                lambda x: f"{x['date'].strftime('%Y-%m-%d')} | ₹{x['amount']} | {x['notes'] or ''}", axis=1
-            )
-            
-            del_sel = st.radio("Matching Records:", matches['label'].tolist(), key="led_del_radio")
+            rec_id = st.radio("Matching Records:", list(labels), format_func=labels.get, key="led_del_radio")
             
             if st.button("❌ Delete Selected Record", key="led_btn_act_del", type="primary"):
-                 rec_id = matches[matches['label'] == del_sel].iloc[0]['id']
                  if delete_transaction(rec_id, user_id):
                      st.success("Deleted successfully!")
-                     del st.session_state['led_del_matches']
+                     del st.session_state['led_del_ids']
                      time.sleep(1)
                      st.rerun()
                  else:
@@ -126,35 +107,27 @@ def render_ledger():
                  elif period == "Monthly":
                      start_d = now.replace(day=1)
                      end_d = now
+
+        min_amt = c_r2_2.number_input("Min Amount", min_value=0.0, step=100.0, key="led_min_amt")
+        max_amt = c_r2_3.number_input("Max Amount", min_value=0.0, step=100.0, key="led_max_amt")
         
-    # Apply Filters
-    df_filtered = df_raw.copy()
-    # Normalize date
-    df_filtered['date'] = pd.to_datetime(df_filtered['date']).dt.date
-    
-    if start_d and end_d:
-        df_filtered = df_filtered[(df_filtered['date'] >= start_d) & (df_filtered['date'] <= end_d)]
-    
-    if sel_cat != "All":
-        df_filtered = df_filtered[df_filtered['category'] == sel_cat]
-    if sel_mode != "All":
-        df_filtered = df_filtered[df_filtered['payment_method'] == sel_mode]
-    
-    # --- TABLE ---
-    st.markdown(f"**Found {len(df_filtered)} records**")
-    st.dataframe(
-        df_filtered[['date', 'category', 'payment_method', 'amount', 'notes']].sort_values('date', ascending=False),
-        use_container_width=True,
-        hide_index=True,
-        column_config={
-            "date": "Date",
-            "amount": st.column_config.NumberColumn("Amount", format="₹%.2f"),
-            "category": "Category",
-            "payment_method": "Payment Mode",
-            "notes": "Description"
-        }
+    # Apply Filters (in SQL, only matching rows are read)
+    ledger_query = TransactionQuery(
+        start_date=start_d, end_date=end_d,
+        category=sel_cat, payment_mode=sel_mode,
+        min_amount=min_amt, max_amount=max_amt
     )
     
+    # --- TABLE (one keyset page at a time) ---
+    render_transaction_pages(user_id, ledger_query, "led_table", {
+        "date": st.column_config.DateColumn("Date"),
+        "category": "Category",
+        "payment_method": "Payment Mode",
+        "amount": st.column_config.NumberColumn("Amount", format="₹%.2f"),
+        "notes": "Description"
+    })
+    render_export_buttons(user_id, ledger_query, "led_table")
+    
     from src.utils.navigation import render_bottom_nav
     render_bottom_nav("ledger")
     
@@ -1,8 +1,10 @@
 import streamlit as st
 import time
+from functools import partial
 from src.auth.security import change_password
 from src.database.crud import reset_user_data, delete_user_account
-from src.auth.session import logout_user
+from src.auth.session import logout_user, remember_login
+from src.utils.exporter import MIME_TYPES, export_account, export_filename
 
 def render_settings():
     if not st.session_state.get('authenticated'):
@@ -44,13 +46,31 @@ def render_settings():
                     st.error("All fields required.")
                 else:
                     if change_password(username, curr_pass, new_pass):
+                        # Other devices are signed out; keep this one remembered.
+                        # The old cookie is already revoked, so replace it in this
+                        # run rather than waiting for the next one.
+                        if st.session_state.get('session_token'):
+                            remember_login(user_id, write_now=True)
                         st.success("Password updated successfully.")
                     else:
                         st.error("Incorrect current password.")
 
     st.markdown("---")
 
-    # --- 4. Danger Zone ---
+    # --- 4. Data ---
+    st.markdown("### 📦 Your Data")
+    st.download_button(
+        "⬇️ Download Full Archive (ZIP)",
+        data=partial(export_account, user_id),
+        file_name=export_filename("archive", "zip"),
+        mime=MIME_TYPES['zip'],
+        help="Transactions, budgets and categories as CSV files.",
+        use_container_width=True
+    )
+
+    st.markdown("---")
+
+    # --- 5. Danger Zone ---
     st.markdown("### 🚨 Danger Zone")
     
     c1, c2 = st.columns(2)
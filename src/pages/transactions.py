@@ -1,10 +1,13 @@
+import hashlib
 import streamlit as st
-import pandas as pd
 import time
 from datetime import date, datetime, timedelta
-from src.database.crud import add_transaction, load_transactions_df, delete_transaction, update_transaction
+from src.database.crud import add_transaction, load_transactions_df, delete_transaction, update_transaction, search_transactions
+from src.database.query import TransactionQuery
+from src.components.tables import render_transaction_pages, render_export_buttons
+from src.utils.importer import IMPORT_FIELDS, REQUIRED_FIELDS, SUPPORTED_TYPES, guess_mapping, import_statement, read_headers
 from src.utils.constants import CATEGORIES, PAYMENT_MODES
-from src.utils.navigation import clean_category_icons, render_bottom_nav
+from src.utils.navigation import render_bottom_nav
 
 def render_transactions():
     if not st.session_state.get('authenticated'):
@@ -21,13 +24,18 @@ def render_transactions():
     </div>
     """, unsafe_allow_html=True)
     
-    # --- Load Data & Categories ---
-    df = load_transactions_df(user_id)
-    if not df.empty:
-        df['date'] = pd.to_datetime(df['date']).dt.date
-        df = clean_category_icons(df, user_id=user_id)
-    
-    from src.database.crud import get_categories, get_category_map
+    def load_view(query):
+        # Only the rows matching `query` are read from SQL
+        view = load_transactions_df(user_id, query)
+        if not view.empty:
+            view['label'] = (
+                view['date'].dt.strftime('%Y-%m-%d') + " | ₹" + view['amount'].astype(str)
+                + " | " + view['notes'].fillna('').str[:20] + "..."
+            )
+        return view
+
+    # --- Load Categories ---
+    from src.database.crud import get_category_map
     cat_map = get_category_map(user_id)
     # List of names for filtering/processing
     all_cat_names = sorted(list(cat_map.keys()))
@@ -69,8 +77,6 @@ def render_transactions():
                     
                     if add_transaction(user_id, amt, selected_cat_name, mode, txn_date, desc):
                         st.success("Saved!")
-                        # FORCE clear cache explicitly here as well
-                        st.cache_data.clear()
                         # Collapse the form to show history
                         st.session_state.add_exp_expanded = False 
                         # Slightly longer delay to ensure cloud FS propagation
@@ -79,12 +85,64 @@ def render_transactions():
                     else:
                         st.error("Error saving.")
 
+    # --- IMPORT STATEMENT ---
+    with st.expander("▶ Import Statement (CSV / XLSX)"):
+        upload = st.file_uploader("Bank statement", type=list(SUPPORTED_TYPES), key="imp_file")
+        if upload is not None:
+            try:
+                headers = read_headers(upload, upload.name)
+            except Exception as e:
+                st.error(f"Could not read file: {e}")
+                headers = []
+
+            if headers:
+                guessed = guess_mapping(headers)
+                options = ["—"] + headers
+                labels = {'date': "Date *", 'amount': "Amount *", 'category': "Category",
+                          'payment_method': "Payment Mode", 'notes': "Description"}
+                mapping = {}
+                map_cols = st.columns(len(IMPORT_FIELDS))
+                for col, name in zip(map_cols, IMPORT_FIELDS):
+                    default = options.index(guessed[name]) if name in guessed else 0
+                    picked = col.selectbox(labels[name], options, index=default, key=f"imp_map_{name}")
+                    if picked != "—":
+                        mapping[name] = picked
+
+                i1, i2 = st.columns(2)
+                imp_cat = i1.selectbox("Category when blank", all_cat_names,
+                                       index=all_cat_names.index("Others") if "Others" in all_cat_names else 0,
+                                       key="imp_def_cat")
+                imp_mode = i2.selectbox("Mode when blank", PAYMENT_MODES, index=len(PAYMENT_MODES) - 1, key="imp_def_mode")
+
+                # A second click on the same file would insert every row again
+                digest = hashlib.sha256(upload.getvalue()).hexdigest()
+                already_imported = st.session_state.get('imp_last_digest') == digest
+                if already_imported:
+                    st.info("This file has already been imported. Upload another statement to import more.")
+
+                if st.button("📥 Import", key="imp_btn", type="primary", use_container_width=True, disabled=already_imported):
+                    if not all(mapping.get(name) for name in REQUIRED_FIELDS):
+                        st.error("Date and Amount columns are required.")
+                    else:
+                        progress = st.empty()
+                        result = import_statement(
+                            user_id, upload, upload.name, mapping, imp_cat, imp_mode,
+                            on_progress=lambda r: progress.caption(f"Imported {r.imported:,} rows…")
+                        )
+                        if result.imported:
+                            st.session_state.imp_last_digest = digest
+                        if result.errors:
+                            st.error(f"Import stopped: {result.errors[0]}. "
+                                     f"{result.imported:,} rows were imported before the error.")
+                        else:
+                            st.success(f"Imported {result.imported:,} rows. Skipped {result.skipped:,} invalid rows.")
+
     # --- EDIT/DELETE EXPENSE ---
     c_edit, c_del = st.columns(2)
     with c_edit:
         with st.expander("▶ Edit Expense"):
             e_cat_disp = st.selectbox("Category to Edit", ["Select"] + display_cats, key="edit_cat_disp")
-            if e_cat_disp != "Select" and not df.empty:
+            if e_cat_disp != "Select":
                 # Extract name
                 e_cat = None
                 for n in all_cat_names:
@@ -92,17 +150,16 @@ def render_transactions():
                         e_cat = n
                         break
                 
-                matches = df[df['category'] == e_cat].sort_values('date', ascending=False)
+                matches = load_view(TransactionQuery(category=e_cat))
                 if not matches.empty:
-                    matches['label'] = matches.apply(lambda x: f"{x['date']} | ₹{x['amount']} | {x['notes'][:20]}...", axis=1)
                     sel_edit = st.selectbox("Select Transaction", matches['label'].tolist())
                     
                     row = matches[matches['label'] == sel_edit].iloc[0]
                     with st.form("edit_txn_form"):
                         u_cat = st.selectbox("New Category", display_cats, index=all_cat_names.index(row['category']))
-                        u_mode = st.selectbox("New Mode", PAYMENT_MODES, index=PAYMENT_MODES.index(row['payment_method']))
+                        u_mode = st.selectbox("New Mode", PAYMENT_MODES, index=PAYMENT_MODES.index(row['payment_method']) if row['payment_method'] in PAYMENT_MODES else 0)
                         u_amt = st.number_input("New Amount", value=float(row['amount']), min_value=0.1, step=1.0, format="%.2f")
-                        u_date = st.date_input("New Date", value=row['date'])
+                        u_date = st.date_input("New Date", value=row['date'].date())
                         u_desc = st.text_input("New Description", value=row['notes'])
                         
                         if st.form_submit_button("Update"):
@@ -124,17 +181,15 @@ def render_transactions():
     with c_del:
         with st.expander("▶ Delete Expense"):
             del_cat_disp = st.selectbox("Category", ["Select"] + display_cats, key="del_cat_simp")
-            if del_cat_disp != "Select" and not df.empty:
+            if del_cat_disp != "Select":
                 d_cat = None
                 for n in all_cat_names:
                     if del_cat_disp.endswith(n):
                         d_cat = n
                         break
                 
-                mask = (df['category'] == d_cat)
-                matches = df[mask].sort_values('date', ascending=False)
+                matches = load_view(TransactionQuery(category=d_cat))
                 if not matches.empty:
-                    matches['label'] = matches.apply(lambda x: f"{x['date']} | ₹{x['amount']} | {x['notes'][:20]}...", axis=1)
                     target = st.selectbox("Select to Delete", matches['label'].tolist())
                     if st.button("Confirm Delete", type="primary", use_container_width=True):
                         if delete_transaction(int(matches[matches['label'] == target].iloc[0]['id']), user_id):
@@ -152,6 +207,27 @@ def render_transactions():
     # 2. FILTERS
     # ==========================
     st.markdown("### 🔍 Search & Filter")
+    search_text = st.text_input("Search descriptions", placeholder="e.g. swiggy, rent, airport", key="hist_search")
+    if search_text.strip():
+        # Ranked matches from the notes index, independent of the filters below
+        found = search_transactions(user_id, search_text)
+        if found.empty:
+            st.info("No descriptions match.")
+        else:
+            st.markdown(f"**Top {len(found)} matches**")
+            st.dataframe(
+                found[['date', 'category', 'payment_method', 'amount', 'notes']],
+                column_config={
+                    "date": st.column_config.DateColumn("Date", format="DD MMM YYYY"),
+                    "category": "Category",
+                    "payment_method": "Mode",
+                    "amount": st.column_config.NumberColumn("Amount", format="₹%.0f"),
+                    "notes": "Description"
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+
     with st.container():
         c1, c2, c3 = st.columns(3)
         # Default Filter: All
@@ -176,36 +252,25 @@ def render_transactions():
     # ==========================
     # 3. HISTORY TABLE
     # ==========================
-    view_df = df.copy()
-    if not view_df.empty:
-        # Resolve filter category name
-        filter_cat_name = "All"
-        if f_cat_disp != "All":
-            for n in all_cat_names:
-                if f_cat_disp.endswith(n):
-                    filter_cat_name = n
-                    break
+    # Resolve filter category name
+    filter_cat_name = "All"
+    if f_cat_disp != "All":
+        for n in all_cat_names:
+            if f_cat_disp.endswith(n):
+                filter_cat_name = n
+                break
 
-        if start_date: view_df = view_df[view_df['date'] >= start_date]
-        if end_date: view_df = view_df[view_df['date'] <= end_date]
-        if filter_cat_name != "All": view_df = view_df[view_df['category'] == filter_cat_name]
-        if f_mode != "All": view_df = view_df[view_df['payment_method'] == f_mode]
-        
-        view_df = view_df.sort_values(by='date', ascending=False)
-        
-        st.dataframe(
-            view_df[['date', 'category', 'payment_method', 'amount', 'notes']],
-            column_config={
-                "date": st.column_config.DateColumn("Date", format="DD MMM"),
-                "category": "Category",
-                "payment_method": "Mode",
-                "amount": st.column_config.NumberColumn("Amount", format="₹%.0f"),
-                "notes": "Description"
-            },
-            use_container_width=True,
-            hide_index=True
-        )
-    else:
-        st.info("No records found.")
+    history_query = TransactionQuery(
+        start_date=start_date, end_date=end_date,
+        category=filter_cat_name, payment_mode=f_mode
+    )
+    render_transaction_pages(user_id, history_query, "hist_table", {
+        "date": st.column_config.DateColumn("Date", format="DD MMM"),
+        "category": "Category",
+        "payment_method": "Mode",
+        "amount": st.column_config.NumberColumn("Amount", format="₹%.0f"),
+        "notes": "Description"
+    })
+    render_export_buttons(user_id, history_query, "hist_table")
         
     render_bottom_nav("transactions")
@@ -33,7 +33,7 @@ CATEGORIES = list(CATEGORY_ICONS.keys())
 PAYMENT_MODES = ["Cash", "UPI", "Card", "Bank Transfer"]
 
 # --- Budgeting ---
-BUDGET_PERIODS = ["Weekly", "Monthly"]
+BUDGET_PERIODS = ["Monthly", "Weekly", "Yearly", "Custom"]
 BUDGET_THRESHOLDS = {
     "safe": 0.70,     # Green < 70%
     "warning": 0.90,  # Yellow 70-90%
@@ -0,0 +1,90 @@
+import csv
+import io
+import zipfile
+from contextlib import closing
+from datetime import datetime
+from openpyxl import Workbook
+from src.database.crud import EXPORT_TABLES, count_transactions, iter_export_rows, page_transactions, sum_by
+from src.utils.pdf_gen import REPORT_MAX_ROWS, generate_expense_pdf
+
+EXPORT_FORMATS = ('csv', 'xlsx', 'pdf')
+MIME_TYPES = {
+    'csv': "text/csv",
+    'xlsx': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    'pdf': "application/pdf",
+    'zip': "application/zip",
+}
+
+def write_csv(out, header, chunks):
+    """Writes header + row chunks as UTF-8 CSV to the binary stream `out`."""
+    text = io.TextIOWrapper(out, encoding='utf-8-sig', newline='')
+    writer = csv.writer(text)
+    writer.writerow(header)
+    for rows in chunks:
+        writer.writerows(rows)
+    text.flush()
+    # Hand `out` back to the caller instead of closing it with the wrapper
+    text.detach()
+
+def write_xlsx(out, header, chunks, title):
+    """Writes header + row chunks to `out` through a write_only workbook, which keeps no rows in memory."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=title)
+    ws.append(list(header))
+    for rows in chunks:
+        for row in rows:
+            ws.append(row)
+    wb.save(out)
+
+def export_transactions(user_id, filters=None, fmt='csv'):
+    """
+    Streams the transactions matching `filters` into a BytesIO, rewound
+    and ready for st.download_button (which reads the whole file into
+    bytes anyway). Rows are never all held as Python objects; only the
+    encoded file is. PDF goes through export_pdf.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{fmt}'")
+    if fmt == 'pdf':
+        return export_pdf(user_id, filters)
+    header, _ = EXPORT_TABLES['transactions']
+    out = io.BytesIO()
+    # Closed even if a writer raises part way, so the connection goes back at once
+    with closing(iter_export_rows(user_id, 'transactions', filters)) as chunks:
+        if fmt == 'csv':
+            write_csv(out, header, chunks)
+        else:
+            write_xlsx(out, header, chunks, "Transactions")
+    out.seek(0)
+    return out
+
+def export_pdf(user_id, filters=None):
+    """
+    PDF report of the transactions matching `filters`. Only the newest
+    REPORT_MAX_ROWS rows are laid out, which bounds render time and memory;
+    the total still covers every matching row.
+    """
+    page = page_transactions(user_id, filters, page_size=REPORT_MAX_ROWS)
+    total = sum_by(user_id, filters=filters)['amount'].sum()
+    note = None
+    if page['next_cursor'] is not None:
+        note = (f"Showing the latest {len(page['rows']):,} of {count_transactions(user_id, filters):,} records. "
+                "Export CSV for the full history.")
+    return io.BytesIO(bytes(generate_expense_pdf(page['rows'], total, note=note)))
+
+def export_account(user_id):
+    """
+    Zips transactions, budgets and categories as CSVs into a BytesIO,
+    each streamed straight into its archive member. Each table's rows are
+    drained, and its iterator closed, before the next is read.
+    """
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for table, (header, _) in EXPORT_TABLES.items():
+            with zf.open(f"{table}.csv", 'w') as member, closing(iter_export_rows(user_id, table)) as chunks:
+                write_csv(member, header, chunks)
+    out.seek(0)
+    return out
+
+def export_filename(kind, ext):
+    return f"expenses_{kind}_{datetime.now().strftime('%Y%m%d')}.{ext}"
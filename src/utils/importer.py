@@ -0,0 +1,179 @@
+import csv
+import os
+from dataclasses import dataclass, field
+import pandas as pd
+from src.database.crud import add_transactions_bulk, bump_generation
+from src.database.money import series_to_paise
+from src.utils.constants import PAYMENT_MODES
+
+# Fields an imported row can carry, and the statement headers that map onto them
+IMPORT_FIELDS = ('date', 'amount', 'category', 'payment_method', 'notes')
+REQUIRED_FIELDS = ('date', 'amount')
+COLUMN_ALIASES = {
+    'date': ('date', 'txn date', 'transaction date', 'value date', 'posting date'),
+    'amount': ('amount', 'debit', 'debit amount', 'withdrawal', 'withdrawal amt', 'withdrawal amount'),
+    'category': ('category',),
+    'payment_method': ('payment method', 'payment mode', 'mode'),
+    'notes': ('notes', 'description', 'narration', 'remarks', 'particulars', 'details'),
+}
+# Statement spellings of PAYMENT_MODES (matched case-insensitively);
+# anything else becomes the import's default mode
+PAYMENT_ALIASES = {
+    **{mode.lower(): mode for mode in PAYMENT_MODES},
+    'atm': "Cash", 'cash withdrawal': "Cash",
+    'upi': "UPI", 'bhim': "UPI",
+    'debit card': "Card", 'credit card': "Card", 'pos': "Card", 'dc': "Card", 'cc': "Card",
+    'neft': "Bank Transfer", 'rtgs': "Bank Transfer", 'imps': "Bank Transfer", 'transfer': "Bank Transfer",
+    'net banking': "Bank Transfer", 'netbanking': "Bank Transfer", 'cheque': "Bank Transfer",
+}
+# Tried in order after ISO 8601; a format per pass keeps parsing vectorised
+DATE_FORMATS = ('%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d/%m/%y', '%d-%m-%y', '%d-%b-%Y', '%d %b %Y', '%d-%b-%y')
+IMPORT_CHUNK_ROWS = 10_000
+SUPPORTED_TYPES = ('csv', 'xlsx')
+
+@dataclass
+class ImportResult:
+    imported: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+
+def _file_type(filename):
+    ext = os.path.splitext(filename)[1].lower().lstrip('.')
+    if ext not in SUPPORTED_TYPES:
+        raise ValueError(f"Unsupported file type '.{ext}'. Upload a CSV or XLSX statement.")
+    return ext
+
+def _normalise_header(header):
+    return " ".join(str(header or "").replace("_", " ").lower().split())
+
+def read_headers(file, filename):
+    """Returns the header row of a statement without reading the body."""
+    file.seek(0)
+    if _file_type(filename) == 'csv':
+        first = file.readline().decode('utf-8-sig')
+        header = next(csv.reader([first]), [])
+        file.seek(0)
+        return [h.strip() for h in header]
+
+    from openpyxl import load_workbook
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        first = next(wb.active.iter_rows(max_row=1, values_only=True), ())
+    finally:
+        wb.close()
+    file.seek(0)
+    return [str(h).strip() if h is not None else "" for h in first]
+
+def guess_mapping(headers):
+    """Maps each import field to the first statement header that matches one of its aliases."""
+    normalised = {_normalise_header(h): h for h in headers if h}
+    mapping = {}
+    for name in IMPORT_FIELDS:
+        for alias in COLUMN_ALIASES[name]:
+            if alias in normalised:
+                mapping[name] = normalised[alias]
+                break
+    return mapping
+
+def read_chunks(file, filename, chunk_rows=IMPORT_CHUNK_ROWS):
+    """
+    Yields the statement as DataFrames of at most `chunk_rows` rows, so
+    memory stays bounded by the chunk size rather than the file size.
+    All cells are read as text; clean_chunk does the typing.
+    """
+    file.seek(0)
+    if _file_type(filename) == 'csv':
+        yield from pd.read_csv(file, dtype=str, chunksize=chunk_rows, skipinitialspace=True, encoding='utf-8-sig')
+        return
+
+    from openpyxl import load_workbook
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+        width = len(header)
+        buffer = []
+        for row in rows:
+            # read_only sheets can yield ragged rows; pad/trim to the header
+            buffer.append(tuple(row[:width]) + (None,) * (width - len(row)))
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame(buffer, columns=header, dtype=object)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=header, dtype=object)
+    finally:
+        wb.close()
+
+def _parse_dates(raw):
+    # ISO dates first, then the day-first forms Indian bank statements use
+    dates = pd.to_datetime(raw, errors='coerce', format='ISO8601')
+    for fmt in DATE_FORMATS:
+        rest = dates.isna() & raw.notna()
+        if not rest.any():
+            break
+        dates[rest] = pd.to_datetime(raw[rest], errors='coerce', format=fmt)
+    return dates
+
+def clean_chunk(chunk, mapping, default_category, default_payment):
+    """
+    Types and validates one raw chunk.
+    Returns (rows, skipped): a frame of date (ISO text), amount_paise,
+    category, payment_method and notes for the valid rows, and the number
+    of rows dropped for a missing/unparseable date or a non-positive amount.
+    Payment modes are mapped onto PAYMENT_MODES through PAYMENT_ALIASES;
+    blank or unknown ones become `default_payment`.
+    """
+    def column(name, default=None):
+        header = mapping.get(name)
+        if header and header in chunk.columns:
+            return chunk[header]
+        return pd.Series(default, index=chunk.index, dtype=object)
+
+    dates = _parse_dates(column('date'))
+    amounts = pd.to_numeric(
+        column('amount').astype(str).str.replace(r'[₹,\s]', '', regex=True).replace({'': None, 'None': None, 'nan': None}),
+        errors='coerce'
+    )
+    valid = dates.notna() & amounts.notna() & (amounts > 0)
+
+    def text(name, default):
+        values = column(name).astype(object)
+        values = values.where(values.notna(), "").astype(str).str.strip()
+        return values.mask(values == "", default) if default is not None else values
+
+    rows = pd.DataFrame({
+        'date': dates[valid].dt.strftime('%Y-%m-%d'),
+        'amount_paise': series_to_paise(amounts[valid]),
+        'category': text('category', default_category)[valid],
+        'payment_method': text('payment_method', "")[valid].str.lower().map(PAYMENT_ALIASES).fillna(default_payment),
+        'notes': text('notes', None)[valid],
+    })
+    return rows, int((~valid).sum())
+
+def import_statement(user_id, file, filename, mapping, default_category="Others", default_payment="Bank Transfer",
+                     chunk_rows=IMPORT_CHUNK_ROWS, on_progress=None):
+    """
+    Streams a CSV/XLSX statement into the user's transactions.
+    Each chunk is validated and written in one executemany transaction;
+    the user's cache generation is bumped once at the end, even when an
+    error stops the import part way. `on_progress`, if given, is called
+    with the running ImportResult after every chunk.
+    """
+    missing = [name for name in REQUIRED_FIELDS if not mapping.get(name)]
+    if missing:
+        raise ValueError(f"Map a column to: {', '.join(missing)}")
+
+    result = ImportResult()
+    try:
+        for chunk in read_chunks(file, filename, chunk_rows):
+            rows, skipped = clean_chunk(chunk, mapping, default_category, default_payment)
+            result.skipped += skipped
+            if not rows.empty:
+                result.imported += add_transactions_bulk(user_id, rows, bump=False)
+            if on_progress:
+                on_progress(result)
+    except Exception as e:
+        result.errors.append(str(e))
+    if result.imported:
+        bump_generation(user_id)
+    return result
@@ -1,6 +1,6 @@
 from datetime import datetime
 import streamlit as st
-from src.utils.constants import CATEGORY_ICONS, APP_TITLE, APP_SUBTITLE
+from src.utils.constants import APP_TITLE, APP_SUBTITLE
 from src.auth.session import logout_user
 
 PAGES = {
@@ -125,29 +125,3 @@ def render_bottom_nav(current_page_key):
         if cols[2].button(f"{next_label} →", key=f"nav_next_{current_page_key}", use_container_width=True):
             st.session_state.current_page = next_label
             st.rerun()
-
-def clean_category_icons(df, user_id=None):
-    """
-    Removes icons from the 'category' column of a dataframe.
-    """
-    if df.empty or 'category' not in df.columns:
-        return df
-        
-    icons_to_strip = set(CATEGORY_ICONS.values())
-    
-    if user_id:
-        from src.database.crud import get_categories
-        user_cats = get_categories(user_id)
-        for c in user_cats:
-            if c['emoji']:
-                icons_to_strip.add(c['emoji'])
-                
-    def strip_icon(val):
-        s_val = str(val)
-        for icon in icons_to_strip:
-            if icon and icon in s_val:
-                s_val = s_val.replace(icon, "")
-        return s_val.strip()
-        
-    df['category'] = df['category'].apply(strip_icon)
-    return df
@@ -1,40 +1,166 @@
 from fpdf import FPDF
+from fpdf.enums import XPos, YPos
 from datetime import datetime
+from functools import lru_cache
 import re
 import os
-from src.utils.formatting import format_currency
+
+# Emojis and non-standard symbols that might crash the font
+_UNSAFE_CHARS = re.compile(r'[^\x00-\x7F\u20B9]+')
+
+FONT_PATHS = [
+    "C:\\Windows\\Fonts\\DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "src/assets/fonts/DejaVuSans.ttf",
+    "DejaVuSans.ttf"
+]
+
+# Columns: Date, Category, Payment Mode, Amount, Description -> (width, title, align)
+TABLE_COLUMNS = [
+    (25, ' Date', 'L'),
+    (40, ' Category', 'L'),
+    (30, ' Mode', 'L'),
+    (35, ' Amount', 'C'),
+    (60, ' Description', 'L'),
+]
+ROW_HEIGHT = 8
+# Body cells are left-aligned except the amount
+AMOUNT_COLUMN = 3
+NOTES_WIDTH_CHARS = 35
+# Reports past this many rows keep only the newest; ~1.9k pages at 27 rows a page
+REPORT_MAX_ROWS = 50_000
+
+@lru_cache(maxsize=1)
+def resolve_fonts():
+    """
+    Finds a Unicode TTF (for the Rupee sign) once per process.
+    Returns (regular, bold) paths, or None to fall back to core Helvetica.
+    """
+    target_font = None
+    for path in FONT_PATHS:
+        if os.path.exists(path):
+            target_font = path
+            break
+
+    # Fallback to Arial if DejaVu is missing (Windows Unicode support)
+    if not target_font and os.path.exists("C:\\Windows\\Fonts\\arial.ttf"):
+        target_font = "C:\\Windows\\Fonts\\arial.ttf"
+    if not target_font:
+        return None
+
+    bold_candidate = target_font.replace('.ttf', '-Bold.ttf').replace('arial.ttf', 'arialbd.ttf')
+    return target_font, bold_candidate if os.path.exists(bold_candidate) else target_font
 
 class StrategicReportPDF(FPDF):
     def __init__(self, period_text, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.period_text = period_text
+        self.table_open = False
+
+        fonts = resolve_fonts()
+        if fonts:
+            # fpdf2 handles Unicode natively for TTF fonts
+            self.add_font('DejaVu', '', fonts[0])
+            self.add_font('DejaVu', 'B', fonts[1])
+            self.family_name, self.currency = 'DejaVu', "₹"
+        else:
+            # Emergency fallback to a core font (no Rupee glyph)
+            self.family_name, self.currency = 'helvetica', "Rs."
 
     def header(self):
         # Professional Heading
-        self.set_font('DejaVu', 'B', 16)
+        self.set_font(self.family_name, 'B', 16)
         self.set_text_color(0, 128, 128) # Teal
-        self.cell(0, 12, 'EXPENSE TRACKER - STRATEGIC REPORT', 0, 1, 'C')
+        self.cell(0, 12, 'EXPENSE TRACKER - STRATEGIC REPORT', align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         
         # Metadata
-        self.set_font('DejaVu', '', 10)
+        self.set_font(self.family_name, '', 10)
         self.set_text_color(100, 100, 100)
-        self.cell(0, 6, f'Analysis Period: {self.period_text}', 0, 1, 'C')
-        self.cell(0, 6, f'Generated On: {datetime.now().strftime("%d %b %Y, %H:%M")}', 0, 1, 'C')
+        self.cell(0, 6, f'Analysis Period: {self.period_text}', align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.cell(0, 6, f'Generated On: {datetime.now().strftime("%d %b %Y, %H:%M")}', align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.ln(10)
+
+        # Long reports repeat the column header on every page
+        if self.table_open:
+            self.table_header()
+
+    def table_header(self):
+        self.set_fill_color(0, 128, 128) # Teal
+        self.set_text_color(255, 255, 255)
+        self.set_font(self.family_name, 'B', 10)
+        for width, title, align in TABLE_COLUMNS:
+            self.cell(width, 10, title, border=1, align=align, fill=True)
         self.ln(10)
+        # Back to body style
+        self.set_text_color(50, 50, 50)
+        self.set_font(self.family_name, '', 9)
 
     def footer(self):
         self.set_y(-15)
-        self.set_font('DejaVu', '', 8)
+        self.set_font(self.family_name, '', 8)
         self.set_text_color(150, 150, 150)
-        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
+        self.cell(0, 10, f'Page {self.page_no()}', align='C')
 
 def safe_encode(text):
     """Clean text for standard PDF rendering while preserving essential characters."""
     if not text: return ""
-    # Strip emojis and non-standard symbols that might crash the font
-    return re.sub(r'[^\x00-\x7F\u20B9]+', '', str(text)).strip()
+    return _UNSAFE_CHARS.sub('', str(text)).strip()
 
-def generate_expense_pdf(df, total_amount):
+def _safe_column(values):
+    """safe_encode for a whole Series at once."""
+    return values.fillna("").astype(str).str.replace(_UNSAFE_CHARS, '', regex=True).str.strip()
+
+def _row_strings(df, currency):
+    """Builds every cell's text column-wise instead of per row."""
+    df = df.sort_values('date', ascending=True, kind='stable')
+    dates = df['date'].dt.strftime(' %d/%m/%Y')
+    categories = ' ' + _safe_column(df['category'])
+    modes = ' ' + df['payment_method'].fillna("").astype(str)
+    amounts = [f"{currency} {abs(a):,.2f} " for a in df['amount'].tolist()]
+    notes = ' ' + _safe_column(df['notes']).str[:NOTES_WIDTH_CHARS]
+    return zip(dates.tolist(), categories.tolist(), modes.tolist(), amounts, notes.tolist())
+
+def _draw_grid(pdf, top, bottom):
+    x = pdf.l_margin
+    for width, _, _ in TABLE_COLUMNS:
+        pdf.line(x, top, x, bottom)
+        x += width
+    pdf.line(x, top, x, bottom)
+    for y in range(int(round((bottom - top) / ROW_HEIGHT)) + 1):
+        pdf.line(pdf.l_margin, top + y * ROW_HEIGHT, x, top + y * ROW_HEIGHT)
+
+def _draw_rows(pdf, rows):
+    """
+    Lays rows out page by page with plain text() calls and one grid per
+    page; cell() re-measures and re-styles every cell, which dominates
+    large reports. A new page (and its repeated column header) starts
+    whenever the next row would cross the bottom margin.
+    """
+    edges = [pdf.l_margin]
+    for width, _, _ in TABLE_COLUMNS:
+        edges.append(edges[-1] + width)
+    pad = pdf.c_margin
+    baseline = (ROW_HEIGHT + pdf.font_size * 0.7) / 2
+    top = y = pdf.get_y()
+    for cells in rows:
+        if y + ROW_HEIGHT > pdf.page_break_trigger:
+            _draw_grid(pdf, top, y)
+            pdf.add_page()
+            top = y = pdf.get_y()
+        for i, text in enumerate(cells):
+            if i == AMOUNT_COLUMN:
+                pdf.text(edges[i + 1] - pad - pdf.get_string_width(text), y + baseline, text)
+            else:
+                pdf.text(edges[i] + pad, y + baseline, text)
+        y += ROW_HEIGHT
+    _draw_grid(pdf, top, y)
+    pdf.set_y(y)
+
+def generate_expense_pdf(df, total_amount, note=None):
+    """
+    Renders the rows of `df` as a paginated table plus a total line.
+    `note`, if given, is printed under the total (e.g. when rows were capped).
+    """
     # Determine date range for header
     p_text = "Detailed Records"
     if not df.empty:
@@ -43,81 +169,23 @@ def generate_expense_pdf(df, total_amount):
         p_text = f"{start_date} - {end_date}"
 
     pdf = StrategicReportPDF(p_text)
-    
-    # --- Universal Font Resolution ---
-    # Attempt to load DejaVuSans for Rupee (₹) Support
-    font_paths = [
-        "C:\\Windows\\Fonts\\DejaVuSans.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
-        "src/assets/fonts/DejaVuSans.ttf",
-        "DejaVuSans.ttf"
-    ]
-    
-    target_font = None
-    for path in font_paths:
-        if os.path.exists(path):
-            target_font = path
-            break
-            
-    # Fallback to Arial if DejaVu is missing (Windows Unicode support)
-    if not target_font and os.path.exists("C:\\Windows\\Fonts\\arial.ttf"):
-        target_font = "C:\\Windows\\Fonts\\arial.ttf"
-
-    if target_font:
-        # fpdf2 uses add_font(family, style, fname)
-        # Unicode is handled natively
-        pdf.add_font('DejaVu', '', target_font)
-        # Attempt to find Bold variant
-        bold_candidate = target_font.replace('.ttf', '-Bold.ttf').replace('arial.ttf', 'arialbd.ttf')
-        if os.path.exists(bold_candidate):
-            pdf.add_font('DejaVu', 'B', bold_candidate)
-        else:
-            pdf.add_font('DejaVu', 'B', target_font)
-    else:
-        # Emergency Fallback to core font (No Rupee support)
-        pdf.add_font('DejaVu', '', 'helvetica')
-        pdf.add_font('DejaVu', 'B', 'helvetica-bold')
-
     pdf.add_page()
-    
-    # Table Header Design
-    pdf.set_fill_color(0, 128, 128) # Teal
-    pdf.set_text_color(255, 255, 255)
-    pdf.set_font('DejaVu', 'B', 10)
-    
-    # Columns: Date, Category, Payment Mode, Amount, Description
-    pdf.cell(25, 10, ' Date', 1, 0, 'L', True)
-    pdf.cell(40, 10, ' Category', 1, 0, 'L', True)
-    pdf.cell(30, 10, ' Mode', 1, 0, 'L', True)
-    pdf.cell(35, 10, ' Amount', 1, 0, 'C', True)
-    pdf.cell(60, 10, ' Description', 1, 1, 'L', True)
+    pdf.table_header()
+    pdf.table_open = True
 
     # Table Content
-    pdf.set_text_color(50, 50, 50)
-    pdf.set_font('DejaVu', '', 9)
-    
-    for _, row in df.sort_values('date', ascending=True).iterrows():
-        pdf.cell(25, 8, f' {row["date"].strftime("%d/%m/%Y")}', 1)
-        
-        # Category (Strip Emoji)
-        raw_cat = str(row['category'])
-        clean_cat = safe_encode(raw_cat.split(' ', 1)[1] if ' ' in raw_cat else raw_cat)
-        pdf.cell(40, 8, f' {clean_cat}', 1)
-        
-        pdf.cell(30, 8, f' {row["payment_method"]}', 1)
-        
-        # Use format_currency which includes ₹ symbol
-        pdf.cell(35, 8, f'{format_currency(row["amount"])} ', 1, 0, 'R')
-        
-        # Description
-        desc_text = safe_encode(row['notes'])
-        pdf.cell(60, 8, f' {desc_text[:35]}', 1, 1)
+    _draw_rows(pdf, _row_strings(df, pdf.currency))
+    pdf.table_open = False
 
     # Final Summary Row
     pdf.ln(5)
-    pdf.set_font('DejaVu', 'B', 11)
+    pdf.set_font(pdf.family_name, 'B', 11)
     pdf.set_text_color(0, 128, 128)
-    pdf.cell(130, 10, 'TOTAL CUMULATIVE EXPENDITURE:', 0, 0, 'R')
-    pdf.cell(35, 10, f'{format_currency(total_amount)}', 0, 1, 'R')
+    pdf.cell(130, 10, 'TOTAL CUMULATIVE EXPENDITURE:', align='R')
+    pdf.cell(35, 10, f'{pdf.currency} {abs(total_amount):,.2f}', align='R', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    if note:
+        pdf.set_font(pdf.family_name, '', 9)
+        pdf.set_text_color(100, 100, 100)
+        pdf.cell(0, 8, note, align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
     return pdf.output()
@@ -6,7 +6,7 @@ import secrets
 import re
 from datetime import datetime, timedelta
 from src.auth.session import init_session_state, login_user, logout_user
-from src.auth.security import hash_password, verify_password
+from src.auth.security import authenticate, hash_password, revoke_user_sessions
 from src.database.crud import (
     create_user
 )
@@ -184,23 +184,14 @@ def login_page():
             with st.form("login_form", clear_on_submit=False):
                 username = st.text_input("Username")
                 password = st.text_input("Password", type="password")
+                remember = st.checkbox("Keep me signed in", value=True)
                 submit = st.form_submit_button("Sign In", use_container_width=True)
                 
                 if submit:
-                    from src.auth.security import get_user_by_username
-                    user = get_user_by_username(username)
+                    # Verifies on the hashing pool and upgrades an outdated hash
+                    user = authenticate(username, password)
                     if user:
-                        # Convert SQLite Row to dict for easier access
-                        user_dict = dict(user) if hasattr(user, 'keys') else {
-                            'id': user[0],
-                            'username': user[1],
-                            'password_hash': user[3]
-                        }
-                        
-                        if verify_password(password, user_dict['password_hash']):
-                            login_user(user_dict['id'], user_dict['username'])
-                        else:
-                            st.error("Invalid username or password.")
+                        login_user(user['id'], user['username'], remember)
                     else:
                         st.error("Invalid username or password.")
         
@@ -294,6 +285,7 @@ def login_page():
                             user = get_user_by_username(st.session_state.reset_username)
                             user_id = user['id'] if hasattr(user, 'keys') else user[0]
                             if update_password(user_id, hash_password(new_pass)):
+                                revoke_user_sessions(user_id)
                                 st.success("Password reset successful!")
                                 st.session_state.reset_username = None
                                 st.session_state.reset_otp = None
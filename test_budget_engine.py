@@ -0,0 +1,119 @@
+import sys
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+from src.database import budget_engine
+from src.database.budget_engine import budget_status, budget_totals
+
+TODAY = date(2025, 3, 12)  # a Wednesday
+
+
+@pytest.fixture
+def user_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "budgets.db"))
+    schema.init_db()
+    user_id = crud.create_user("budget_user", "hash")
+    for day, amount, category in [
+        (date(2025, 2, 27), 7.0, "Health"),
+        (date(2025, 3, 1), 100.0, "Health"),
+        (date(2025, 3, 10), 50.0, "Health"),
+        (date(2025, 3, 12), 20.0, "Food & Dining"),
+        (date(2025, 3, 17), 9.0, "Health"),
+    ]:
+        crud.add_transaction(user_id, amount, category, "UPI", day, "")
+    yield user_id
+    schema.close_connections()
+
+
+def by_period(status):
+    return {(row.category, row.period): row for row in status.itertuples()}
+
+
+def test_every_period_type_in_one_pass(user_id):
+    crud.add_budget(user_id, "Health", 200.0, "Weekly", TODAY)
+    crud.add_budget(user_id, "Global", 100.0, "Monthly", TODAY)
+    crud.add_budget(user_id, "Global", 1000.0, "Yearly", TODAY)
+    crud.add_budget(user_id, "Health", 100.0, "Custom", date(2025, 2, 20), date(2025, 3, 5))
+
+    rows = by_period(budget_status(user_id, TODAY))
+    weekly = rows[("Health", "Weekly")]
+    assert (weekly.period_start.date(), weekly.period_end.date()) == (date(2025, 3, 10), date(2025, 3, 16))
+    assert weekly.spent_paise == 5000 and weekly.utilization == 0.25
+    assert rows[("Global", "Monthly")].spent_paise == 17900
+    assert rows[("Global", "Monthly")].remaining_paise == -7900
+    assert rows[("Global", "Yearly")].spent_paise == 18600
+    custom = rows[("Health", "Custom")]
+    assert custom.spent_paise == 10700 and custom.utilization == pytest.approx(1.07)
+
+    totals = budget_totals(budget_status(user_id, TODAY))
+    assert totals["limit"] == 1400.0 and totals["spent"] == 522.0 and totals["overspent"] == 0
+
+
+def test_weekly_window_is_clamped_to_the_month(user_id):
+    crud.add_budget(user_id, "Health", 200.0, "Weekly", TODAY)
+    # Week of Mon 24 Feb - Sun 2 Mar, seen from 1 March
+    weekly = budget_status(user_id, date(2025, 3, 1)).iloc[0]
+    assert (weekly.period_start.date(), weekly.period_end.date()) == (date(2025, 3, 1), date(2025, 3, 2))
+    assert weekly.spent_paise == 10000
+
+
+def test_open_ended_custom_budget_and_no_budgets(user_id):
+    assert budget_status(user_id, TODAY).empty
+    assert budget_totals(budget_status(user_id, TODAY))["utilization"] == 0.0
+
+    crud.add_budget(user_id, "Health", 50.0, "Custom", date(2025, 3, 2))
+    custom = budget_status(user_id, TODAY).iloc[0]
+    assert pd.isna(custom.period_end) and custom.spent_paise == 5900
+
+
+def usage_rows():
+    with schema.borrow_connection() as conn:
+        return sorted(tuple(r) for r in conn.execute("SELECT budget_id, period_start, spent_paise FROM budget_usage"))
+
+
+def test_counters_follow_writes_and_match_a_rebuild(user_id):
+    crud.add_budget(user_id, "Health", 200.0, "Weekly", TODAY)
+    crud.add_budget(user_id, "Global", 100.0, "Monthly", TODAY)
+    crud.add_budget(user_id, "Health", 100.0, "Custom", date(2025, 2, 20), date(2025, 3, 5))
+
+    crud.add_transaction(user_id, 5.0, "Health", "Cash", date(2025, 3, 11), "")
+    txn_ids = crud.load_transactions_df(user_id).sort_values("id")["id"].tolist()
+    crud.update_transaction(txn_ids[1], user_id, 60.0, "Food & Dining", "UPI", date(2025, 3, 11), "moved")
+    crud.delete_transaction(txn_ids[2], user_id)
+    crud.add_budget(user_id, "Health", 100.0, "Custom", date(2025, 2, 1), date(2025, 2, 28))  # window change
+
+    maintained = usage_rows()
+    assert budget_engine.rebuild_budget_usage([user_id]) == len(maintained)
+    assert usage_rows() == maintained
+
+    monthly = by_period(budget_status(user_id, TODAY))[("Global", "Monthly")]
+    assert monthly.spent_paise == 6000 + 2000 + 900 + 500  # edited, untouched x2, new
+
+
+def test_new_period_rolls_over_to_zero(user_id):
+    crud.add_budget(user_id, "Global", 100.0, "Monthly", TODAY)
+    assert budget_status(user_id, TODAY).iloc[0].spent_paise == 17900
+    april = budget_status(user_id, date(2025, 4, 1)).iloc[0]
+    assert april.period_start.date() == date(2025, 4, 1) and april.spent_paise == 0
+
+    crud.add_transaction(user_id, 3.0, "Health", "UPI", date(2025, 4, 2), "")
+    assert budget_status(user_id, date(2025, 4, 2)).iloc[0].spent_paise == 300
+
+
+def test_rebuild_repairs_drifted_counters(user_id):
+    crud.add_budget(user_id, "Global", 100.0, "Monthly", TODAY)
+    with schema.borrow_connection() as conn:
+        conn.execute("UPDATE budget_usage SET spent_paise = 1")
+        conn.commit()
+    generation = crud.get_generation(user_id)
+
+    budget_engine.rebuild_budget_usage()
+    assert crud.get_generation(user_id) == generation + 1
+    assert budget_status(user_id, TODAY).iloc[0].spent_paise == 17900
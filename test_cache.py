@@ -0,0 +1,63 @@
+import sys
+import os
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database.cache import LRUCache, sizeof
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def frame(rows):
+    return pd.DataFrame({"amount": range(rows), "notes": ["x" * 20] * rows})
+
+
+def test_evicts_least_recently_used_under_byte_budget():
+    one = sizeof(frame(100))
+    cache = LRUCache(max_bytes=int(one * 2.5), ttl=None)
+    cache.put("a", frame(100))
+    cache.put("b", frame(100))
+    cache.get("a")  # "b" is now the oldest
+    cache.put("c", frame(100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.bytes <= cache.max_bytes
+    assert cache.stats()["evictions"] == 1
+
+    # A value bigger than the whole budget is never stored
+    cache.put("huge", frame(10_000))
+    assert cache.get("huge") is None
+
+
+def test_ttl_expiry_and_counters():
+    clock = FakeClock()
+    cache = LRUCache(max_bytes=10**6, ttl=60, clock=clock)
+    loads = []
+    load = lambda: loads.append(1) or frame(5)
+
+    cache.get_or_load("k", load)
+    cache.get_or_load("k", load)
+    clock.now = 61
+    cache.get_or_load("k", load)
+
+    assert len(loads) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+
+
+def test_callers_get_copies():
+    cache = LRUCache(max_bytes=10**6, ttl=None)
+    cache.put("k", frame(3))
+    mine = cache.get("k")
+    mine["amount"] = 0
+    assert cache.get("k")["amount"].tolist() == [0, 1, 2]
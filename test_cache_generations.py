@@ -0,0 +1,71 @@
+import sys
+import os
+from datetime import date
+
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+
+
+@pytest.fixture
+def users(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "cache.db"))
+    schema.init_db()
+    yield crud.create_user("alice", "hash"), crud.create_user("bob", "hash")
+    schema.close_connections()
+
+
+def traced(fn):
+    statements = []
+    with schema.borrow_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            result = fn()
+        finally:
+            conn.set_trace_callback(None)
+    return result, statements
+
+
+def test_writes_bump_only_the_writers_generation(users):
+    alice, bob = users
+    before = crud.get_generation(alice), crud.get_generation(bob)
+    crud.add_transaction(alice, 10.0, "Health", "UPI", date(2025, 3, 1), "")
+    crud.add_budget(alice, "Global", 100.0, "Monthly", date(2025, 3, 1))
+    assert crud.get_generation(alice) == before[0] + 2
+    assert crud.get_generation(bob) == before[1]
+
+
+def test_cached_reads_skip_sql_until_the_user_writes(users):
+    alice, bob = users
+    crud.add_transaction(alice, 10.0, "Health", "UPI", date(2025, 3, 1), "")
+    crud.load_transactions_df(alice)
+    crud.sum_by(bob, ["category"])
+
+    # Warm: only the generation lookup reaches SQLite
+    _, statements = traced(lambda: (crud.load_transactions_df(alice), crud.sum_by(bob, ["category"])))
+    assert all("user_data_version" in sql for sql in statements)
+
+    crud.add_transaction(alice, 5.0, "Health", "UPI", date(2025, 3, 2), "")
+    assert len(crud.load_transactions_df(alice)) == 2
+    # Bob's entry survived Alice's write
+    _, statements = traced(lambda: crud.sum_by(bob, ["category"]))
+    assert all("user_data_version" in sql for sql in statements)
+
+
+def test_a_bump_from_another_process_invalidates(users):
+    alice, _ = users
+    crud.add_transaction(alice, 10.0, "Health", "UPI", date(2025, 3, 1), "")
+    assert crud.sum_by(alice)["amount_paise"].tolist() == [1000]
+
+    # Another server process writes through its own connection
+    import sqlite3
+    other = sqlite3.connect(schema.DB_PATH)
+    other.execute("UPDATE transactions SET amount_paise = 2500 WHERE user_id = ?", (alice,))
+    other.execute("UPDATE user_data_version SET generation = generation + 1 WHERE user_id = ?", (alice,))
+    other.commit()
+    other.close()
+
+    assert crud.sum_by(alice)["amount_paise"].tolist() == [2500]
@@ -0,0 +1,86 @@
+import sys
+import os
+from datetime import date
+
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud, migrations
+from src.database.category_names import normalize_category_name
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "names.db"))
+    yield
+    schema.close_connections()
+
+
+def category_rows(user_id):
+    with schema.borrow_connection() as conn:
+        return sorted(tuple(r) for r in conn.execute(
+            "SELECT name, emoji FROM categories WHERE user_id = ?", (user_id,)))
+
+
+def test_names_are_stored_bare(fresh_db):
+    schema.init_db()
+    user_id = crud.create_user("names_user", "hash")
+    crud.add_transaction(user_id, 10.0, "🍴 Food & Dining", "UPI", date(2025, 3, 1), "")
+    crud.add_transaction(user_id, 20.0, "Food & Dining", "UPI", date(2025, 3, 1), "")
+    assert crud.add_category(user_id, "✈️  Travel ", "✈️")
+    assert not crud.add_category(user_id, "🎉", "🎉")
+
+    df = crud.load_transactions_df(user_id)
+    assert set(df["category"]) == {"Food & Dining"}
+    assert df["category_id"].nunique() == 1
+    assert ("Travel", "✈️") in category_rows(user_id)
+    assert normalize_category_name("🛠️Utilities") == "Utilities"
+
+
+def test_migration_strips_and_merges_existing_names(fresh_db, monkeypatch):
+    # Build a database as it was before the rename step
+    full_history = migrations.MIGRATIONS
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 7])
+    schema.init_db()
+    user_id = crud.create_user("legacy_user", "hash")
+    with schema.borrow_connection() as conn:
+        conn.execute("INSERT INTO categories (user_id, name, emoji) VALUES (?, '🍴 Food & Dining', '🍴')", (user_id,))
+        conn.execute("INSERT INTO categories (user_id, name, emoji) VALUES (?, '★ Rent', '★')", (user_id,))
+        dirty_food, rent = [r[0] for r in conn.execute(
+            "SELECT id FROM categories WHERE name IN ('🍴 Food & Dining', '★ Rent') ORDER BY id")]
+        conn.executemany(
+            "INSERT INTO transactions (user_id, amount_paise, category_id, payment_method, date) VALUES (?, ?, ?, 'UPI', '2025-03-01')",
+            [(user_id, 1000, dirty_food), (user_id, 500, rent)])
+        conn.execute("INSERT INTO budgets (user_id, category, amount_paise, period, start_date) VALUES (?, '🍴 Food & Dining', 100, 'Monthly', '2025-03-01')", (user_id,))
+        conn.execute("INSERT INTO budgets (user_id, category, amount_paise, period, start_date) VALUES (?, 'Food & Dining', 200, 'Monthly', '2025-03-01')", (user_id,))
+        conn.commit()
+    schema.close_connections()
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", full_history)
+    assert schema.init_db() == migrations.latest_version()
+
+    names = [name for name, _ in category_rows(user_id)]
+    assert names.count("Food & Dining") == 1 and "Rent" in names
+    spend = crud.sum_by(user_id, ["category"]).set_index("category")["amount_paise"]
+    assert spend.to_dict() == {"Food & Dining": 1000, "Rent": 500}
+    assert crud.get_spend_summary(user_id, date(2025, 3, 1), category="Food & Dining")["total"] == 10.0
+    budgets = crud.get_budgets(user_id)
+    assert [(b["category"], b["amount_paise"]) for b in budgets] == [("Food & Dining", 200)]
+
+
+def test_text_symbols_are_not_icons(fresh_db):
+    assert normalize_category_name("→ Transfers") == "→ Transfers"
+    assert normalize_category_name("①") == "①"
+    assert normalize_category_name("☕ Coffee") == "Coffee"
+    assert normalize_category_name("👨‍👩‍👧 Family") == "Family"
+    assert normalize_category_name("⭐ Favourites") == "Favourites"
+    assert normalize_category_name("⏰Bills") == "Bills"
+
+    schema.init_db()
+    user_id = crud.create_user("symbols_user", "hash")
+    crud.add_transaction(user_id, 10.0, "→ Transfers", "UPI", date(2025, 3, 1), "")
+    crud.add_transaction(user_id, 10.0, "⭐ Favourites", "UPI", date(2025, 3, 1), "")
+    crud.add_transaction(user_id, 10.0, "Favourites", "UPI", date(2025, 3, 1), "")
+    assert set(crud.load_transactions_df(user_id)["category"]) == {"→ Transfers", "Favourites"}
@@ -0,0 +1,76 @@
+import sys
+import os
+import threading
+
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "pool.db"))
+    clock = [0.0]
+    pool = schema.ConnectionPool(max_idle=2, idle_check_seconds=60, clock=lambda: clock[0])
+    pool.clock = clock
+    yield pool
+    pool.close_all()
+
+
+def borrow_on_threads(pool, n):
+    """Ids of the connections n threads borrowed at the same time."""
+    ids, together = [], threading.Barrier(n)
+
+    def borrow():
+        with pool.borrow() as conn:
+            ids.append(id(conn))
+            together.wait()
+
+    threads = [threading.Thread(target=borrow) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return ids
+
+
+def test_connections_outlive_the_borrowing_thread(pool):
+    # Each Streamlit rerun runs on a new thread; it still gets a warm connection
+    assert borrow_on_threads(pool, 1) == borrow_on_threads(pool, 1)
+
+
+def test_nested_borrows_share_one_connection_and_roll_back_once(pool):
+    with pool.borrow() as outer:
+        outer.execute("CREATE TABLE t (x INTEGER)")
+        outer.commit()
+        with pool.borrow() as inner:
+            assert inner is outer
+            inner.execute("INSERT INTO t VALUES (1)")
+        assert outer.in_transaction  # the inner exit leaves the outer's work alone
+    with pool.borrow() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_health_is_probed_only_after_an_idle_spell(pool):
+    statements = []
+    with pool.borrow() as conn:
+        conn.set_trace_callback(statements.append)
+    with pool.borrow() as conn:
+        conn.execute("SELECT 2")
+    pool.clock[0] += 61
+    with pool.borrow() as conn:
+        conn.set_trace_callback(None)
+    assert statements == ["SELECT 2", "SELECT 1"]
+
+
+def test_idle_connections_are_bounded_and_dropped_on_switch(pool, tmp_path, monkeypatch):
+    assert len(set(borrow_on_threads(pool, 3))) == 3
+    assert len(pool._idle) == 2
+
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "other.db"))
+    with pool.borrow() as conn:
+        assert conn.execute("PRAGMA database_list").fetchone()["file"].endswith("other.db")
+    assert len(pool._idle) == 1
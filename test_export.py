@@ -0,0 +1,104 @@
+import sys
+import os
+import csv
+import io
+import zipfile
+from datetime import date
+
+import pytest
+from openpyxl import load_workbook
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+from src.database.query import TransactionQuery
+from src.utils import exporter, importer
+
+
+@pytest.fixture
+def user_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "export.db"))
+    schema.init_db()
+    user_id = crud.create_user("export_user", "hash")
+    crud.add_transaction(user_id, 1250.5, "Food & Dining", "UPI", date(2025, 3, 5), "Swiggy, order")
+    crud.add_transaction(user_id, 19.99, "Health", "Cash", date(2025, 3, 6), "")
+    crud.add_budget(user_id, "Global", 5000.0, "Monthly", date(2025, 3, 1))
+    yield user_id
+    schema.close_connections()
+
+
+def test_csv_export_streams_in_chunks_and_round_trips(user_id):
+    chunks = list(crud.iter_export_rows(user_id, "transactions", chunk_rows=1))
+    assert [len(c) for c in chunks] == [1, 1]
+
+    data = exporter.export_transactions(user_id, TransactionQuery(category="Food & Dining")).read()
+    rows = list(csv.reader(io.StringIO(data.decode("utf-8-sig"))))
+    assert rows == [["Date", "Category", "Payment Mode", "Amount", "Description"],
+                    ["2025-03-05", "Food & Dining", "UPI", "1250.5", "Swiggy, order"]]
+
+    # The export's headers are ones the importer recognises
+    other = crud.create_user("other_user", "hash")
+    file = io.BytesIO(exporter.export_transactions(user_id).read())
+    mapping = importer.guess_mapping(importer.read_headers(file, "export.csv"))
+    assert importer.import_statement(other, file, "export.csv", mapping).imported == 2
+    assert crud.sum_by(other)["amount_paise"].tolist() == [127049]
+
+
+def test_failed_export_returns_its_connection(user_id, monkeypatch):
+    abandoned = []
+
+    def broken_writer(out, header, chunks, title):
+        next(iter(chunks))
+        abandoned.append(chunks)  # Still referenced, so GC will not close it
+        raise ValueError("bad cell")
+
+    monkeypatch.setattr(exporter, "write_xlsx", broken_writer)
+    with pytest.raises(ValueError):
+        exporter.export_transactions(user_id, fmt="xlsx")
+    # Not left borrowed by the abandoned row iterator
+    assert getattr(schema._pool._local, "held", None) is None
+    assert len(schema._pool._idle) == 1
+
+
+def test_xlsx_export_is_a_readable_workbook(user_id):
+    wb = load_workbook(exporter.export_transactions(user_id, fmt="xlsx"), read_only=True)
+    rows = list(wb.active.iter_rows(values_only=True))
+    assert rows[0] == ("Date", "Category", "Payment Mode", "Amount", "Description")
+    assert [r[3] for r in rows[1:]] == [19.99, 1250.5]
+
+
+def test_account_archive_holds_every_table(user_id):
+    archive = zipfile.ZipFile(exporter.export_account(user_id))
+    assert archive.namelist() == ["transactions.csv", "budgets.csv", "categories.csv"]
+    budgets = list(csv.reader(io.StringIO(archive.read("budgets.csv").decode("utf-8-sig"))))
+    assert budgets[1][:3] == ["Global", "Monthly", "5000.0"]
+    categories = archive.read("categories.csv").decode("utf-8-sig").splitlines()
+    assert len(categories) > 1 and categories[0] == "Name,Emoji"
+
+
+def test_pdf_report_caps_rows_but_totals_everything(user_id, monkeypatch):
+    report = exporter.export_pdf(user_id).read()
+    assert report.startswith(b"%PDF")
+
+    monkeypatch.setattr(exporter, "REPORT_MAX_ROWS", 1)
+    captured = {}
+    monkeypatch.setattr(exporter, "generate_expense_pdf",
+                        lambda df, total, note=None: captured.update(rows=len(df), total=total, note=note) or b"%PDF")
+    exporter.export_transactions(user_id, fmt="pdf")
+    assert captured["rows"] == 1
+    assert captured["total"] == 1270.49
+    assert "latest 1 of 2" in captured["note"]
+
+
+@pytest.mark.parametrize("export", [
+    lambda user_id: exporter.export_transactions(user_id, fmt="csv"),
+    lambda user_id: exporter.export_transactions(user_id, fmt="xlsx"),
+    lambda user_id: exporter.export_transactions(user_id, fmt="pdf"),
+    exporter.export_account,
+], ids=["csv", "xlsx", "pdf", "zip"])
+def test_exports_are_accepted_by_download_button(user_id, export):
+    # st.download_button runs its data callable's result through this
+    data, _ = convert_data_to_bytes_and_infer_mime(export(user_id), TypeError("unsupported data type"))
+    assert len(data) > 0
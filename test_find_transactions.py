@@ -0,0 +1,65 @@
+import sys
+import os
+from datetime import date
+
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+from src.database.crud import find_transactions, transaction_labels
+
+
+@pytest.fixture
+def user_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "find.db"))
+    schema.init_db()
+    user_id = crud.create_user("find_user", "hash")
+    for amount, category, mode, day, notes in [
+        (250.0, "Food & Dining", "UPI", date(2025, 3, 1), "Lunch"),
+        (250.0, "Food & Dining", "Cash", date(2025, 3, 2), "Dinner"),
+        (99.5, "Food & Dining", "UPI", date(2025, 3, 2), None),
+        (250.0, "Health", "UPI", date(2025, 3, 2), "Pharmacy"),
+    ]:
+        crud.add_transaction(user_id, amount, category, mode, day, notes)
+    yield user_id
+    schema.close_connections()
+
+
+def test_filters_and_labels(user_id):
+    assert list(find_transactions(user_id, "Food & Dining").values()) == [
+        "2025-03-02 | ₹99.50 | ", "2025-03-02 | ₹250.00 | Dinner", "2025-03-01 | ₹250.00 | Lunch"]
+    assert list(find_transactions(user_id, "Food & Dining", "UPI", (250, 250)).values()) == [
+        "2025-03-01 | ₹250.00 | Lunch"]
+    assert len(find_transactions(user_id, "Food & Dining", "Any", (None, 200))) == 1
+    assert len(find_transactions(user_id, "Food & Dining", date=date(2025, 3, 2))) == 2
+    assert find_transactions(user_id, "Food & Dining", "Credit Card") == {}
+
+
+def test_limit_and_user_scope(user_id):
+    assert len(find_transactions(user_id, "Food & Dining", limit=2)) == 2
+    other = crud.create_user("other_user", "hash")
+    assert find_transactions(other, "Food & Dining") == {}
+
+
+def test_labels_follow_ids(user_id):
+    found = find_transactions(user_id, "Food & Dining")
+    ids = list(found)[::-1]
+    assert list(transaction_labels(user_id, ids)) == ids
+    crud.delete_transaction(ids[0], user_id)
+    assert list(transaction_labels(user_id, ids)) == ids[1:]
+    assert transaction_labels(crud.create_user("other_user", "hash"), ids) == {}
+    assert transaction_labels(user_id, []) == {}
+
+
+def test_served_by_category_index(user_id):
+    statements = []
+    with schema.borrow_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        find_transactions(user_id, "Food & Dining", "UPI")
+        conn.set_trace_callback(None)
+        lookup = statements[-1]
+        plan = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {lookup}"))
+    assert "idx_transactions_user_category_date" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,93 @@
+import sys
+import os
+import io
+from datetime import date
+
+import pytest
+from openpyxl import Workbook
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+from src.utils.constants import PAYMENT_MODES
+from src.utils import importer
+
+
+@pytest.fixture
+def user_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "import.db"))
+    schema.init_db()
+    yield crud.create_user("import_user", "hash")
+    schema.close_connections()
+
+
+STATEMENT = (
+    "Txn Date,Narration,Withdrawal Amt,Category\n"
+    "05/03/2025,Swiggy order,\"1,250.50\",Food & Dining\n"
+    "2025-03-06,Metro card,100,\n"
+    "not a date,Broken row,50,\n"
+    "07-03-2025,Refund,-20,\n"
+)
+
+
+def test_csv_import_maps_validates_and_chunks(user_id):
+    file = io.BytesIO(STATEMENT.encode())
+    mapping = importer.guess_mapping(importer.read_headers(file, "hdfc.csv"))
+    assert mapping == {"date": "Txn Date", "amount": "Withdrawal Amt", "category": "Category", "notes": "Narration"}
+
+    generation = crud.get_generation(user_id)
+    result = importer.import_statement(user_id, file, "hdfc.csv", mapping, "Transportation", "UPI", chunk_rows=2)
+    assert (result.imported, result.skipped, result.errors) == (2, 2, [])
+    # Two chunks, one cache invalidation
+    assert crud.get_generation(user_id) == generation + 1
+
+    df = crud.load_transactions_df(user_id).sort_values("date")
+    assert df["date"].dt.date.tolist() == [date(2025, 3, 5), date(2025, 3, 6)]
+    assert df["amount_paise"].tolist() == [125050, 10000]
+    assert df["category"].tolist() == ["Food & Dining", "Transportation"]
+    assert df["payment_method"].tolist() == ["UPI", "UPI"]
+    assert crud.get_spend_summary(user_id, date(2025, 3, 1))["total"] == 1350.5
+
+
+def test_xlsx_import_reads_typed_cells(user_id):
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Date", "Amount", "Description", "Mode"])
+    ws.append([date(2025, 3, 1), 99.99, "Pharmacy", "Cash"])
+    ws.append([date(2025, 3, 2), 10, None, None])
+    file = io.BytesIO()
+    wb.save(file)
+
+    mapping = importer.guess_mapping(importer.read_headers(file, "statement.xlsx"))
+    result = importer.import_statement(user_id, file, "statement.xlsx", mapping, "Others", "Card")
+    assert result.imported == 2
+
+    df = crud.load_transactions_df(user_id).sort_values("date")
+    assert df["amount_paise"].tolist() == [9999, 1000]
+    assert df["payment_method"].tolist() == ["Cash", "Card"]
+    assert df["notes"].tolist() == ["Pharmacy", ""]
+
+
+def test_payment_modes_map_onto_known_modes(user_id):
+    statement = (
+        "Date,Amount,Mode\n"
+        "2025-03-01,10,NEFT\n"
+        "2025-03-02,20,debit card\n"
+        "2025-03-03,30,Cash\n"
+        "2025-03-04,40,Crypto\n"
+        "2025-03-05,50,\n"
+    )
+    file = io.BytesIO(statement.encode())
+    mapping = importer.guess_mapping(importer.read_headers(file, "modes.csv"))
+    assert importer.import_statement(user_id, file, "modes.csv", mapping, default_payment="UPI").imported == 5
+    df = crud.load_transactions_df(user_id).sort_values("date")
+    assert df["payment_method"].tolist() == ["Bank Transfer", "Card", "Cash", "UPI", "UPI"]
+    assert set(df["payment_method"]) <= set(PAYMENT_MODES)
+
+
+def test_unsupported_type_and_missing_mapping_are_rejected(user_id):
+    with pytest.raises(ValueError):
+        importer.read_headers(io.BytesIO(b"x"), "statement.pdf")
+    with pytest.raises(ValueError):
+        importer.import_statement(user_id, io.BytesIO(STATEMENT.encode()), "a.csv", {"date": "Txn Date"})
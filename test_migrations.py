@@ -0,0 +1,51 @@
+import sys
+import os
+
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, migrations
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "migrations.db"))
+    yield
+    schema.close_connections()
+
+
+def test_init_db_reaches_latest_version(fresh_db):
+    assert schema.init_db() == migrations.latest_version()
+    with schema.borrow_connection() as conn:
+        assert migrations.current_version(conn) == migrations.latest_version()
+
+
+def test_warm_start_is_a_single_pragma_read(fresh_db):
+    schema.init_db()
+    statements = []
+    with schema.borrow_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        schema.init_db()
+        conn.set_trace_callback(None)
+    assert statements == ["PRAGMA user_version"]
+
+
+def test_failed_step_rolls_back_everything(fresh_db, monkeypatch):
+    def broken(cursor):
+        cursor.execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    latest = migrations.latest_version()
+    monkeypatch.setattr(migrations, "MIGRATIONS",
+                        migrations.MIGRATIONS + [(latest + 1, "broken step", broken)])
+
+    with pytest.raises(RuntimeError):
+        schema.init_db()
+
+    with schema.borrow_connection() as conn:
+        assert migrations.current_version(conn) == 0
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "half_done" not in tables
+    assert "transactions" not in tables
@@ -0,0 +1,53 @@
+import sys
+import os
+from datetime import date
+
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+from src.database.query import TransactionQuery
+
+
+@pytest.fixture
+def user_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "pages.db"))
+    schema.init_db()
+    user_id = crud.create_user("page_user", "hash")
+    # Two rows per day so the id breaks ties within a date
+    for day in range(1, 8):
+        crud.add_transaction(user_id, 10.0 * day, "Food & Dining", "UPI", date(2025, 3, day), "a")
+        crud.add_transaction(user_id, 5.0, "Health", "Cash", date(2025, 3, day), "b")
+    yield user_id
+    schema.close_connections()
+
+
+def test_pages_walk_forward_and_back(user_id):
+    expected = crud.load_transactions_df(user_id).sort_values(["date", "id"], ascending=False)["id"].tolist()
+
+    pages, page = [], crud.page_transactions(user_id, page_size=4)
+    assert page["prev_cursor"] is None
+    while True:
+        pages.append(page["rows"]["id"].tolist())
+        if page["next_cursor"] is None:
+            break
+        page = crud.page_transactions(user_id, page_size=4, after=page["next_cursor"])
+
+    assert [len(p) for p in pages] == [4, 4, 4, 2]
+    assert sum(pages, []) == expected
+
+    # Walking back from the last page revisits the same pages
+    for previous in reversed(pages[:-1]):
+        page = crud.page_transactions(user_id, page_size=4, before=page["prev_cursor"])
+        assert page["rows"]["id"].tolist() == previous
+    assert page["prev_cursor"] is None
+
+
+def test_count_and_pages_respect_filters(user_id):
+    query = TransactionQuery(category="Health", start_date=date(2025, 3, 3))
+    assert crud.count_transactions(user_id, query) == 5
+    page = crud.page_transactions(user_id, query, page_size=10)
+    assert len(page["rows"]) == 5 and page["next_cursor"] is None
+    assert set(page["rows"]["category"]) == {"Health"}
@@ -0,0 +1,108 @@
+import sys
+import os
+import sqlite3
+from datetime import date
+
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+from src.database.query import TransactionQuery
+
+
+@pytest.fixture
+def traced_db(tmp_path, monkeypatch):
+    """Fresh database whose crud connections record every statement they run."""
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "plan.db"))
+    schema.init_db()
+    schema.close_connections()
+
+    statements = []
+    open_connection = schema.get_connection
+
+    def traced_connection():
+        conn = open_connection()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    # The pool opens its per-thread connection through get_connection
+    monkeypatch.setattr(schema, "get_connection", traced_connection)
+    yield statements
+    schema.close_connections()
+
+
+def query_plan(sql):
+    conn = sqlite3.connect(schema.DB_PATH)
+    try:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    finally:
+        conn.close()
+
+
+def exercise_crud():
+    user_id = crud.create_user("plan_user", "hash")
+    crud.add_transaction(user_id, 120.0, "Food & Dining", "UPI", date(2025, 1, 5), "lunch")
+    crud.add_transaction(user_id, 80.0, "Transportation", "Cash", date(2025, 1, 6), "cab")
+    crud.add_budget(user_id, "Food & Dining", 5000.0, "Monthly", date(2025, 1, 1))
+    crud.add_budget(user_id, "Food & Dining", 6000.0, "Monthly", date(2025, 1, 1))
+
+    crud.get_user_by_username("plan_user")
+    crud.get_categories(user_id)
+    crud.get_category_map(user_id)
+    crud.load_transactions_df(user_id)
+    crud.load_transactions_df(user_id, filters={
+        "start_date": date(2025, 1, 1),
+        "end_date": date(2025, 1, 31),
+        "category": "Food & Dining",
+        "payment_mode": "UPI",
+    })
+    crud.load_transactions_df(user_id, TransactionQuery(
+        start_date=date(2025, 1, 1), end_date=date(2025, 1, 7),
+        payment_mode="Cash", min_amount=10, max_amount=500,
+    ))
+    crud.has_transactions(user_id)
+    crud.count_transactions(user_id, TransactionQuery(category="Food & Dining"))
+    first = crud.page_transactions(user_id, page_size=1)
+    crud.page_transactions(user_id, page_size=1, after=first["next_cursor"])
+    crud.page_transactions(user_id, TransactionQuery(category="Food & Dining"), page_size=1, before=first["next_cursor"])
+    crud.sum_by(user_id, ["category"], date(2025, 1, 1), date(2025, 1, 31))
+    crud.sum_by(user_id, ["payment_method"], granularity="month")
+    crud.sum_by(user_id, start=date(2025, 1, 1), end=date(2025, 1, 31), granularity="day")
+    crud.get_budgets(user_id)
+    crud.get_most_used_category(user_id)
+    crud.delete_category(user_id, "Food & Dining")
+    crud.delete_category(user_id, "Education")
+    return user_id
+
+
+def test_crud_queries_use_indexes(traced_db):
+    exercise_crud()
+
+    queries = {
+        sql for sql in traced_db
+        if sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE"))
+        and "transactions" in sql
+    }
+    assert queries, "expected crud to query the transactions table"
+
+    for sql in queries:
+        plan = query_plan(sql)
+        scans = [step for step in plan if step.startswith("SCAN transactions")]
+        assert not scans, f"Full table scan in:\n{sql}\nPlan: {plan}"
+
+
+def test_budget_and_category_lookups_use_indexes(traced_db):
+    exercise_crud()
+
+    queries = {
+        sql for sql in traced_db
+        if sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE"))
+        and ("budgets" in sql or "categories" in sql)
+    }
+
+    for sql in queries:
+        plan = query_plan(sql)
+        scans = [step for step in plan if step.startswith(("SCAN budgets", "SCAN categories"))]
+        assert not scans, f"Full table scan in:\n{sql}\nPlan: {plan}"
@@ -0,0 +1,86 @@
+import sys
+import os
+import random
+from datetime import date, timedelta
+
+import pytest
+from pandas.testing import assert_frame_equal
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+from src.analytics.range_index import range_index
+
+CATEGORIES = ["Food & Dining", "Health", "Utilities", "Shopping"]
+MODES = ["Cash", "UPI", "Card"]
+
+
+@pytest.fixture
+def user_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "range.db"))
+    schema.init_db()
+    user_id = crud.create_user("range_user", "hash")
+    rnd = random.Random(3)
+    for i in range(200):
+        crud.add_transaction(user_id, round(rnd.uniform(1, 500), 2), rnd.choice(CATEGORIES), rnd.choice(MODES),
+                             date(2024, 11, 1) + timedelta(days=rnd.randint(0, 200)), f"n{i}")
+    yield user_id
+    schema.close_connections()
+
+
+def assert_same(got, want, cols):
+    assert_frame_equal(got[cols], want[cols], check_dtype=False, check_index_type=False)
+
+
+RANGES = [
+    (date(2024, 11, 1), date(2024, 11, 30)),
+    (date(2024, 12, 17), date(2025, 3, 3)),
+    (date(2024, 1, 1), date(2030, 1, 1)),  # wider than the data on both sides
+    (date(2025, 2, 9), date(2025, 2, 9)),
+]
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+def test_answers_match_sql_aggregates(user_id, start, end):
+    index = range_index(user_id)
+    expected = crud.sum_by(user_id, start=start, end=end)
+    assert index.total(start, end) == expected["amount_paise"].sum()
+    assert index.count(start, end) == expected["count"].sum()
+    for dim in ("category", "payment_method"):
+        got = index.breakdown(start, end, dim)
+        want = crud.sum_by(user_id, [dim], start, end)
+        assert_same(got, want, [dim, "amount_paise", "count"])
+    for granularity in ("day", "week", "month", "year"):
+        got = index.trend(start, end, granularity)
+        want = crud.sum_by(user_id, start=start, end=end, granularity=granularity)
+        assert_same(got, want, ["bucket", "amount_paise", "count"])
+
+
+def test_empty_and_inverted_ranges(user_id):
+    index = range_index(user_id)
+    assert index.total(date(2020, 1, 1), date(2020, 12, 31)) == 0
+    assert index.count(date(2025, 3, 1), date(2025, 2, 1)) == 0
+    assert index.trend(date(2025, 3, 1), date(2025, 2, 1), "day").empty
+    assert index.breakdown(date(2020, 1, 1), date(2020, 1, 2)).empty
+
+    other = crud.create_user("nobody", "hash")
+    assert range_index(other).total() == 0 and range_index(other).trend(date(2025, 1, 1), date(2025, 1, 31)).empty
+
+
+def test_reused_until_the_users_data_changes(user_id):
+    index = range_index(user_id)
+    statements = []
+    with schema.borrow_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            assert range_index(user_id) is index
+        finally:
+            conn.set_trace_callback(None)
+    # Only the generation lookup reaches SQLite
+    assert not any("daily_spend" in sql or "transactions" in sql for sql in statements)
+
+    before = index.total()
+    crud.add_transaction(user_id, 12.34, "Health", "UPI", date(2025, 1, 5), "")
+    rebuilt = range_index(user_id)
+    assert rebuilt is not index and rebuilt.total() == before + 1234
@@ -0,0 +1,91 @@
+import sys
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+
+
+@pytest.fixture
+def user_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "rollups.db"))
+    schema.init_db()
+    yield crud.create_user("rollup_user", "hash")
+    schema.close_connections()
+
+
+def rollup_rows():
+    with schema.borrow_connection() as conn:
+        return sorted(tuple(r) for r in conn.execute(
+            "SELECT user_id, day, category_id, payment_method, total_paise, count, max_paise FROM daily_spend"))
+
+
+def recomputed_rows():
+    with schema.borrow_connection() as conn:
+        return sorted(tuple(r) for r in conn.execute("""
+            SELECT user_id, date(date), category_id, payment_method, SUM(amount_paise), COUNT(*), MAX(amount_paise)
+            FROM transactions GROUP BY 1, 2, 3, 4"""))
+
+
+def transaction_ids(user_id):
+    return crud.load_transactions_df(user_id).sort_values("id")["id"].tolist()
+
+
+def test_daily_spend_tracks_inserts_updates_and_deletes(user_id):
+    crud.add_transaction(user_id, 100.0, "Food & Dining", "UPI", date(2025, 3, 1), "a")
+    crud.add_transaction(user_id, 250.0, "Food & Dining", "UPI", date(2025, 3, 1), "b")
+    crud.add_transaction(user_id, 40.0, "Health", "Cash", date(2025, 3, 2), "c")
+    assert rollup_rows() == recomputed_rows()
+
+    first, second, third = transaction_ids(user_id)
+    # Shrinking the day's largest expense must lower max_amount too
+    crud.update_transaction(second, user_id, 20.0, "Food & Dining", "UPI", date(2025, 3, 1), "b")
+    assert rollup_rows() == recomputed_rows()
+
+    # Moving a row to another bucket
+    crud.update_transaction(third, user_id, 40.0, "Health", "Card", date(2025, 3, 5), "c")
+    assert rollup_rows() == recomputed_rows()
+
+    crud.delete_transaction(first, user_id)
+    crud.delete_transaction(second, user_id)
+    assert rollup_rows() == recomputed_rows()
+    assert len(rollup_rows()) == 1
+
+
+def test_spend_summary_reads_rollup(user_id):
+    crud.add_transaction(user_id, 100.0, "Food & Dining", "UPI", date(2025, 3, 1), "a")
+    crud.add_transaction(user_id, 300.0, "Health", "Cash", date(2025, 3, 20), "b")
+    crud.add_transaction(user_id, 50.0, "Health", "Cash", date(2025, 4, 1), "c")
+
+    march = crud.get_spend_summary(user_id, date(2025, 3, 1), date(2025, 3, 31))
+    assert march == {"total": 400.0, "count": 2, "max_amount": 300.0}
+    assert crud.get_spend_summary(user_id, date(2025, 3, 1), category="Health")["total"] == 350.0
+    assert crud.get_spend_summary(user_id, date(2026, 1, 1))["count"] == 0
+
+
+def test_amounts_are_exact_integer_paise(user_id):
+    for amount in (0.1, 0.2, 19.99):
+        crud.add_transaction(user_id, amount, "Food & Dining", "UPI", date(2025, 3, 1), "")
+
+    df = crud.load_transactions_df(user_id)
+    assert str(df["amount_paise"].dtype) == "int64"
+    assert df["amount_paise"].sum() == 2029
+    assert crud.get_spend_summary(user_id, date(2025, 3, 1))["total"] == 20.29
+    assert crud.sum_by(user_id)["amount_paise"].tolist() == [2029]
+
+
+def test_transaction_frame_schema_is_compact(user_id):
+    crud.add_transaction(user_id, 12.5, "Food & Dining", "UPI", date(2025, 3, 1), "lunch")
+
+    df = crud.load_transactions_df(user_id)
+    assert "user_id" not in df and "created_at" not in df
+    assert str(df["id"].dtype) == "int32"
+    assert str(df["category"].dtype) == "category"
+    assert str(df["payment_method"].dtype) == "category"
+    assert pd.api.types.is_datetime64_dtype(df["date"])
+    assert df["date"].iloc[0] == pd.Timestamp(2025, 3, 1)
@@ -0,0 +1,136 @@
+import sys
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+from src.database.crud import search_transactions
+
+
+@pytest.fixture
+def user_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "search.db"))
+    schema.init_db()
+    user_id = crud.create_user("search_user", "hash")
+    for day, notes in [
+        (date(2025, 3, 1), "Swiggy dinner"),
+        (date(2025, 3, 5), "swiggy lunch with team"),
+        (date(2025, 3, 7), "Uber to airport"),
+        (date(2025, 3, 9), "Rent for March"),
+    ]:
+        crud.add_transaction(user_id, 100.0, "Food & Dining", "UPI", day, notes)
+    yield user_id
+    schema.close_connections()
+
+
+def notes(df):
+    return list(df['notes'])
+
+
+def test_case_insensitive_substring_match(user_id):
+    assert sorted(notes(search_transactions(user_id, "SWIG"))) == ["Swiggy dinner", "swiggy lunch with team"]
+    assert notes(search_transactions(user_id, "irpor")) == ["Uber to airport"]
+    assert search_transactions(user_id, "nothing like this").empty
+
+
+def test_results_keep_frame_schema(user_id):
+    found = search_transactions(user_id, "rent")
+    expected = crud.load_transactions_df(user_id)
+    assert list(found.columns) == list(expected.columns)
+    assert (found.dtypes == expected.dtypes).all()
+    empty = search_transactions(user_id, "   ")
+    assert empty.empty and list(empty.columns) == list(expected.columns)
+
+
+def test_index_follows_writes(user_id):
+    crud.add_transaction(user_id, 5.0, "Others", "Cash", date(2025, 3, 10), "Chai at station")
+    found = search_transactions(user_id, "chai")
+    assert notes(found) == ["Chai at station"]
+    new_id = int(found['id'].iloc[0])
+
+    crud.update_transaction(new_id, user_id, 5.0, "Others", "Cash", date(2025, 3, 10), "Coffee at station")
+    assert search_transactions(user_id, "chai").empty
+    assert notes(search_transactions(user_id, "coffee")) == ["Coffee at station"]
+
+    crud.delete_transaction(new_id, user_id)
+    assert search_transactions(user_id, "station").empty
+
+
+def test_bulk_import_is_indexed_once(user_id):
+    crud.add_transactions_bulk(user_id, pd.DataFrame({
+        'date': ["2025-04-01", "2025-04-02"],
+        'amount_paise': [1000, 2000],
+        'category': ["Others", "Health"],
+        'payment_method': ["UPI", "UPI"],
+        'notes': ["Pharmacy refill", "pharmacy visit"],
+    }))
+    crud.add_transaction(user_id, 1.0, "Health", "Cash", date(2025, 4, 3), "Pharmacy again")
+    assert len(search_transactions(user_id, "pharmacy")) == 3
+    with schema.borrow_connection() as conn:
+        # Raises if the index disagrees with transactions.notes
+        conn.execute("INSERT INTO transaction_notes_fts (transaction_notes_fts) VALUES ('integrity-check')")
+        assert conn.execute("SELECT COUNT(*) FROM notes_index_paused").fetchone()[0] == 0
+
+
+def test_scoped_to_user(user_id):
+    other = crud.create_user("other_user", "hash")
+    crud.add_transaction(other, 1.0, "Others", "Cash", date(2025, 3, 1), "Swiggy snack")
+    assert len(search_transactions(user_id, "swiggy")) == 2
+    assert notes(search_transactions(other, "swiggy")) == ["Swiggy snack"]
+
+
+def test_other_users_hits_do_not_crowd_out_the_candidates(user_id):
+    # Another user's newer matches outnumber the candidate window
+    busy = crud.create_user("busy_user", "hash")
+    n = crud.SEARCH_CANDIDATES + 100
+    crud.add_transactions_bulk(busy, pd.DataFrame({
+        'date': ["2025-05-01"] * n,
+        'amount_paise': [100] * n,
+        'category': ["Others"] * n,
+        'payment_method': ["UPI"] * n,
+        'notes': [f"Swiggy order {i}" for i in range(n)],
+    }))
+    assert notes(search_transactions(user_id, "swiggy")) == ["Swiggy dinner", "swiggy lunch with team"]
+    assert len(search_transactions(busy, "swiggy", limit=n)) == crud.SEARCH_CANDIDATES
+
+    # Moving a row to another user moves its index entry too
+    moved = int(search_transactions(user_id, "dinner")["id"].iloc[0])
+    with schema.borrow_connection() as conn:
+        conn.execute("UPDATE transactions SET user_id = ? WHERE id = ?", (busy, moved))
+        conn.commit()
+    assert search_transactions(user_id, "dinner").empty
+    assert notes(search_transactions(busy, "dinner")) == ["Swiggy dinner"]
+
+
+def test_short_text_and_query_syntax(user_id):
+    # Below trigram length: falls back to a scan, newest first
+    assert notes(search_transactions(user_id, "ub")) == ["Uber to airport"]
+    # FTS operators and quotes are matched literally, never parsed
+    crud.add_transaction(user_id, 1.0, "Others", "Cash", date(2025, 3, 11), 'Gift "for" mom OR dad')
+    assert notes(search_transactions(user_id, '"for" mom OR')) == ['Gift "for" mom OR dad']
+    assert search_transactions(user_id, 'swiggy OR rent').empty
+
+
+def test_limit(user_id):
+    assert len(search_transactions(user_id, "r", limit=2)) == 2
+    assert len(search_transactions(user_id, "swiggy", limit=1)) == 1
+
+
+def test_ranked_by_occurrences_then_length(user_id):
+    crud.add_transaction(user_id, 1.0, "Others", "Cash", date(2025, 2, 1), "Swiggy")
+    crud.add_transaction(user_id, 1.0, "Others", "Cash", date(2025, 1, 1), "swiggy refund for swiggy order")
+    assert notes(search_transactions(user_id, "swiggy")) == [
+        "swiggy refund for swiggy order", "Swiggy", "Swiggy dinner", "swiggy lunch with team"]
+
+
+def test_served_by_the_index(user_id):
+    with schema.borrow_connection() as conn:
+        plan = " ".join(row[-1] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT rowid FROM transaction_notes_fts WHERE transaction_notes_fts MATCH ?",
+            ('"swiggy"',)))
+    assert "VIRTUAL TABLE" in plan
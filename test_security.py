@@ -0,0 +1,76 @@
+import sys
+import os
+import threading
+
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+from src.auth import security
+from src.auth.security import authenticate, hash_password, hash_rounds, needs_rehash, verify_password
+
+
+@pytest.fixture
+def user_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "security.db"))
+    # The cheapest cost bcrypt allows keeps the suite fast
+    monkeypatch.setattr(security, "BCRYPT_ROUNDS", 4)
+    schema.init_db()
+    user_id = crud.create_user("secure_user", hash_password("correct horse"))
+    yield user_id
+    schema.close_connections()
+
+
+def stored_hash(username="secure_user"):
+    return crud.get_user_by_username(username)['password_hash']
+
+
+def test_hash_and_verify(user_id):
+    hashed = stored_hash()
+    assert hash_rounds(hashed) == 4
+    assert verify_password("correct horse", hashed)
+    assert not verify_password("wrong horse", hashed)
+    assert not verify_password("", hashed)
+    assert not verify_password("correct horse", "not-a-bcrypt-hash")
+
+
+def test_hashing_runs_on_the_pool(user_id, monkeypatch):
+    threads = []
+    real_check = security._check
+
+    def recording_check(*args):
+        threads.append(threading.current_thread().name)
+        return real_check(*args)
+
+    monkeypatch.setattr(security, "_check", recording_check)
+    assert verify_password("correct horse", stored_hash())
+    assert threads and threads[0].startswith("bcrypt")
+
+
+def test_authenticate(user_id):
+    user = authenticate("secure_user", "correct horse")
+    assert user['id'] == user_id and user['username'] == "secure_user"
+    assert authenticate("secure_user", "wrong horse") is None
+    assert authenticate("nobody", "correct horse") is None
+
+
+def test_login_rehashes_at_the_configured_cost(user_id, monkeypatch):
+    monkeypatch.setattr(security, "BCRYPT_ROUNDS", 5)
+    assert needs_rehash(stored_hash())
+
+    # A failed login leaves the old hash alone
+    assert authenticate("secure_user", "wrong horse") is None
+    assert hash_rounds(stored_hash()) == 4
+
+    assert authenticate("secure_user", "correct horse")
+    assert hash_rounds(stored_hash()) == 5
+    assert not needs_rehash(stored_hash())
+    assert authenticate("secure_user", "correct horse")
+
+
+def test_hash_rounds_of_other_values():
+    assert hash_rounds("$2b$12$abcdefghijklmnopqrstuv") == 12
+    assert hash_rounds("plain") is None
+    assert hash_rounds(None) is None
@@ -0,0 +1,123 @@
+import sys
+import os
+import hashlib
+
+import pytest
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+from src.auth import security
+from src.auth.security import (SESSION_RENEW_SECONDS, SESSION_TTL_SECONDS, change_password, hash_password,
+                               issue_session, restore_session, revoke_session, revoke_user_sessions)
+
+NOW = 1_750_000_000
+
+
+@pytest.fixture
+def user_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "sessions.db"))
+    monkeypatch.setattr(security, "BCRYPT_ROUNDS", 4)
+    schema.init_db()
+    user_id = crud.create_user("session_user", hash_password("old password"))
+    yield user_id
+    schema.close_connections()
+
+
+def expires_at(token):
+    return crud.get_session(token.partition(".")[0])['expires_at']
+
+
+def test_token_restores_its_user(user_id):
+    token = issue_session(user_id, now=NOW)
+    assert restore_session(token, now=NOW + 60) == {'id': user_id, 'username': "session_user"}
+    assert issue_session(user_id, now=NOW) != token
+
+
+def test_only_a_digest_is_stored(user_id):
+    token = issue_session(user_id, now=NOW)
+    selector, _, verifier = token.partition(".")
+    with schema.borrow_connection() as conn:
+        row = conn.execute("SELECT * FROM sessions").fetchone()
+    assert row['selector'] == selector
+    assert row['verifier_hash'] == hashlib.sha256(verifier.encode()).digest()
+    assert verifier.encode() not in bytes(row['verifier_hash'])
+
+
+def test_restore_skips_bcrypt(user_id, monkeypatch):
+    token = issue_session(user_id, now=NOW)
+
+    def no_bcrypt(*args):
+        raise AssertionError("bcrypt called")
+
+    monkeypatch.setattr(security.bcrypt, "checkpw", no_bcrypt)
+    monkeypatch.setattr(security.bcrypt, "hashpw", no_bcrypt)
+    assert restore_session(token, now=NOW + 60)
+
+
+def test_rejects_bad_tokens(user_id):
+    token = issue_session(user_id, now=NOW)
+    selector, _, verifier = token.partition(".")
+    for bad in ("", None, selector, f"{selector}.", f"{selector}.{verifier[:-1]}x", f"nope.{verifier}"):
+        assert restore_session(bad, now=NOW) is None
+
+
+def test_expiry_and_sliding_renewal(user_id):
+    token = issue_session(user_id, now=NOW)
+    assert expires_at(token) == NOW + SESSION_TTL_SECONDS
+
+    # Within the first renewal window nothing is written
+    assert restore_session(token, now=NOW + SESSION_RENEW_SECONDS - 1)
+    assert expires_at(token) == NOW + SESSION_TTL_SECONDS
+
+    later = NOW + SESSION_RENEW_SECONDS + 1
+    assert restore_session(token, now=later)
+    assert expires_at(token) == later + SESSION_TTL_SECONDS
+
+    assert restore_session(token, now=later + SESSION_TTL_SECONDS) is None
+
+
+def test_expired_sessions_are_pruned_on_issue(user_id):
+    issue_session(user_id, now=NOW)
+    issue_session(user_id, now=NOW + SESSION_TTL_SECONDS)
+    with schema.borrow_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 1
+
+
+def test_revocation(user_id):
+    first, second = issue_session(user_id, now=NOW), issue_session(user_id, now=NOW)
+    revoke_session(first)
+    assert restore_session(first, now=NOW) is None
+    assert restore_session(second, now=NOW)
+
+    revoke_user_sessions(user_id)
+    assert restore_session(second, now=NOW) is None
+
+
+def test_password_change_revokes_sessions(user_id):
+    token = issue_session(user_id, now=NOW)
+    assert not change_password("session_user", "wrong password", "new password")
+    assert restore_session(token, now=NOW)
+    assert change_password("session_user", "old password", "new password")
+    assert restore_session(token, now=NOW) is None
+
+
+def test_account_deletion_removes_sessions(user_id):
+    token = issue_session(user_id, now=NOW)
+    crud.delete_user_account(user_id)
+    assert restore_session(token, now=NOW) is None
+    with schema.borrow_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 0
+
+
+def test_restore_is_one_primary_key_lookup(user_id):
+    token = issue_session(user_id, now=NOW)
+    statements = []
+    with schema.borrow_connection() as conn:
+        conn.set_trace_callback(statements.append)
+        restore_session(token, now=NOW + 60)
+        conn.set_trace_callback(None)
+        assert len(statements) == 1
+        plan = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {statements[0]}"))
+    assert "SEARCH s USING PRIMARY KEY (selector=?)" in plan
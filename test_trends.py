@@ -0,0 +1,41 @@
+import sys
+import os
+from datetime import date, timedelta
+
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.getcwd())
+
+from src.database import schema, crud
+from src.analytics import trends
+
+
+def test_labels_match_strftime():
+    buckets = pd.Series(pd.date_range("2024-11-28", periods=70, freq="D"))
+    for granularity in trends.GRANULARITIES:
+        expected = buckets.dt.strftime(trends.LABEL_FORMATS[granularity])
+        assert trends.bucket_labels(buckets, granularity).tolist() == expected.tolist()
+
+
+def test_granularity_choice():
+    assert trends.trend_granularity(date(2025, 1, 1), date(2025, 3, 2)) == 'day'
+    assert trends.trend_granularity(date(2025, 1, 1), date(2025, 3, 3)) == 'month'
+
+
+def test_spending_trend_serves_the_pages(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "DB_PATH", str(tmp_path / "trends.db"))
+    schema.init_db()
+    user_id = crud.create_user("trend_user", "hash")
+    for i in range(10):
+        crud.add_transaction(user_id, 10.0 + i, "Health", "UPI", date(2025, 1, 25) + timedelta(days=i * 3), "")
+
+    trend, granularity = trends.spending_trend(user_id, date(2025, 1, 1), date(2025, 2, 28))
+    assert granularity == 'day'
+    assert trend['label'].iloc[0] == "25 Jan" and trend['count'].sum() == 10
+
+    trend, granularity = trends.spending_trend(user_id, date(2024, 6, 1), date(2025, 6, 1))
+    assert granularity == 'month'
+    assert trend['label'].tolist() == ["Jan 2025", "Feb 2025"]
+    assert trend['amount_paise'].sum() == sum(1000 + 100 * i for i in range(10))
+    schema.close_connections()